@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import dataclasses
+import hashlib
+import json
+import math
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import FACETS
+from incremental import current_version, refresh_funding_data
+from overall_analysis import compute_overall_analysis
+from startup_analysis import (compute_startup_analysis, compute_funding_growth, compute_investor_network,
+                              compute_industry_comparison)
+from investor_analysis import compute_investor_details
+from search_index import TOP_K
+
+DEFAULT_CACHE_ENTRIES = 4096
+# Longest request head accepted before the connection is dropped
+MAX_HEADER_BYTES = 16 * 1024
+
+# Facets every route can be filtered by; several values of one facet are separated by '|'
+# since names may contain commas
+FILTER_FACETS = FACETS + ['investor']
+FILTER_SEPARATOR = '|'
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def jsonable(value):
+    # Page results (dataclasses of pandas objects) as plain JSON values
+    if dataclasses.is_dataclass(value):
+        return {field.name: jsonable(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, pd.DataFrame):
+        return [{str(k): jsonable(v) for k, v in row.items()} for row in value.to_dict('records')]
+    if isinstance(value, pd.Series):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.date().isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def approximate_param(params):
+    # ?approximate=1 answers distinct counts and medians from the sketches
+    return params.get('approximate', '').lower() in ('1', 'true', 'yes')
+
+
+def window_params(data, params):
+    # ?since=YYYY-MM-DD&until=YYYY-MM-DD restricts any route to that date window
+    try:
+        return data.window(params.get('since') or None, params.get('until') or None)
+    except ValueError:
+        raise QueryError(400, 'since and until must be dates (YYYY-MM-DD)')
+
+
+def filter_params(data, params):
+    # ?vertical=FinTech|EdTech&city=Bengaluru&round=Series A keeps the rounds matching every
+    # facet given (any of its values), resolved from the bitmap index
+    filters = {facet: params[facet].split(FILTER_SEPARATOR) for facet in FILTER_FACETS if params.get(facet)}
+    try:
+        return data.select(filters)
+    except ValueError as exc:
+        raise QueryError(400, str(exc))
+
+
+def page_params(params):
+    try:
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 100))
+    except ValueError:
+        raise QueryError(400, 'offset and limit must be integers')
+    return max(offset, 0), max(limit, 0)
+
+
+def query_overall(data, params):
+    return jsonable(compute_overall_analysis(data, approximate_param(params)))
+
+
+def query_startup(data, params):
+    name = params.get('name')
+    if not name:
+        raise QueryError(400, 'name is required')
+    result = compute_startup_analysis(data, name)
+    if result is None:
+        raise QueryError(404, f'unknown startup: {name}')
+    # Every section of the page, not just the top
+    return {**jsonable(result),
+            'funding_growth': jsonable(compute_funding_growth(data, name)),
+            'investor_network': jsonable(compute_investor_network(data, name)),
+            'industry_comparison': jsonable(compute_industry_comparison(data, name, approximate_param(params)))}
+
+
+def query_investor(data, params):
+    name = params.get('name')
+    if not name:
+        raise QueryError(400, 'name is required')
+    if name not in data.investor_index:
+        raise QueryError(404, f'unknown investor: {name}')
+    return jsonable(compute_investor_details(data, name))
+
+
+def query_startups(data, params):
+    offset, limit = page_params(params)
+    names = data.startup_index.names
+    return {'total': len(names), 'startups': list(names[offset:offset + limit])}
+
+
+def query_investors(data, params):
+    # Most active investors first, as in the app's sidebar
+    offset, limit = page_params(params)
+    vocabulary = data.investor_vocabulary
+    page = vocabulary.iloc[offset:offset + limit]
+    return {'total': len(vocabulary),
+            'investors': [{'name': name, 'deals': int(deals)} for name, deals in page.items()]}
+
+
+def query_search(data, params):
+    # Type-ahead over startup (and vertical / subvertical) and investor names
+    try:
+        limit = int(params.get('limit', TOP_K))
+    except ValueError:
+        raise QueryError(400, 'limit must be an integer')
+    query, limit = params.get('q', ''), min(max(limit, 0), 100)
+    vocabulary = data.investor_vocabulary
+    return {'startups': [{'name': name, 'match': match} for name, match in data.startup_search.search(query, limit)],
+            'investors': [{'name': name, 'deals': int(vocabulary[name])}
+                          for name in data.investor_search.find(query, limit)]}
+
+
+def query_path(data, params):
+    # Shortest chain of co-investments between two investors
+    source, target = params.get('from'), params.get('to')
+    if not source or not target:
+        raise QueryError(400, 'from and to are required')
+    for name in (source, target):
+        if name not in data.investor_index:
+            raise QueryError(404, f'unknown investor: {name}')
+    return {'path': data.co_investment.shortest_path(source, target)}
+
+
+ROUTES = {
+    '/overall': query_overall,
+    '/startup': query_startup,
+    '/investor': query_investor,
+    '/startups': query_startups,
+    '/investors': query_investors,
+    '/search': query_search,
+    '/path': query_path,
+}
+
+
+class ResponseCache:
+    # LRU of encoded responses keyed on (route, query, data version)
+
+    def __init__(self, maxsize=DEFAULT_CACHE_ENTRIES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QueryServer:
+    # HTTP/1.1 JSON API over the same page computations as the dashboard. Cache hits are
+    # answered on the event loop; misses are computed on one worker thread so the loop
+    # keeps serving while a page is built.
+
+    def __init__(self, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.cache = ResponseCache(cache_entries)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}
+
+    def compute(self, route, params):
+        # Runs on the worker thread: pick up the current data version and build the payload
+        data = refresh_funding_data()
+        version = data.version
+        try:
+            payload = ROUTES[route](window_params(filter_params(data, params), params), params)
+            status = 200
+        except QueryError as exc:
+            payload, status = {'error': str(exc)}, exc.status
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        return version, status, body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+    async def respond(self, path, params):
+        if path == '/health':
+            body = json.dumps({'version': current_version(), 'cache_entries': len(self.cache),
+                               'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}).encode()
+            return 200, body, None
+        if path not in ROUTES:
+            return 404, json.dumps({'error': f'unknown path: {path}'}).encode(), None
+
+        key = (path, tuple(sorted(params.items())), current_version())
+        entry = self.cache.get(key)
+        if entry is None:
+            # Concurrent requests for the same uncached query share one computation
+            future = self._pending.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().run_in_executor(self.executor, self.compute, path, params)
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._pending.pop(key, None))
+            version, status, body, etag = await future
+            entry = (status, body, etag)
+            # Keyed on the version the payload was actually computed from
+            self.cache.put(key[:2] + (version,), entry)
+        return entry
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, protocol = lines[0].split(' ')
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length'):
+                    await reader.readexactly(int(headers['content-length']))
+
+                url = urlsplit(target)
+                if method not in ('GET', 'HEAD'):
+                    status, body, etag = 405, json.dumps({'error': 'only GET is supported'}).encode(), None
+                else:
+                    try:
+                        status, body, etag = await self.respond(url.path.rstrip('/') or '/', dict(parse_qsl(url.query)))
+                    except Exception as exc:
+                        status, body, etag = 500, json.dumps({'error': f'{type(exc).__name__}: {exc}'}).encode(), None
+
+                # Clients holding the current payload only get the validator back
+                if etag is not None and status == 200 and etag in headers.get('if-none-match', ''):
+                    status, body = 304, b''
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and (protocol == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+                response = [f'HTTP/1.1 {status} {REASONS[status]}',
+                            'Content-Type: application/json',
+                            f'Content-Length: {len(body)}',
+                            'Cache-Control: no-cache',
+                            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if etag is not None:
+                    response.append(f'ETag: {etag}')
+                writer.write(('\r\n'.join(response) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving the funding API on http://{host}:{port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the dashboard numbers as a JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help='responses kept in the LRU cache')
+    args = parser.parse_args(argv)
+
+    server = QueryServer(args.cache_entries)
+    # Load and index the dataset before accepting connections
+    server.compute('/overall', {})
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,134 @@
-import streamlit as st
+import json
+import uuid
+
 import pandas as pd
+import streamlit as st
 from overall_analysis import load_overall_analysis
-from startup_analysis import load_startup_analysis
+from startup_analysis import SECTIONS, load_startup_analysis
 from investor_analysis import load_investor_details
+from incremental import current_version, refresh_funding_data
+from prefetch import investor_page, investor_pages, prefetcher, startup_page, startup_pages
+from profiling import chrome_trace, finish_trace, flame_table, span, start_trace
 
 st.set_page_config(page_title="Startup Funding Analysis", layout="wide")
 
-# Load data
-@st.cache_data
-def load_data():
-    df = pd.read_csv('stratup_cleaned.csv')
-    # Convert 'date' column to datetime and extract year
-    df['year'] = pd.to_datetime(df['date'], errors='coerce').dt.year
-    # Convert 'date' column to datetime and extract month
-    df['month'] = pd.to_datetime(df['date'], errors='coerce').dt.month
-    return df
+# Date windows offered in the sidebar, in months back from the latest round in the data
+PERIODS = {'All time': None, 'Last 12 months': 12, 'Last 24 months': 24, 'Custom': None}
+# Facet filters offered in the sidebar, resolved from the bitmap index
+FILTERS = {'vertical': 'Vertical', 'city': 'City', 'round': 'Round'}
 
-df = load_data()
+# Columns each page reads; everything else is never loaded for that page
+PAGE_COLUMNS = {
+    'Overall Analysis': ('date', 'startup', 'vertical', 'city', 'round', 'amount', 'year', 'month'),
+    'StartUp': ('date', 'startup', 'vertical', 'subvertical', 'city', 'investors', 'round', 'amount', 'year', 'month'),
+    'Investor': ('date', 'startup', 'vertical', 'city', 'investors', 'round', 'amount', 'year'),
+}
+
+# Load data (typed Parquet when available, cleaned CSV otherwise) into a compact frame,
+# together with its lazily built indexes. cache_resource hands every session the same
+# read-only object instead of a pickled copy, so pages must never modify it in place.
+# Old data versions are evicted; a version that only appended rows to the previous one
+# is merged into its indexes instead of being loaded from scratch. With FUNDING_SHARED_STORE
+# set, the frame is mapped read-only from the published store that all workers share.
+@st.cache_resource(max_entries=len(PAGE_COLUMNS))
+def load_data(version, columns=None):
+    return refresh_funding_data(columns)
 
 # Sidebar for navigation
 st.sidebar.title('Startup Funding Analysis')
 option = st.sidebar.selectbox('Select One', ['Overall Analysis', 'StartUp', 'Investor'])
+approximate = st.sidebar.toggle('Approximate aggregates',
+                                help='Distinct counts and medians from mergeable sketches: '
+                                     'HyperLogLog (±1.6% standard error) and log-bucketed quantiles (±1%).')
+debug = st.sidebar.toggle('Debug timings', help='Time every computation and chart of this render.')
+
+# A render interrupted by a rerun may have left its trace open on this thread
+finish_trace()
+if debug:
+    start_trace()
+
+# Identifies this browser session to the prefetcher, which keeps one batch per session
+session = st.session_state.setdefault('prefetch_session', uuid.uuid4().hex)
+
+with span('load data'):
+    data = load_data(current_version(), PAGE_COLUMNS[option])
+
+# Rows that broke the schema are left out of every page; say so rather than hide it
+if not data.rejected.empty:
+    st.sidebar.warning(f"{data.source_rows - len(data.df):,} of {data.source_rows:,} rows failed validation "
+                       "and are excluded.")
+    with st.sidebar.expander('Rejected rows'):
+        st.dataframe(data.rejected, hide_index=True)
+
+# Global date window: every page below sees only the rounds inside it
+first, last = (data.df['date'].iloc[0].date(), data.df['date'].iloc[-1].date()) if len(data.df) else (None, None)
+period = st.sidebar.selectbox('Period', list(PERIODS), key='period',
+                              help='Recent periods end at the latest round in the data.')
+since, until = None, None
+if period == 'Custom' and first is not None:
+    picked = st.sidebar.date_input('Date range', value=(first, last), min_value=first, max_value=last)
+    # While the second date is being picked only the first is set; a cleared field is
+    # the open window
+    since, until = (tuple(picked) + (None, None))[:2]
+elif PERIODS[period] and last is not None:
+    since = (pd.Timestamp(last) - pd.DateOffset(months=PERIODS[period]) + pd.Timedelta(days=1)).date()
+
+# Any of the picked values within a facet, every facet at once; most common values listed first
+filters = {facet: st.sidebar.multiselect(label, data.bitmap_index.values(facet), key=f'filter_{facet}',
+                                         placeholder='All')
+           for facet, label in FILTERS.items()}
+data = data.select(filters).window(since, until)
+
+if data.df.empty:
+    prefetcher.cancel(session)
+    st.info('No funding rounds match the selected period and filters.')
 
-if option == 'Overall Analysis':
-    load_overall_analysis(df)
+elif option == 'Overall Analysis':
+    prefetcher.cancel(session)
+    load_overall_analysis(data, approximate)
     # btn1= st.sidebar.button('Load Overall Analysis')
     # if btn1:
-    #     load_overall_analysis(df)
+    #     load_overall_analysis(data)
 
 elif option == 'StartUp':
-    selected_startup = st.sidebar.selectbox('Select StartUp', sorted(df['startup'].unique().tolist()))
-    load_startup_analysis(df, selected_startup)
+    # Only the top matches of the search reach the browser, never the whole list of startups
+    query = st.sidebar.text_input('Search startups', key='startup_query', placeholder='Name, vertical or subvertical')
+    matches = dict(data.startup_search.search(query))
+    listed = list(matches)
+    selected_startup = st.sidebar.selectbox('Select StartUp', listed,
+                                            format_func=lambda name: f"{name} ({matches[name]})" if matches[name] else name)
+    if selected_startup is None:
+        prefetcher.cancel(session)
+        st.info(f"No startup matches '{query}'.")
+    else:
+        section = st.session_state.get('startup_section', next(iter(SECTIONS)))
+        prefetcher.visit(session, startup_page(data, selected_startup, section, approximate))
+        load_startup_analysis(data, selected_startup, approximate=approximate)
+        # While this page is read, render the ones most likely opened next in the background
+        prefetcher.schedule(session, startup_pages(data, selected_startup, listed, section, approximate))
 
 else:
-    selected_investor = st.sidebar.selectbox('Select Investor', sorted(set(df['investors'].str.split(',').sum())))
-    load_investor_details(df, selected_investor)
+    # Matching investors, most active first, with their number of deals
+    vocabulary = data.investor_vocabulary
+    query = st.sidebar.text_input('Search investors', key='investor_query', placeholder='Investor name')
+    listed = data.investor_search.find(query)
+    selected_investor = st.sidebar.selectbox('Select Investor', listed,
+                                             format_func=lambda name: f"{name} ({vocabulary[name]})")
+    if selected_investor is None:
+        prefetcher.cancel(session)
+        st.info(f"No investor matches '{query}'.")
+    else:
+        prefetcher.visit(session, investor_page(data, selected_investor))
+        load_investor_details(data, selected_investor)
+        prefetcher.schedule(session, investor_pages(data, selected_investor, listed))
 
+trace = finish_trace()
+if trace is not None:
+    with st.sidebar.expander('Render timings', expanded=True):
+        st.dataframe(flame_table(trace), hide_index=True)
+        stats = prefetcher.stats()
+        st.caption(f"Prefetch: {stats['hit_rate']:.0%} of {stats['visits']} page visits found ready "
+                   f"({stats['waits']} after waiting); {stats['completed']} pages prefetched, "
+                   f"{stats['cancelled']} cancelled.")
+        st.download_button('Download trace', json.dumps(chrome_trace([trace])), file_name='render_trace.json',
+                           mime='application/json', help='Chrome trace format: open in chrome://tracing or Perfetto.')
@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from investor_index import explode_investor_pairs, build_investor_index, build_investor_vocabulary, investor_rows
+from dataset import DATA_PATH, data_version
 
 st.set_page_config(page_title="Startup Funding Analysis", layout="wide")
 
-df=pd.read_csv('stratup_cleaned.csv')
+df=pd.read_csv(DATA_PATH)
 
 # Convert 'date' column to datetime and extract year
 df['year']=pd.to_datetime(df['date'],errors='coerce').dt.year
@@ -12,6 +14,15 @@ df['year']=pd.to_datetime(df['date'],errors='coerce').dt.year
 # Convert 'date' column to datetime and extract month
 df['month'] = pd.to_datetime(df['date'], errors='coerce').dt.month
 
+# Investor vocabulary and row index, computed once per version of the CSV read above
+# rather than on every rerun
+@st.cache_resource
+def load_investor_index(_df, version):
+    pairs = explode_investor_pairs(_df)
+    return build_investor_vocabulary(pairs), build_investor_index(pairs)
+
+investor_vocabulary, investor_index = load_investor_index(df, data_version(DATA_PATH))
+
 st.sidebar.title('Startup Funding Analysis')
 # data cleaning
 # df['Investors Name']=df['Investors Name'].fillna('Undisclosed')
@@ -83,9 +94,11 @@ def load_overall_analysis():
 
 def load_investor_details(investor):
     st.title(f"Details for Investor: {investor}")
+    # Exact-name rows from the index instead of a substring scan per chart
+    investor_df = investor_rows(df, investor_index, investor)
     
     # load the recent 5 investments of the investor
-    last5_df=df[df['investors'].str.contains(investor)].head()[['date','startup','vertical','city','investors','round','amount']]
+    last5_df=investor_df.head()[['date','startup','vertical','city','investors','round','amount']]
     st.subheader("Most Recent Investments")
     if not last5_df.empty:
         st.dataframe(last5_df)
@@ -95,7 +108,7 @@ def load_investor_details(investor):
     col1, col2 = st.columns(2)
     with col1:
         # Biggest investment
-        big_series = df[df['investors'].str.contains(investor)].groupby('startup')['amount'].sum().sort_values(ascending=False).head()
+        big_series = investor_df.groupby('startup')['amount'].sum().sort_values(ascending=False).head()
 
         st.subheader("Biggest Investment")
         if not big_series.empty:
@@ -106,7 +119,7 @@ def load_investor_details(investor):
             st.write("No data found for this investor.")
     
     with col2:
-        vertical_series = df[df['investors'].str.contains(investor)].groupby('vertical')['amount'].sum()
+        vertical_series = investor_df.groupby('vertical')['amount'].sum()
 
         st.subheader('Sector Invested In')
         fig, ax = plt.subplots()
@@ -118,7 +131,7 @@ def load_investor_details(investor):
 
     # Sector-wise analysis
     with col1:
-        round_series=df[df['investors'].str.contains(investor)].groupby('round')['amount'].sum()
+        round_series=investor_df.groupby('round')['amount'].sum()
 
         st.subheader('Sector-wise Analysis')
         fig, ax = plt.subplots()
@@ -126,7 +139,7 @@ def load_investor_details(investor):
         st.pyplot(fig)
 
     with col2:
-        city_series=df[df['investors'].str.contains(investor)].groupby('city')['amount'].sum()
+        city_series=investor_df.groupby('city')['amount'].sum()
 
         st.subheader('City-wise Analysis')
         fig, ax = plt.subplots()
@@ -135,7 +148,7 @@ def load_investor_details(investor):
 
     
     # Year-wise analysis
-    year_series=df[df['investors'].str.contains(investor)].groupby('year')['amount'].sum()
+    year_series=investor_df.groupby('year')['amount'].sum()
 
     st.subheader('Year-wise Analysis')
     fig2, ax2 = plt.subplots()
@@ -159,7 +172,7 @@ elif option=='StartUp':
     st.title('StartUp Analysis')
 
 else:
-    selected_investor = st.sidebar.selectbox('Select Investor', sorted(set(df['investors'].str.split(',').sum())))
+    selected_investor = st.sidebar.selectbox('Select Investor', investor_vocabulary.index)
     bt2 = st.sidebar.button('Find Investor Details')
     if bt2:
         load_investor_details(selected_investor)
@@ -0,0 +1,261 @@
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from headless import HeadlessStreamlit
+from profiling import finish_trace, span, start_trace, write_chrome_trace
+
+# 10M rows is opt-in (--sizes ... 10000000): generating and indexing it takes more than
+# the 5 GiB of memory a typical CI runner has, where the run is killed
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+VERTICALS = ['FinTech', 'E-commerce', 'EdTech', 'Healthcare', 'Consumer Internet', 'Technology',
+             'Logistics', 'Food & Beverage', 'Transportation', 'SaaS', 'Real Estate', 'Gaming']
+CITIES = ['Bengaluru', 'Mumbai', 'New Delhi', 'Gurugram', 'Pune', 'Hyderabad', 'Chennai', 'Noida',
+          'Kolkata', 'Ahmedabad', 'Jaipur', 'Indore']
+ROUNDS = ['Seed Funding', 'Private Equity', 'Seed / Angel Funding', 'Series A', 'Series B',
+          'Series C', 'Series D', 'Debt Funding', 'Pre-Series A', 'Venture Round']
+ROUND_WEIGHTS = [0.35, 0.3, 0.1, 0.08, 0.05, 0.03, 0.02, 0.03, 0.02, 0.02]
+
+
+def zipf_choice(rng, n_items, size, a=1.05):
+    # Skewed popularity: item k is drawn with probability proportional to 1 / (k + 1) ** a
+    weights = 1.0 / np.arange(1, n_items + 1) ** a
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def pareto_choice(rng, n_items, size, alpha=2.0):
+    # Heavy-tailed but bounded popularity: the busiest startup has hundreds of rounds, not a
+    # fixed share of the whole dataset
+    weights = rng.pareto(alpha, size=n_items) + 1
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def synthetic_funding(rows, seed=0):
+    # A cleaned-schema dataset shaped like stratup_cleaned.csv at an arbitrary size
+    rng = np.random.default_rng(seed)
+    n_startups = max(10, rows // 3)
+    n_investors = max(10, rows // 5)
+
+    startups = np.array([f'Startup {i}' for i in range(n_startups)], dtype=object)
+    investors = np.array([f'Investor {i}' for i in range(n_investors)], dtype=object)
+
+    # Investor lists of 1-6 names, mostly one or two, joined the way the feed joins them
+    lengths = np.minimum(rng.geometric(0.55, size=rows), 6)
+    picks = investors[zipf_choice(rng, n_investors, int(lengths.sum()))]
+    splits = np.cumsum(lengths)[:-1]
+    investor_lists = [', '.join(group) for group in np.split(picks, splits)]
+
+    days = rng.integers(0, (pd.Timestamp('2020-12-31') - pd.Timestamp('2015-01-01')).days, size=rows)
+    amount = np.round(rng.lognormal(mean=14, sigma=1.8, size=rows), -3)
+    amount[rng.random(rows) < 0.3] = 0
+
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2015-01-01') + pd.to_timedelta(days, unit='D'),
+        'startup': startups[pareto_choice(rng, n_startups, rows)],
+        'vertical': rng.choice(VERTICALS, size=rows),
+        'subvertical': rng.choice(['Platform', 'Marketplace', 'Analytics', None], size=rows),
+        'city': rng.choice(CITIES, size=rows),
+        'investors': investor_lists,
+        'round': rng.choice(ROUNDS, size=rows, p=ROUND_WEIGHTS),
+        'amount': amount,
+    })
+    df = df.sort_values('date', ascending=False, ignore_index=True)
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    return df
+
+
+class SectionTimer:
+    # Attributes the time between consecutive st.* calls to the heading that precedes them
+
+    def __init__(self):
+        self.sections = defaultdict(float)
+        self.current = 'page setup'
+        self.last = time.perf_counter()
+
+    def mark(self, name, args):
+        now = time.perf_counter()
+        self.sections[self.current] += now - self.last
+        self.last = now
+        if name in ('title', 'header', 'subheader') and args:
+            self.current = str(args[0])
+        elif name == 'markdown' and args and 'section-header' in str(args[0]):
+            match = re.search(r'>([^<]+)</div>', str(args[0]))
+            self.current = match.group(1).strip() if match else self.current
+
+    def finish(self):
+        self.mark('end', ())
+        return dict(self.sections)
+
+
+class StreamlitStub(HeadlessStreamlit):
+    # The headless stand-in installed as the streamlit module, with every call recorded
+
+    def __init__(self):
+        self.timer = SectionTimer()
+
+    def _call(self, name, *args, **kwargs):
+        self.timer.mark(name, args)
+        return super()._call(name, *args, **kwargs)
+
+
+_stub = None
+
+
+def install_stub():
+    # One stub per process: page modules bind it at import time
+    global _stub
+    if _stub is None:
+        _stub = StreamlitStub()
+        sys.modules['streamlit'] = _stub
+    return _stub
+
+
+def clear_page_caches(chart_cache):
+    from overall_analysis import compute_overall_analysis, compute_overall_timeline
+    from startup_analysis import (compute_startup_analysis, compute_funding_growth, compute_investor_network,
+                                  compute_industry_comparison)
+    from investor_analysis import compute_investor_details, compute_investor_timeline
+
+    chart_cache.clear()
+    for compute in (compute_overall_analysis, compute_overall_timeline, compute_startup_analysis,
+                    compute_funding_growth, compute_investor_network, compute_industry_comparison,
+                    compute_investor_details, compute_investor_timeline):
+        compute.cache_clear()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run_size(rows, seed=0, traces=None):
+    stub = install_stub()
+    from compact import compact_frame
+    from chart_cache import chart_cache
+    from dataset import FundingData, sort_by_date
+    from overall_analysis import load_overall_analysis
+    from startup_analysis import SECTIONS, load_startup_analysis
+    from investor_analysis import load_investor_details
+
+    raw = synthetic_funding(rows, seed)
+    setup = {}
+    df, setup['compact'] = timed(lambda: compact_frame(sort_by_date(raw)))
+    data = FundingData(df, version=f'synthetic-{rows}-{seed}')
+    # Every per-version index, in the order the pages first touch them
+    for name in ['investor_pairs', 'investor_index', 'investor_vocabulary', 'overall_cube', 'startup_index',
+                 'co_investment', 'sketch_cube', 'bitmap_index', 'startup_search', 'investor_search']:
+        _, setup[name] = timed(lambda: getattr(data, name))
+
+    # The heaviest entities are the worst case for their pages
+    top_startup = df['startup'].value_counts().index[0]
+    top_investor = data.investor_vocabulary.index[0]
+    pages = {
+        'overall': lambda: load_overall_analysis(data),
+        # First paint (metrics, profile and the default section) and every section at once
+        'startup': lambda: load_startup_analysis(data, top_startup),
+        'startup_all': lambda: load_startup_analysis(data, top_startup, sections=list(SECTIONS)),
+        'investor': lambda: load_investor_details(data, top_investor),
+    }
+
+    results = {}
+    for page, render in pages.items():
+        # Cold charts and page results each time; section timings come from the untraced run
+        clear_page_caches(chart_cache)
+        stub.timer = SectionTimer()
+        start = time.perf_counter()
+        render()
+        wall = time.perf_counter() - start
+        sections = stub.timer.finish()
+
+        clear_page_caches(chart_cache)
+        tracemalloc.start()
+        render()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[page] = {'wall_seconds': wall, 'peak_bytes': peak, 'sections': sections}
+
+        if traces is not None:
+            # A third cold render with spans on, kept out of the timings above
+            clear_page_caches(chart_cache)
+            start_trace(memory=False)
+            with span(f'{page} @ {rows:,} rows'):
+                render()
+            traces.append(finish_trace())
+    return {'rows': rows, 'setup_seconds': setup, 'pages': results}
+
+
+def compare(current, baseline, threshold):
+    # Flag every page whose wall time grew by more than threshold relative to the baseline
+    regressions = []
+    old = {r['rows']: r for r in baseline['results']}
+    for result in current['results']:
+        if result['rows'] not in old:
+            continue
+        for page, stats in result['pages'].items():
+            before = old[result['rows']]['pages'].get(page, {}).get('wall_seconds')
+            if before and stats['wall_seconds'] > before * (1 + threshold):
+                regressions.append((result['rows'], page, before, stats['wall_seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pages without a Streamlit session.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='synthetic dataset sizes in rows (e.g. 10000 100000 1000000 10000000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='earlier results JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown before flagging (0.2 = 20%%)')
+    parser.add_argument('--trace', help='also write every page render as a Chrome trace to this JSON file')
+    args = parser.parse_args(argv)
+    # Missing emoji glyphs in headless fonts are irrelevant to timings
+    warnings.filterwarnings('ignore', category=UserWarning)
+    warnings.filterwarnings('ignore', category=RuntimeWarning)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+        },
+        'results': [],
+    }
+    traces = [] if args.trace else None
+    for rows in args.sizes:
+        result = run_size(rows, args.seed, traces)
+        report['results'].append(result)
+        for page, stats in result['pages'].items():
+            print(f"{rows:>12,} rows  {page:<9} {stats['wall_seconds'] * 1000:10.1f} ms  "
+                  f"peak {stats['peak_bytes'] / 2 ** 20:8.1f} MiB")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if traces:
+        write_chrome_trace(traces, args.trace)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for rows, page, before, after in regressions:
+            print(f"REGRESSION {page} @ {rows:,} rows: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import sys
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# Text columns indexed value by value; investors come from the exploded (position, investor) pairs
+FACETS = ['vertical', 'city', 'round']
+
+# Rows are split into chunks of 2 ** 16 positions, each stored the cheaper way: a sorted
+# uint16 array (2 bytes per row) while sparse, a fixed 8 KiB bitset once it holds more than
+# ARRAY_LIMIT rows. Same layout as Roaring bitmaps.
+CHUNK_BITS = 16
+CHUNK_ROWS = 1 << CHUNK_BITS
+ARRAY_LIMIT = 4096
+
+# Set bits per byte value, for counting bitset rows without a popcount instruction
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def is_bitset(container):
+    return container.dtype == np.uint64
+
+
+def to_bitset(values):
+    bits = np.zeros(CHUNK_ROWS, dtype=bool)
+    bits[values] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def to_array(words):
+    # nonzero runs markedly faster over bools than over the 0/1 bytes unpackbits returns
+    bits = np.unpackbits(words.view(np.uint8), bitorder='little').view(bool)
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def cardinality(container):
+    return int(POPCOUNT[container.view(np.uint8)].sum()) if is_bitset(container) else len(container)
+
+
+def shrink(words):
+    # A bitset with ARRAY_LIMIT rows or fewer goes back to an array
+    return words if cardinality(words) > ARRAY_LIMIT else to_array(words)
+
+
+def contains(words, values):
+    return ((words[values >> 6] >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def and_containers(a, b):
+    if is_bitset(a) and is_bitset(b):
+        # Intersections are transient (only their positions are used), so they stay bitsets
+        words = a & b
+        return words if words.any() else None
+    if is_bitset(a):
+        a, b = b, a
+    values = a[contains(b, a)] if is_bitset(b) else np.intersect1d(a, b, assume_unique=True)
+    return values if len(values) else None
+
+
+def union_containers(containers):
+    if len(containers) == 1:
+        return containers[0]
+    arrays = [container for container in containers if not is_bitset(container)]
+    bitsets = [container for container in containers if is_bitset(container)]
+    if not bitsets and sum(len(array) for array in arrays) <= ARRAY_LIMIT:
+        # Sort and drop repeats by hand: np.union1d hashes, which is slow on tiny arrays
+        values = np.sort(np.concatenate(arrays))
+        return values[np.concatenate([[True], values[1:] != values[:-1]])]
+    if arrays:
+        bitsets.append(to_bitset(np.concatenate(arrays)))
+    return shrink(reduce(np.bitwise_or, bitsets))
+
+
+def union(bitmaps):
+    # OR of any number of bitmaps, combining every chunk's containers in one go
+    chunks = {}
+    for bitmap in bitmaps:
+        for chunk, container in bitmap.containers.items():
+            chunks.setdefault(chunk, []).append(container)
+    return Bitmap({chunk: union_containers(containers) for chunk, containers in chunks.items()})
+
+
+class Bitmap:
+    # Immutable compressed set of row positions: chunk number -> container
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    def __and__(self, other):
+        containers = {}
+        for chunk in self.containers.keys() & other.containers.keys():
+            container = and_containers(self.containers[chunk], other.containers[chunk])
+            if container is not None:
+                containers[chunk] = container
+        return Bitmap(containers)
+
+    def __or__(self, other):
+        return union([self, other])
+
+    def __len__(self):
+        return sum(cardinality(container) for container in self.containers.values())
+
+    def __bool__(self):
+        return bool(self.containers)
+
+    @property
+    def nbytes(self):
+        return sum(container.nbytes for container in self.containers.values())
+
+    def positions(self):
+        # Sorted row positions, ready for df.iloc
+        if not self.containers:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            (np.int64(chunk) << CHUNK_BITS)
+            + (to_array(container) if is_bitset(container) else container).astype(np.int64)
+            for chunk, container in sorted(self.containers.items())])
+
+
+EMPTY = Bitmap()
+
+
+def value_bitmaps(values, positions):
+    # value -> bitmap of the positions holding it (missing values are left out), all values
+    # built from one sort. Array containers are slices of a single uint16 buffer.
+    codes, uniques = pd.factorize(values, sort=True)
+    keep = codes >= 0
+    # Stable sort keeps positions ascending inside every value's block
+    order = np.argsort(codes[keep], kind='stable')
+    codes, positions = codes[keep][order], positions[keep][order]
+    chunks = positions >> CHUNK_BITS
+    low = (positions & (CHUNK_ROWS - 1)).astype(np.uint16)
+    # One container per run of equal (value, chunk)
+    starts = np.flatnonzero(np.concatenate([[True], (codes[1:] != codes[:-1]) | (chunks[1:] != chunks[:-1])]))
+    ends = np.append(starts[1:], len(codes))
+    containers = [{} for _ in range(len(uniques))]
+    for code, chunk, start, end in zip(codes[starts].tolist(), chunks[starts].tolist(), starts.tolist(),
+                                       ends.tolist()):
+        block = low[start:end]
+        containers[code][chunk] = block if end - start <= ARRAY_LIMIT else to_bitset(block)
+    return {value: Bitmap(chunks) for value, chunks in zip(uniques, containers)}
+
+
+def facet_bitmaps(df, pairs=None, start=0):
+    # One bitmap per distinct value of every facet; pairs as explode_investor_pairs(df, start)
+    positions = np.arange(start, start + len(df), dtype=np.int64)
+    bitmaps = {facet: value_bitmaps(df[facet], positions) for facet in FACETS if facet in df}
+    if pairs is not None:
+        bitmaps['investor'] = value_bitmaps(pairs['investor'], pairs['position'].to_numpy())
+    return bitmaps
+
+
+class BitmapIndex:
+    # Compressed bitmaps per value of vertical, city, round and investor. Any combination of
+    # filters (OR within a facet, AND across facets) resolves to row positions without
+    # touching the frame.
+
+    def __init__(self, df=None, pairs=None, bitmaps=None):
+        self.bitmaps = facet_bitmaps(df, pairs) if df is not None else bitmaps
+
+    def merge(self, delta_df, delta_pairs=None, start=0):
+        # New index covering this one plus delta_df; appended rows only touch the last chunks
+        delta = facet_bitmaps(delta_df, delta_pairs, start)
+        bitmaps = {}
+        for facet, values in self.bitmaps.items():
+            merged = dict(values)
+            for value, bitmap in delta.get(facet, {}).items():
+                merged[value] = merged[value] | bitmap if value in merged else bitmap
+            bitmaps[facet] = merged
+        return BitmapIndex(bitmaps=bitmaps)
+
+    def values(self, facet):
+        # Values of facet, most rows first
+        counts = {value: len(bitmap) for value, bitmap in self.bitmaps[facet].items()}
+        return sorted(counts, key=lambda value: (-counts[value], value))
+
+    def bitmap(self, filters):
+        # filters maps a facet to the values to keep, as in OverallCube; facets without
+        # values are ignored. Returns None when nothing filters the rows.
+        selected = []
+        for facet, values in filters.items():
+            if not values:
+                continue
+            if facet not in self.bitmaps:
+                raise ValueError(f'no bitmap index for {facet}')
+            bitmaps = self.bitmaps[facet]
+            selected.append(union(bitmaps.get(value, EMPTY) for value in values))
+        if not selected:
+            return None
+        # Smallest first, so every AND only visits chunks that can still match
+        selected.sort(key=lambda bitmap: bitmap.nbytes)
+        result = selected[0]
+        for bitmap in selected[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result
+
+    def select(self, filters):
+        bitmap = self.bitmap(filters)
+        return None if bitmap is None else bitmap.positions()
+
+    @property
+    def nbytes(self):
+        return sum(bitmap.nbytes for values in self.bitmaps.values() for bitmap in values.values())
+
+
+def column_scan(df, filters):
+    # The same selection with one comparison per column, what the bitmaps replace
+    mask = pd.Series(True, index=df.index)
+    for facet, values in filters.items():
+        if facet == 'investor':
+            mask &= df['investors'].str.contains('|'.join(values), regex=True)
+        else:
+            mask &= df[facet].isin(values)
+    return np.flatnonzero(mask.to_numpy())
+
+
+def main(argv=None):
+    from dataset import load_funding_data
+
+    parser = argparse.ArgumentParser(description='Build the bitmap indexes and time filter combinations.')
+    parser.add_argument('path', nargs='?', default=None, help='dataset to index (defaults to the app dataset)')
+    parser.add_argument('--repeat', type=int, default=1000, help='timed runs per query')
+    args = parser.parse_args(argv)
+
+    data = load_funding_data(args.path)
+    df = data.df
+    start = time.perf_counter()
+    index = data.bitmap_index
+    size = df.memory_usage(deep=True).sum()
+    print(f"Built bitmaps in {time.perf_counter() - start:.2f}s: "
+          f"{sum(len(values) for values in index.bitmaps.values()):,} values, {index.nbytes / 2 ** 20:.2f} MiB "
+          f"({index.nbytes / size:.1%} of the {size / 2 ** 20:.1f} MiB frame)", file=sys.stderr)
+
+    # The most common values make the largest bitmaps, the slowest case
+    top = {facet: index.values(facet)[:3] for facet in index.bitmaps}
+    queries = {
+        'one vertical': {'vertical': top['vertical'][:1]},
+        'vertical & city': {'vertical': top['vertical'][:1], 'city': top['city'][:1]},
+        'vertical & city & 3 rounds': {'vertical': top['vertical'][:1], 'city': top['city'][:1],
+                                       'round': top['round']},
+    }
+    if 'investor' in top:
+        queries['investor & 3 cities'] = {'investor': top['investor'][:1], 'city': top['city']}
+    for name, filters in queries.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            positions = index.select(filters)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        start = time.perf_counter()
+        for _ in range(max(args.repeat // 10, 1)):
+            column_scan(df, filters)
+        scanned = (time.perf_counter() - start) / max(args.repeat // 10, 1)
+        print(f"{name:<28} {len(positions):>8,} rows  bitmaps {elapsed * 1e6:8.1f} µs  "
+              f"column scan {scanned * 1e6:10.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from memo import record_entry
+from profiling import span
+
+# Upper bound on the rendered image bytes kept in memory by this process
+DEFAULT_BUDGET = int(os.environ.get('CHART_CACHE_BYTES', 64 * 1024 * 1024))
+
+# pyplot keeps one current figure per process, so charts are drawn one at a time even when
+# background threads (see prefetch.py) render pages alongside the sessions
+_draw_lock = threading.Lock()
+
+# Format of every chart rendered by this process. The static export switches to SVG: it
+# skips rasterizing, which is a quarter of an exported page's time, and stays sharp.
+chart_format = 'png'
+
+
+def fingerprint(data):
+    # Content hash of the values a chart is drawn from
+    digest = hashlib.sha1()
+    items = data if isinstance(data, (list, tuple)) else [data]
+    for item in items:
+        if isinstance(item, (pd.Series, pd.DataFrame, pd.Index)):
+            digest.update(pd.util.hash_pandas_object(item).to_numpy().tobytes())
+            names = item.columns if isinstance(item, pd.DataFrame) else [item.name]
+            digest.update(repr(list(names)).encode())
+        else:
+            digest.update(repr(item).encode())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    # LRU of rendered images, evicted by total byte size rather than entry count
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def peek(self, key):
+        # Lookup that leaves the hit/miss counts and the LRU order alone
+        with self._lock:
+            return self._images.get(key)
+
+    def put(self, key, image):
+        if len(image) > self.budget:
+            return
+        with self._lock:
+            if key in self._images:
+                self.size -= len(self._images.pop(key))
+            self._images[key] = image
+            self.size += len(image)
+            while self.size > self.budget:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size = 0
+
+
+chart_cache = ChartCache()
+
+
+def data_rows(data):
+    items = data if isinstance(data, (list, tuple)) else [data]
+    return sum(len(item) for item in items if isinstance(item, (pd.Series, pd.DataFrame, pd.Index)))
+
+
+def render_chart(kind, data, draw, style=None, fmt=None, cache=chart_cache):
+    # draw() builds and returns a matplotlib figure; it only runs on a cache miss
+    fmt = fmt or chart_format
+    with span(f'chart {kind}') as record:
+        key = (kind, fingerprint(data), repr(sorted((style or {}).items())), fmt)
+        record_entry(lambda: cache.peek(key) is not None)
+        image = cache.get(key)
+        record.details['cached'] = image is not None
+        if image is not None:
+            return image
+        record.rows = data_rows(data)
+
+        with _draw_lock:
+            # Another thread may have drawn the same chart while this one waited
+            image = cache.peek(key)
+            if image is None:
+                fig = draw()
+                try:
+                    buffer = io.BytesIO()
+                    fig.savefig(buffer, format=fmt, bbox_inches='tight')
+                    image = buffer.getvalue()
+                finally:
+                    # Figures are always released, even when saving fails
+                    plt.close(fig)
+                cache.put(key, image)
+        return image
@@ -0,0 +1,163 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+UNSEEN = -2
+# Longest chain of co-investment links shortest_path looks for
+MAX_HOPS = 6
+
+
+def expand_ranges(starts, lengths):
+    # Concatenation of arange(start, start + length) for every (start, length), without a loop
+    total = int(lengths.sum())
+    block_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(total) - block_start)
+
+
+class CoInvestmentGraph:
+    # Investor x investor adjacency in CSR form: row i lists the investors that shared at
+    # least one deal with investor i (indices) and how many deals they shared (weights).
+    # Built from the (row position, investor) pairs in one vectorized pass.
+
+    def __init__(self, pairs):
+        self.names = pairs['investor'].cat.categories
+        n = len(self.names)
+        codes = pairs['investor'].cat.codes.to_numpy().astype(np.int64)
+        positions = pairs['position'].to_numpy()
+
+        # Group the pairs by deal; every investor in a deal links to every other one in it
+        order = np.lexsort((codes, positions))
+        codes, positions = codes[order], positions[order]
+        deal_start = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        deal_size = np.diff(np.r_[deal_start, len(positions)])
+        row_deal = np.repeat(np.arange(len(deal_start)), deal_size)
+
+        row_size = deal_size[row_deal]
+        source = np.repeat(np.arange(len(codes)), row_size)
+        target = expand_ranges(deal_start[row_deal], row_size)
+        keep = source != target
+        edges = codes[source[keep]] * n + codes[target[keep]]
+
+        # Duplicate edges (the same two investors in several deals) collapse into a weight
+        edges, weights = np.unique(edges, return_counts=True)
+        self.indices = edges % n
+        self.weights = weights
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(edges // n, minlength=n))])
+        self.deals = np.bincount(codes, minlength=n)
+
+    def code(self, investor):
+        try:
+            return self.names.get_loc(investor)
+        except KeyError:
+            return None
+
+    def neighbours(self, code):
+        return self.indices[self.indptr[code]:self.indptr[code + 1]], self.weights[self.indptr[code]:self.indptr[code + 1]]
+
+    def co_investors(self, investor, n=10):
+        # Investors sharing the most deals with investor, strongest first (ties alphabetical)
+        code = self.code(investor)
+        if code is None:
+            return pd.Series(dtype=np.int64, name='shared_deals')
+        indices, weights = self.neighbours(code)
+        top = np.lexsort((indices, -weights))[:n]
+        return pd.Series(weights[top], index=self.names[indices[top]], name='shared_deals')
+
+    def related_investors(self, investors, n=5):
+        # Strongest co-investors of a group (e.g. one startup's backers) outside the group
+        codes = np.array([c for c in map(self.code, investors) if c is not None], dtype=np.int64)
+        if len(codes) == 0:
+            return pd.Series(dtype=np.int64, name='shared_deals')
+        lengths = self.indptr[codes + 1] - self.indptr[codes]
+        slots = expand_ranges(self.indptr[codes], lengths)
+        totals = np.bincount(self.indices[slots], weights=self.weights[slots], minlength=len(self.names))
+        totals[codes] = 0
+        candidates = np.flatnonzero(totals)
+        top = candidates[np.lexsort((candidates, -totals[candidates]))[:n]]
+        return pd.Series(totals[top].astype(np.int64), index=self.names[top], name='shared_deals')
+
+    def expand(self, frontier):
+        # All neighbours of a frontier of codes, with the code they were reached from
+        lengths = self.indptr[frontier + 1] - self.indptr[frontier]
+        slots = expand_ranges(self.indptr[frontier], lengths)
+        return self.indices[slots], np.repeat(frontier, lengths)
+
+    def shortest_path(self, source, target, max_hops=MAX_HOPS):
+        # Fewest-hops chain of co-investments linking two investors, or None. Searches
+        # from both ends at once, always growing the smaller frontier.
+        start, goal = self.code(source), self.code(target)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [source]
+        # parent code per side: UNSEEN until reached, -1 at the two ends
+        parents = np.full((2, len(self.names)), UNSEEN)
+        parents[0, start] = parents[1, goal] = -1
+        frontiers = [np.array([start]), np.array([goal])]
+        for _ in range(max_hops):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            reached, via = self.expand(frontiers[side])
+            fresh = parents[side, reached] == UNSEEN
+            reached, first = np.unique(reached[fresh], return_index=True)
+            if len(reached) == 0:
+                return None
+            parents[side, reached] = via[fresh][first]
+            meet = reached[parents[1 - side, reached] != UNSEEN]
+            if len(meet):
+                return self._join(parents, meet[0])
+            frontiers[side] = reached
+        return None
+
+    def _join(self, parents, meet):
+        path = []
+        node = meet
+        while node != -1:
+            path.append(node)
+            node = parents[0, node]
+        path.reverse()
+        node = parents[1, meet]
+        while node != -1:
+            path.append(node)
+            node = parents[1, node]
+        return list(self.names[path])
+
+    @cached_property
+    def components(self):
+        # Connected cluster label of every investor: min-label propagation with pointer
+        # jumping, a handful of vectorized sweeps even on large graphs
+        n = len(self.names)
+        labels = np.arange(n)
+        linked = np.flatnonzero(np.diff(self.indptr))
+        while True:
+            candidate = labels.copy()
+            nearest = np.minimum.reduceat(labels[self.indices], self.indptr[linked]) if len(linked) else linked
+            candidate[linked] = np.minimum(candidate[linked], nearest)
+            candidate = candidate[candidate]
+            if np.array_equal(candidate, labels):
+                return labels
+            labels = candidate
+
+    @cached_property
+    def cluster_sizes(self):
+        return np.bincount(self.components, minlength=len(self.names))
+
+    def cluster_size(self, investor):
+        code = self.code(investor)
+        return 0 if code is None else int(self.cluster_sizes[self.components[code]])
+
+    def cluster_members(self, investor, n=None):
+        # Investors in the same connected cluster, most active first
+        code = self.code(investor)
+        if code is None:
+            return pd.Series(dtype=np.int64, name='deals')
+        members = np.flatnonzero(self.components == self.components[code])
+        members = members[np.lexsort((members, -self.deals[members]))][:n]
+        return pd.Series(self.deals[members], index=self.names[members], name='deals')
+
+    def largest_clusters(self, n=10):
+        # Size and most active member of the biggest clusters
+        labels = np.flatnonzero(self.cluster_sizes)
+        labels = labels[np.argsort(-self.cluster_sizes[labels], kind='stable')][:n]
+        leaders = [self.cluster_members(self.names[label], 1).index[0] for label in labels]
+        return pd.Series(self.cluster_sizes[labels], index=pd.Index(leaders, name='leader'), name='investors')
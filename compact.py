@@ -0,0 +1,80 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORICAL_RATIO = 0.5
+
+
+def frame_memory(df):
+    # Deep per-column footprint in bytes (counts the Python string payloads too)
+    return df.memory_usage(deep=True, index=False)
+
+
+def compact_amount(amount):
+    # Undisclosed rounds (missing or 0) are flagged explicitly; the amount itself is stored
+    # in the smallest signed integer that holds every value exactly, or left as float64
+    undisclosed = amount.isna() | (amount == 0)
+    filled = amount.fillna(0)
+    if len(filled) and (filled % 1 == 0).all():
+        filled = pd.to_numeric(filled.astype(np.int64), downcast='integer')
+        # int8/int16 would overflow on the first sum; int32 is the floor
+        if filled.dtype.itemsize < 4:
+            filled = filled.astype(np.int32)
+    return filled, undisclosed
+
+
+def compact_frame(df):
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column == 'date' and not pd.api.types.is_datetime64_any_dtype(series):
+            df[column] = pd.to_datetime(series, errors='coerce')
+        elif column == 'year':
+            df[column] = series.astype('Int16' if series.isna().any() else np.int16)
+        elif column == 'month':
+            df[column] = series.astype('Int8' if series.isna().any() else np.int8)
+        elif column == 'amount':
+            df[column], df['undisclosed'] = compact_amount(series)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if series.nunique() <= CATEGORICAL_RATIO * len(series):
+                df[column] = series.astype('category')
+    return df
+
+
+def append_frame(df, delta):
+    # Concatenate two compacted frames, unioning categorical dictionaries so the result
+    # keeps the compact dtypes instead of falling back to object columns
+    delta = delta.reindex(columns=df.columns)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            categories = df[column].cat.categories.union(pd.Index(delta[column].dropna().unique()))
+            df = df.assign(**{column: df[column].cat.set_categories(categories)})
+            delta = delta.assign(**{column: pd.Categorical(delta[column], categories=categories)})
+    # Numeric columns widen to the common type (e.g. int32 amounts meeting an int64 delta)
+    return pd.concat([df, delta], ignore_index=True)
+
+
+def memory_report(before, after):
+    report = pd.DataFrame({'before': frame_memory(before), 'after': frame_memory(after)}).fillna(0)
+    report.loc['total'] = report.sum()
+    report['ratio'] = report['after'] / report['before']
+    return report
+
+
+def main(argv=None):
+    from dataset import read_dataset
+
+    parser = argparse.ArgumentParser(description='Report the memory saved by compacting the dataset.')
+    parser.add_argument('path', nargs='?', default=None, help='dataset to load (defaults to the app dataset)')
+    args = parser.parse_args(argv)
+
+    df = read_dataset(args.path)
+    print(memory_report(df, compact_frame(df)).to_string(float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+from compact import compact_frame, append_frame
+from entities import apply_entities, entities_path, load_entities
+from investor_index import (explode_investor_pairs, build_investor_index, build_investor_vocabulary,
+                            append_investor_pairs, merge_investor_index, merge_investor_vocabulary)
+from co_investment import CoInvestmentGraph
+from overall_cube import OverallCube
+from sketches import SketchCube
+from schema import MAX_REJECTED_SHARE, empty_report, merge_reports, validate_frame
+from search_index import StartupSearch, TrigramIndex
+from startup_index import StartupIndex
+
+DATA_PATH = 'stratup_cleaned.csv'
+PARQUET_PATH = 'stratup_cleaned.parquet'
+
+# Columns of the cleaned dataset, as written by ingest.py
+COLUMNS = ['date', 'startup', 'vertical', 'subvertical', 'city', 'investors', 'round', 'amount']
+# Derived from 'date' at ingest time (Parquet) or at load time (CSV)
+DERIVED_COLUMNS = ['year', 'month']
+# Low-cardinality text columns stored dictionary-encoded and loaded as categoricals
+CATEGORICAL_COLUMNS = ['startup', 'vertical', 'city', 'round']
+# Date windows and facet selections kept per FundingData, each with its own lazily built indexes
+SUBSET_ENTRIES = 8
+
+
+def resolve_data_path():
+    # Prefer the typed columnar file when the ingest has produced one
+    return PARQUET_PATH if os.path.exists(PARQUET_PATH) else DATA_PATH
+
+
+def data_version(path=None):
+    # Changes whenever the dataset file or its entity mapping is rewritten, invalidating
+    # every cache keyed on it
+    path = path or resolve_data_path()
+    stat = os.stat(path)
+    version = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if os.path.exists(entities_path(path)):
+        entities = os.stat(entities_path(path))
+        version += f"-{entities.st_mtime_ns}"
+    return version
+
+
+def arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('date', pa.timestamp('ns')),
+        ('startup', pa.string()),
+        ('vertical', pa.string()),
+        ('subvertical', pa.string()),
+        ('city', pa.string()),
+        ('investors', pa.string()),
+        ('round', pa.string()),
+        ('amount', pa.float64()),
+        ('year', pa.int16()),
+        ('month', pa.int8()),
+    ])
+
+
+def add_date_parts(df, date):
+    df['year'] = date.dt.year.astype('Int16' if date.isna().any() else 'int16')
+    df['month'] = date.dt.month.astype('Int8' if date.isna().any() else 'int8')
+    return df
+
+
+def read_dataset(path=None, columns=None, start=0, resolve=True):
+    # Load only the requested columns; None loads everything. start skips the first rows,
+    # which is how appended rows are read: Parquet skips whole row groups of history, while
+    # CSV still tokenizes the skipped lines and only avoids building frames from them.
+    # Startup and investor names are mapped to their canonical spelling unless resolve is False.
+    path = path or resolve_data_path()
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        wanted = None if columns is None else list(columns)
+        dictionary = [c for c in CATEGORICAL_COLUMNS if wanted is None or c in wanted]
+        if not start:
+            df = pq.read_table(path, columns=wanted, read_dictionary=dictionary).to_pandas()
+        else:
+            # Only read the row groups that hold rows at or after start
+            parquet = pq.ParquetFile(path, read_dictionary=dictionary)
+            ends = np.cumsum([parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)])
+            first = int(np.searchsorted(ends, start, side='right'))
+            skip = start - (ends[first - 1] if first else 0)
+            table = parquet.read_row_groups(range(first, len(ends)), columns=wanted)
+            df = table.slice(skip).to_pandas()
+    else:
+        # CSV fallback: parse every date once and derive year/month from it
+        needed = None
+        if columns is not None:
+            needed = [c for c in COLUMNS
+                      if c in columns or (c == 'date' and set(DERIVED_COLUMNS) & set(columns))]
+        df = pd.read_csv(path, usecols=needed, skiprows=range(1, start + 1))
+        if 'date' in df:
+            df['date'] = pd.to_datetime(df['date'], errors='coerce')
+            df = add_date_parts(df, df['date'])
+        if columns is not None:
+            df = df[list(columns)]
+    return apply_entities(df, load_entities(path)) if resolve else df
+
+
+def sort_by_date(df):
+    # Rows in date order (ties keep their stored order), so any date window is one slice
+    if 'date' not in df or df['date'].is_monotonic_increasing:
+        return df
+    return df.sort_values('date', kind='stable', ignore_index=True)
+
+
+def date_bound(dates, day):
+    # day as a datetime64 in the unit of dates, so searchsorted compares like with like
+    return np.datetime64(pd.Timestamp(day)).astype(dates.dtype)
+
+
+class FundingData:
+    # One loaded version of the dataset together with the indexes derived from it. Indexes
+    # are built on first use and shared by every page, session and consumer of this object.
+    # When the frame has a date column its rows are in date order (see sort_by_date).
+
+    def __init__(self, df, version, columns=None, rejected=None, source_rows=None, key=None):
+        self.df = df
+        self.version = version
+        self.columns = columns
+        # Subsets (see subset) extend their parent's key with what selected them
+        self.key = key or (version, columns)
+        # Schema violations dropped at load time (see schema.validate_rows), and how many
+        # rows the stored dataset had, rejected ones included
+        self.rejected = rejected if rejected is not None else empty_report()
+        self.source_rows = source_rows if source_rows is not None else len(df)
+        self._subsets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def subset(self, tag, positions):
+        # The rows at the sorted positions as a FundingData of their own, cached under tag
+        with self._lock:
+            view = self._subsets.get(tag)
+            if view is None:
+                view = FundingData(self.df.iloc[positions].reset_index(drop=True), self.version, self.columns,
+                                   self.rejected, self.source_rows, key=self.key + (tag,))
+                self._subsets[tag] = view
+                while len(self._subsets) > SUBSET_ENTRIES:
+                    self._subsets.popitem(last=False)
+            self._subsets.move_to_end(tag)
+            return view
+
+    def window(self, start=None, end=None):
+        # Rows dated start..end (inclusive days; None leaves that side open) as a FundingData
+        # of their own, whose indexes only cover the window. Two binary searches find the
+        # slice, so the cost follows the window's size rather than the whole history.
+        dates = self.df['date'].to_numpy()
+        lo = 0 if start is None else int(np.searchsorted(dates, date_bound(dates, start), side='left'))
+        hi = len(dates) if end is None else int(
+            np.searchsorted(dates, date_bound(dates, pd.Timestamp(end) + pd.Timedelta(days=1)), side='left'))
+        if lo == 0 and hi == len(dates):
+            return self
+        return self.subset(('window', lo, max(lo, hi)), slice(lo, max(lo, hi)))
+
+    def select(self, filters):
+        # Rows matching filters ({'vertical': [...], 'city': [...], 'round': [...], 'investor': [...]};
+        # any value within a facet, every facet given) as a FundingData of their own. The
+        # bitmap index resolves the combination; the frame is only touched to take the rows.
+        filters = {facet: sorted(values) for facet, values in filters.items() if values}
+        if not filters:
+            return self
+        tag = ('select',) + tuple((facet, tuple(values)) for facet, values in sorted(filters.items()))
+        with self._lock:
+            view = self._subsets.get(tag)
+        return view if view is not None else self.subset(tag, self.bitmap_index.select(filters))
+
+    def in_date_order(self, delta):
+        # Whether delta can be appended without breaking date order: nothing in it predates
+        # the latest row already loaded
+        if 'date' not in self.df or self.df.empty:
+            return True
+        dates = pd.to_datetime(delta['date'], errors='coerce') if 'date' in delta else None
+        return dates is None or not (dates.min() < self.df['date'].iloc[-1])
+
+    @cached_property
+    def investor_pairs(self):
+        return explode_investor_pairs(self.df)
+
+    @cached_property
+    def investor_index(self):
+        return build_investor_index(self.investor_pairs)
+
+    @cached_property
+    def investor_vocabulary(self):
+        return build_investor_vocabulary(self.investor_pairs)
+
+    @cached_property
+    def co_investment(self):
+        return CoInvestmentGraph(self.investor_pairs)
+
+    @cached_property
+    def sketch_cube(self):
+        # Investor sketches only when the investors column is loaded
+        return SketchCube(self.df, self.investor_pairs if 'investors' in self.df else None)
+
+    @cached_property
+    def bitmap_index(self):
+        # Investor bitmaps only when the investors column is loaded
+        return BitmapIndex(self.df, self.investor_pairs if 'investors' in self.df else None)
+
+    @cached_property
+    def startup_index(self):
+        return StartupIndex(self.df)
+
+    @cached_property
+    def overall_cube(self):
+        return OverallCube(self.df)
+
+    @cached_property
+    def startup_search(self):
+        return StartupSearch(self.df, self.startup_index)
+
+    @cached_property
+    def investor_search(self):
+        vocabulary = self.investor_vocabulary
+        return TrigramIndex(vocabulary.index, vocabulary.to_numpy())
+
+    def built(self, name):
+        # Whether the lazily built index called name has been materialised yet
+        return name in self.__dict__
+
+    def append(self, delta, version):
+        # New FundingData with delta's rows appended. Indexes already built here are
+        # carried over by merging the delta into them; the rest stay lazy.
+        start = len(self.df)
+        source_rows = self.source_rows + len(delta)
+        # The rejection budget covers the whole dataset, so one bad row in a small delta is fine
+        budget = MAX_REJECTED_SHARE * source_rows - (self.source_rows - len(self.df))
+        delta, rejected = validate_frame(delta, required=self.columns, offset=self.source_rows,
+                                         max_rejected=budget)
+        if not self.in_date_order(delta):
+            raise ValueError('appended rows predate the loaded ones; reload the dataset instead')
+        df = append_frame(self.df, compact_frame(sort_by_date(delta)))
+        data = FundingData(df, version, self.columns, merge_reports(self.rejected, rejected), source_rows)
+        new_rows = df.iloc[start:]
+
+        delta_pairs = None
+        if self.built('investor_pairs'):
+            delta_pairs = explode_investor_pairs(new_rows, start)
+            data.__dict__['investor_pairs'] = append_investor_pairs(self.investor_pairs, delta_pairs)
+            if self.built('investor_index'):
+                data.__dict__['investor_index'] = merge_investor_index(self.investor_index, delta_pairs)
+            if self.built('investor_vocabulary'):
+                data.__dict__['investor_vocabulary'] = merge_investor_vocabulary(self.investor_vocabulary, delta_pairs)
+        if self.built('overall_cube'):
+            data.__dict__['overall_cube'] = self.overall_cube.merge(new_rows)
+        if self.built('sketch_cube'):
+            # Built with investor pairs exactly when the investors column is loaded
+            data.__dict__['sketch_cube'] = self.sketch_cube.merge(new_rows, delta_pairs, start)
+        if self.built('bitmap_index'):
+            data.__dict__['bitmap_index'] = self.bitmap_index.merge(new_rows, delta_pairs, start)
+        if self.built('startup_index'):
+            data.__dict__['startup_index'] = self.startup_index.append(df, start)
+        return data
+
+
+def load_funding_data(path=None, columns=None):
+    # Read, validate, sort, compact and wrap the dataset; callers cache the result per data version
+    path = path or resolve_data_path()
+    df = read_dataset(path, columns)
+    rows = len(df)
+    df, rejected = validate_frame(df, required=columns or COLUMNS)
+    return FundingData(compact_frame(sort_by_date(df)), data_version(path), columns, rejected, rows)
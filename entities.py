@@ -0,0 +1,294 @@
+import argparse
+import difflib
+import os
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Tokens that do not tell two entities apart: legal forms and honorifics. Regional
+# qualifiers are not among them: "Sequoia Capital India" is a firm of its own.
+FILLER_TOKENS = {'pvt', 'private', 'ltd', 'limited', 'llp', 'llc', 'inc', 'corp', 'co', 'company', 'the',
+                 'dr', 'mr', 'mrs', 'ms'}
+# Apostrophes, quotes and the like that the feed uses interchangeably or drops
+QUOTES = "'\"`´‘’‚‛“”„"
+# Buckets larger than this are too common to discriminate and are skipped
+MAX_BLOCK = 50
+# Fuzzy matching only applies to keys at least this long; short names differ by design (Ola/Olx)
+MIN_FUZZY_LENGTH = 6
+# Shortest token a typo is recognised in
+MIN_TYPO_LENGTH = 4
+# Similarity from which a pair that is not a plain typo is listed for review
+DEFAULT_THRESHOLD = 0.92
+
+ESCAPED_BYTES = re.compile(r'(?:\\+x[0-9a-fA-F]{2})+')
+
+
+def decode_escapes(name):
+    # The raw feed stores some UTF-8 as literal escapes: "Byju\\xe2\\x80\\x99s" -> "Byju’s"
+    def decode(match):
+        hex_digits = re.findall(r'x([0-9a-fA-F]{2})', match.group())
+        return bytes(int(h, 16) for h in hex_digits).decode('utf-8', errors='ignore')
+    name = ESCAPED_BYTES.sub(decode, name)
+    return re.sub(r'\\+n', ' ', re.sub(r"\\+(['\"])", r'\1', name))
+
+
+def display_name(name):
+    # Readable spelling of a raw name: escapes decoded, stray quotes and spacing removed
+    name = unicodedata.normalize('NFKC', decode_escapes(name))
+    return ' '.join(name.strip(QUOTES + ' ').split())
+
+
+def name_tokens(name):
+    # Words of a name with case, punctuation, apostrophes and filler tokens ignored
+    text = display_name(name).casefold()
+    text = re.sub(f'[{QUOTES}]', '', text).replace('&', ' and ')
+    tokens = [t for t in re.split(r'[^0-9a-z]+', text) if t]
+    # A name made only of filler tokens keeps them rather than collapsing to nothing
+    return [t for t in tokens if t not in FILLER_TOKENS] or tokens
+
+
+def normalize_name(name):
+    # Matching key: the tokens run together, so spacing is ignored too ("Ola Cabs" / "Olacabs")
+    return ''.join(name_tokens(name))
+
+
+def is_typo(a, b):
+    # One slip of the keyboard: two adjacent letters swapped, or a letter doubled or
+    # undoubled. A letter added, dropped or changed otherwise may well be another name
+    # ("IvyCamp" / "IvyCap", "Uniqorn" / "Unicorn", "DG" / "IDG").
+    if min(len(a), len(b)) < MIN_TYPO_LENGTH or a == b:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    if len(longer) != len(shorter) + 1:
+        return False
+    i = next((i for i in range(len(shorter)) if longer[i] != shorter[i]), len(shorter))
+    return (longer[:i] + longer[i + 1:] == shorter
+            and longer[i] in longer[max(i - 1, 0):i] + longer[i + 1:i + 2])
+
+
+def typo_variant(a, b):
+    # Token lists that agree everywhere except one token, which is a typo of the other's
+    if len(a) != len(b):
+        return False
+    different = [(x, y) for x, y in zip(a, b) if x != y]
+    return len(different) == 1 and is_typo(*different[0])
+
+
+def deletion_keys(key):
+    # The key and every variant with one character removed. Two keys within one edit
+    # (insert, delete, substitute, swap) of each other always share at least one of these.
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def candidate_pairs(keys):
+    # Pairs of keys sharing a deletion bucket; only these are compared, which keeps
+    # matching near-linear instead of all-pairs
+    ids, buckets = [], []
+    for i, key in enumerate(keys):
+        if len(key) < MIN_FUZZY_LENGTH:
+            continue
+        variants = deletion_keys(key)
+        ids.extend([i] * len(variants))
+        buckets.extend(variants)
+    members = pd.DataFrame({'id': ids, 'bucket': buckets})
+    sizes = members.groupby('bucket')['id'].transform('size')
+    members = members[(sizes > 1) & (sizes <= MAX_BLOCK)].sort_values(['bucket', 'id'])
+
+    # Every pair inside each bucket, generated bucket-size by bucket-size without a loop per bucket
+    pairs = []
+    sizes = sizes[members.index].to_numpy()
+    member_ids = members['id'].to_numpy()
+    for size in np.unique(sizes):
+        block_ids = member_ids[sizes == size].reshape(-1, size)
+        left, right = np.triu_indices(size, k=1)
+        pairs.append(block_ids[:, left].ravel() * len(keys) + block_ids[:, right].ravel())
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pair_codes = np.unique(np.concatenate(pairs))
+    return np.column_stack([pair_codes // len(keys), pair_codes % len(keys)])
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def resolve_names(counts, threshold=DEFAULT_THRESHOLD):
+    # counts: occurrences per raw name. Returns one row per raw name with its entity id and
+    # canonical spelling (the most frequent readable spelling in the entity), and the
+    # similar pairs that were not merged, for a person to review.
+    names = pd.DataFrame({'name': counts.index.astype(str), 'count': counts.to_numpy()})
+    names['display'] = names['name'].map(display_name)
+    names['tokens'] = names['name'].map(name_tokens)
+    names['key'] = names['tokens'].map(''.join)
+
+    # Exact key matches need no comparison at all
+    keys = names['key'].unique()
+    key_ids = pd.Series(np.arange(len(keys)), index=keys)
+    parent = np.arange(len(keys))
+    # Most frequent spelling and tokens of every key, for the checks and the review list
+    representative = names.sort_values('count', ascending=False, kind='stable').drop_duplicates('key').set_index('key')
+
+    # Fuzzy matches between distinct keys, only within deletion buckets. Only typos merge;
+    # every other close pair is left apart and listed.
+    review = []
+    for left, right in candidate_pairs(keys):
+        # Digits must agree exactly ("Fund 1" / "Fund 11")
+        if re.sub(r'\D', '', keys[left]) != re.sub(r'\D', '', keys[right]):
+            continue
+        a, b = representative.loc[keys[left]], representative.loc[keys[right]]
+        if typo_variant(a['tokens'], b['tokens']):
+            parent[find(parent, left)] = find(parent, right)
+        elif (score := similarity(keys[left], keys[right])) >= threshold:
+            review.append((a['display'], b['display'], score))
+
+    roots = np.array([find(parent, i) for i in range(len(keys))])
+    names['entity_id'] = pd.factorize(roots[key_ids[names['key']].to_numpy()])[0]
+
+    # Ties go to the spelling whose key is most common, so a one-off typo is never chosen
+    names['key_count'] = names.groupby('key')['count'].transform('sum')
+    spelling = (names.groupby(['entity_id', 'display']).agg(count=('count', 'sum'), key_count=('key_count', 'max'))
+                .reset_index()
+                .sort_values(['entity_id', 'count', 'key_count', 'display'], ascending=[True, False, False, True]))
+    canonical = spelling.drop_duplicates('entity_id').set_index('entity_id')['display']
+    names['canonical'] = names['entity_id'].map(canonical)
+    review = pd.DataFrame(review, columns=['name', 'candidate', 'similarity'])
+    return names[['name', 'canonical', 'entity_id']], review.sort_values('similarity', ascending=False, ignore_index=True)
+
+
+def entities_path(path):
+    return f"{os.path.splitext(path)[0]}.entities.csv"
+
+
+def review_path(path):
+    return f"{os.path.splitext(path)[0]}.entities.review.csv"
+
+
+def build_entities(df, threshold=DEFAULT_THRESHOLD):
+    # Canonical-ID mapping for startups and investors in a raw (unresolved) dataset, and
+    # the close pairs left for review. Only names that change are kept in the mapping;
+    # everything else maps to itself.
+    from investor_index import split_investors
+
+    frames, reviews = [], []
+    for kind, values in (('startup', df['startup'].dropna().astype(str)),
+                         ('investor', split_investors(df['investors'].astype(object)))):
+        resolved, review = resolve_names(values.value_counts(), threshold)
+        resolved.insert(0, 'kind', kind)
+        review.insert(0, 'kind', kind)
+        frames.append(resolved[resolved['name'] != resolved['canonical']])
+        reviews.append(review)
+    return pd.concat(frames, ignore_index=True), pd.concat(reviews, ignore_index=True)
+
+
+def write_entities(path, threshold=DEFAULT_THRESHOLD):
+    # Resolve the dataset at path from its raw names and write the mapping next to it, with
+    # the close pairs left for review. Merges a person copied in from an earlier review list
+    # are kept; nothing on the new review list is applied until someone does the same.
+    from dataset import read_dataset
+
+    mapping, review = build_entities(read_dataset(path, ('startup', 'investors'), resolve=False), threshold)
+    try:
+        previous = pd.read_csv(entities_path(path), dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        previous = None
+    if previous is not None:
+        known = pd.MultiIndex.from_frame(mapping[['kind', 'name']])
+        kept = previous[~pd.MultiIndex.from_frame(previous[['kind', 'name']]).isin(known)]
+        mapping = pd.concat([mapping, kept.reindex(columns=mapping.columns)], ignore_index=True)
+    tmp_path = f"{entities_path(path)}.tmp"
+    mapping.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, entities_path(path))
+    review.to_csv(review_path(path), index=False)
+    return mapping, review
+
+
+def load_entities(path):
+    # Persisted mapping next to the dataset, as {kind: {raw name: canonical name}}
+    try:
+        mapping = pd.read_csv(entities_path(path), dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        return None
+    return {kind: dict(zip(group['name'], group['canonical'])) for kind, group in mapping.groupby('kind')}
+
+
+def apply_entities(df, entities):
+    # Rewrite startup and investor names to their canonical spelling
+    if not entities:
+        return df
+    startups = entities.get('startup')
+    if startups and 'startup' in df:
+        column = df['startup']
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Map the dictionary only; categories that merge collapse into one
+            codes = column.cat.codes.to_numpy()
+            new_codes, categories = pd.factorize(column.cat.categories.to_series().map(startups).fillna(column.cat.categories.to_series()), sort=True)
+            df = df.assign(startup=pd.Categorical.from_codes(np.where(codes >= 0, new_codes[codes], -1), categories))
+        else:
+            df = df.assign(startup=column.map(startups).fillna(column))
+
+    investors = entities.get('investor')
+    if investors and 'investors' in df:
+        # Rewrite each distinct investor list once; most lists repeat across rounds
+        lists = pd.Series(df['investors'].dropna().unique())
+        parts = lists.str.split(',').explode()
+        stripped = parts.str.strip()
+        renamed = stripped.map(investors)
+        touched = renamed.notna().groupby(level=0).any()
+        if touched.any():
+            parts = parts.where(renamed.isna(), ' ' + renamed)
+            rewritten = parts[touched.reindex(parts.index).to_numpy()].groupby(level=0).agg(','.join).str.strip()
+            column = df['investors']
+            rewrites = dict(zip(lists[rewritten.index], rewritten.to_numpy()))
+            df = df.assign(investors=column.map(rewrites).fillna(column))
+    return df
+
+
+def main(argv=None):
+    from dataset import read_dataset, resolve_data_path
+
+    parser = argparse.ArgumentParser(description='Resolve spelling variants of startup and investor names.')
+    parser.add_argument('path', nargs='?', default=None, help='dataset to resolve (defaults to the app dataset)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='minimum similarity (0-1) for a pair that is not a typo to be listed for review')
+    parser.add_argument('--dry-run', action='store_true', help='print the merges without writing any file')
+    args = parser.parse_args(argv)
+
+    path = args.path or resolve_data_path()
+    start = time.perf_counter()
+    # Resolve from the raw names, not from a previous mapping
+    if args.dry_run:
+        mapping, review = build_entities(read_dataset(path, ('startup', 'investors'), resolve=False),
+                                         args.threshold)
+    else:
+        mapping, review = write_entities(path, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    for kind, group in mapping.groupby('kind'):
+        print(f"{kind}: {len(group):,} names folded into {group['canonical'].nunique():,} canonical entities",
+              file=sys.stderr)
+        for canonical, variants in group.groupby('canonical')['name']:
+            print(f"  {canonical} <- {' | '.join(variants)}")
+    print(f"Resolved in {elapsed:.2f}s; {len(review):,} similar pairs left apart for review", file=sys.stderr)
+    if not args.dry_run:
+        # The mapping is applied on the next load: copy any reviewed pair that is one
+        # entity into it before publishing it with the dataset
+        print(f"Wrote {entities_path(path)} and the review list {review_path(path)}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
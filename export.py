@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import html
+import multiprocessing
+import os
+import re
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+from dataset import load_funding_data
+
+PAGE_STYLE = """
+body { font-family: sans-serif; margin: 2rem auto; max-width: 1200px; color: #222; }
+.row { display: flex; gap: 1.5rem; }
+.row > .column { flex: 1; min-width: 0; }
+.metric { padding: 0.5rem 0; }
+.metric .label { font-size: 0.85rem; color: #555; }
+.metric .value { font-size: 1.8rem; }
+.metric .delta { font-size: 0.85rem; color: #2ca02c; }
+.alert { padding: 0.75rem 1rem; border-radius: 6px; margin: 0.5rem 0; }
+.alert.error { background: #fde8e8; }
+.alert.success { background: #e6f4ea; }
+img { max-width: 100%; }
+table.dataframe { border-collapse: collapse; font-size: 0.9rem; }
+table.dataframe td, table.dataframe th { border: 1px solid #ddd; padding: 0.25rem 0.5rem; }
+"""
+
+
+PNG_SIGNATURE = b'\x89PNG'
+
+
+def slugify(name):
+    # Filesystem-safe, collision-free file name for a startup or investor
+    text = re.sub(r'[^A-Za-z0-9]+', '-', str(name)).strip('-')[:60] or 'page'
+    return f"{text}-{hashlib.sha1(str(name).encode()).hexdigest()[:8]}"
+
+
+def inline_markdown(text):
+    # The small subset of markdown the page renderers write without unsafe_allow_html
+    lines = []
+    for line in html.escape(text.strip()).splitlines():
+        line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', line)
+        heading = re.match(r'(#{1,6})\s+(.*)', line)
+        lines.append(f"<h{len(heading.group(1))}>{heading.group(2)}</h{len(heading.group(1))}>"
+                     if heading else f"<p>{line}</p>")
+    return '\n'.join(lines)
+
+
+class HtmlContainer:
+    # A block of the page (the page itself, a column, an expander) collecting HTML fragments
+
+    def __init__(self, page):
+        self.page = page
+        self.parts = []
+
+    def __enter__(self):
+        self.page.stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.page.stack.pop()
+        return False
+
+    def html(self):
+        return '\n'.join(part.html() if isinstance(part, HtmlContainer) else part for part in self.parts)
+
+
+class HtmlGroup(HtmlContainer):
+    def __init__(self, page, tag, children):
+        super().__init__(page)
+        self.tag = tag
+        self.children = children
+
+    def html(self):
+        inner = '\n'.join(f'<div class="column">{child.html()}</div>' for child in self.children)
+        return f'<div class="{self.tag}">{inner}</div>'
+
+
+class HtmlExpander(HtmlContainer):
+    def __init__(self, page, label, expanded):
+        super().__init__(page)
+        self.label = label
+        self.expanded = expanded
+
+    def html(self):
+        opened = ' open' if self.expanded else ''
+        return f"<details{opened}><summary>{html.escape(self.label)}</summary>{super().html()}</details>"
+
+
+class HtmlPage:
+    # Headless stand-in for the streamlit module that turns a page renderer's calls into a
+    # static HTML document. Charts are written once per content hash under assets/.
+
+    def __init__(self):
+        self.session_state = {}
+        self.asset_dir = None
+        self.reset()
+
+    def reset(self):
+        self.root = HtmlContainer(self)
+        self.stack = [self.root]
+
+    @property
+    def sidebar(self):
+        return self
+
+    def _add(self, fragment):
+        self.stack[-1].parts.append(fragment)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_page_config(self, *args, **kwargs):
+        pass
+
+    def title(self, text, **kwargs):
+        self._add(f"<h1>{html.escape(str(text))}</h1>")
+
+    def header(self, text, **kwargs):
+        self._add(f"<h2>{html.escape(str(text))}</h2>")
+
+    def subheader(self, text, **kwargs):
+        self._add(f"<h3>{html.escape(str(text))}</h3>")
+
+    def markdown(self, text, unsafe_allow_html=False, **kwargs):
+        self._add(text if unsafe_allow_html else inline_markdown(text))
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            if isinstance(arg, (pd.DataFrame, pd.Series)):
+                self.dataframe(arg)
+            else:
+                self._add(inline_markdown(str(arg)))
+
+    def metric(self, label, value, delta=None, **kwargs):
+        delta_html = '' if delta is None else f'<div class="delta">{html.escape(str(delta))}</div>'
+        self._add(f'<div class="metric"><div class="label">{html.escape(str(label))}</div>'
+                  f'<div class="value">{html.escape(str(value))}</div>{delta_html}</div>')
+
+    def dataframe(self, data, **kwargs):
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        self._add(frame.to_html(classes='dataframe', border=0))
+
+    table = dataframe
+
+    def image(self, image, **kwargs):
+        digest = hashlib.sha1(image).hexdigest()
+        name = f"{digest}.{'png' if image.startswith(PNG_SIGNATURE) else 'svg'}"
+        path = os.path.join(self.asset_dir, name)
+        # Identical charts (e.g. the same round pie on many pages) are stored once
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+        self._add(f'<img src="../assets/{name}" alt="">')
+
+    def plotly_chart(self, fig, **kwargs):
+        self._add(fig.to_html(full_html=False, include_plotlyjs=False))
+
+    def caption(self, text, **kwargs):
+        self._add(f'<p><small>{html.escape(str(text))}</small></p>')
+
+    def error(self, text, **kwargs):
+        self._add(f'<div class="alert error">{html.escape(str(text))}</div>')
+
+    def success(self, text, **kwargs):
+        self._add(f'<div class="alert success">{html.escape(str(text))}</div>')
+
+    def columns(self, spec, **kwargs):
+        children = [HtmlContainer(self) for _ in range(spec if isinstance(spec, int) else len(spec))]
+        self._add(HtmlGroup(self, 'row', children))
+        return children
+
+    def expander(self, label, expanded=False):
+        expander = HtmlExpander(self, label, expanded)
+        self._add(expander)
+        return expander
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    def document(self, title):
+        return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+                f"<style>{PAGE_STYLE}</style><script src=\"../assets/plotly.min.js\"></script></head>\n"
+                f"<body>\n{self.root.html()}\n</body></html>\n")
+
+
+# Set in the parent before the pool forks; workers read it copy-on-write instead of reloading
+_data = None
+_page = None
+
+
+def install_page():
+    # Page modules bind `streamlit` at import time, so the recorder must be in place first
+    global _page
+    if _page is None:
+        _page = HtmlPage()
+        sys.modules['streamlit'] = _page
+    return _page
+
+
+def export_page(task):
+    # Render one page to out_dir/<kind>/<slug>.html; runs inside a worker
+    from startup_analysis import SECTIONS, load_startup_analysis
+    from investor_analysis import compute_investor_details, render_investor_details
+
+    kind, name, out_dir = task
+    _page.reset()
+    try:
+        if kind == 'startup':
+            # A snapshot shows every section and every round
+            load_startup_analysis(_data, name, sections=list(SECTIONS), page_size=None)
+        else:
+            # Not load_investor_details: its syndicate path needs a second investor picked in
+            # the app, so a snapshot says where to find it instead of an empty picker
+            render_investor_details(_data, compute_investor_details(_data, name))
+            _page.subheader('Syndicate Path')
+            _page.caption('Pick a second investor in the app to see the chain of shared deals linking them.')
+    except Exception as exc:
+        # One page the renderer cannot draw must not abort a run of thousands
+        return kind, name, None, f"{type(exc).__name__}: {exc}"
+
+    file_name = f"{slugify(name)}.html"
+    with open(os.path.join(out_dir, kind, file_name), 'w', encoding='utf-8') as f:
+        f.write(_page.document(f"{name} - Startup Funding Analysis"))
+    return kind, name, f"{kind}/{file_name}", None
+
+
+def init_worker(out_dir):
+    # Snapshot pages are never re-rendered, so workers skip the chart cache and page memos
+    import chart_cache
+    from startup_analysis import (compute_startup_analysis, compute_funding_growth, compute_investor_network,
+                                  compute_industry_comparison)
+    from investor_analysis import compute_investor_details, compute_investor_timeline
+
+    warnings.filterwarnings('ignore', category=UserWarning)
+    warnings.filterwarnings('ignore', category=RuntimeWarning)
+    chart_cache.chart_cache.budget = 0
+    chart_cache.chart_format = 'svg'
+    for compute in (compute_startup_analysis, compute_funding_growth, compute_investor_network,
+                    compute_industry_comparison):
+        compute.cache_clear()
+    compute_investor_details.cache_clear()
+    compute_investor_timeline.cache_clear()
+    _page.asset_dir = os.path.join(out_dir, 'assets')
+
+
+def write_index(out_dir, exported):
+    sections = []
+    for kind, heading in (('startup', 'Startups'), ('investor', 'Investors')):
+        links = '\n'.join(f'<li><a href="{path}">{html.escape(str(name))}</a></li>'
+                          for page_kind, name, path, _ in sorted(exported, key=lambda page: str(page[1]))
+                          if page_kind == kind and path)
+        sections.append(f"<h2>{heading}</h2>\n<ul>\n{links}\n</ul>")
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Startup Funding Analysis</title>"
+                f"<style>{PAGE_STYLE}</style></head>\n<body>\n<h1>Startup Funding Analysis</h1>\n"
+                + '\n'.join(sections) + "\n</body></html>\n")
+
+
+def export(out_dir, path=None, kinds=('startup', 'investor'), workers=None, limit=None):
+    global _data
+    install_page()
+    for kind in ('assets',) + tuple(kinds):
+        os.makedirs(os.path.join(out_dir, kind), exist_ok=True)
+    # Offline copy of plotly.js for the investor page's interactive chart
+    from plotly.offline import get_plotlyjs
+    with open(os.path.join(out_dir, 'assets', 'plotly.min.js'), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    # Load once and build every index the pages use before forking, so all workers share
+    # these pages of memory instead of each loading and indexing its own copy
+    _data = load_funding_data(path)
+    tasks = []
+    if 'startup' in kinds:
+        tasks += [('startup', name, out_dir) for name in _data.startup_index.codes]
+    _data.co_investment.components
+    if 'investor' in kinds:
+        _data.investor_index
+        tasks += [('investor', name, out_dir) for name in _data.investor_vocabulary.index]
+    tasks = tasks[:limit]
+
+    workers = workers or os.cpu_count()
+    start = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(workers, initializer=init_worker, initargs=(out_dir,)) as pool:
+        exported = list(pool.imap_unordered(export_page, tasks, chunksize=max(1, len(tasks) // (workers * 16))))
+    elapsed = time.perf_counter() - start
+    write_index(out_dir, exported)
+    failed = [(kind, name, error) for kind, name, path, error in exported if error]
+    return len(exported) - len(failed), failed, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export every startup and investor page to static HTML.')
+    parser.add_argument('-o', '--output', default='export', help='output directory')
+    parser.add_argument('--data', default=None, help='dataset to export (defaults to the app dataset)')
+    parser.add_argument('--pages', nargs='+', choices=['startup', 'investor'], default=['startup', 'investor'])
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (defaults to all cores)')
+    parser.add_argument('--limit', type=int, default=None, help='export only the first N pages')
+    args = parser.parse_args(argv)
+
+    pages, failed, elapsed = export(args.output, args.data, tuple(args.pages), args.workers, args.limit)
+    for kind, name, error in failed:
+        print(f"FAILED {kind} {name!r}: {error}", file=sys.stderr)
+    print(f"Exported {pages:,} pages to {args.output} in {elapsed:.1f}s "
+          f"({(pages + len(failed)) / elapsed if elapsed else 0:,.1f} pages/sec, {len(failed):,} failed)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
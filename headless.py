@@ -0,0 +1,66 @@
+import sys
+import threading
+from contextlib import contextmanager
+
+import streamlit
+
+# Threads inside headless() render pages only to warm the page memos and the chart cache
+_local = threading.local()
+
+
+class HeadlessStreamlit:
+    # Every call is dropped and returns a harmless default: the preselected option of a
+    # selectbox or radio, the initial value of an input, this object for layout containers
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _call(self, name, *args, **kwargs):
+        if name == 'columns':
+            spec = args[0] if args else kwargs['spec']
+            return [self] * (spec if isinstance(spec, int) else len(spec))
+        if name == 'tabs':
+            return [self] * len(args[0])
+        if name in ('number_input', 'slider'):
+            return kwargs.get('value', kwargs.get('min_value'))
+        if name == 'text_input':
+            return kwargs.get('value', '')
+        if name in ('selectbox', 'radio'):
+            options = list(args[1] if len(args) > 1 else kwargs.get('options', []))
+            index = kwargs.get('index', 0)
+            return options[index] if options and index is not None else None
+        return self
+
+
+HEADLESS = HeadlessStreamlit()
+
+
+class PageStreamlit:
+    # What page modules use as `st`: the streamlit module, except on a thread that is
+    # rendering headless. Background threads never touch a session's page or media files.
+    # The module is looked up on every access, so a stand-in the benchmark or the export
+    # installs in sys.modules is used whichever was imported first.
+
+    def __getattr__(self, name):
+        return getattr(HEADLESS if getattr(_local, 'headless', False) else sys.modules['streamlit'], name)
+
+
+st = PageStreamlit()
+
+
+@contextmanager
+def headless():
+    # Render pages on this thread without drawing anything to a session
+    _local.headless = True
+    try:
+        yield
+    finally:
+        _local.headless = False
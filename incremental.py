@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset import (FundingData, arrow_schema, add_date_parts, data_version, load_funding_data,
+                     read_dataset, resolve_data_path)
+from ingest import clean_chunk
+from shared_store import map_funding_data, shared_store_root, store_version
+
+# Indexes FundingData knows how to merge instead of rebuilding
+MERGEABLE = ['investor_pairs', 'investor_index', 'investor_vocabulary', 'overall_cube', 'sketch_cube',
+             'bitmap_index', 'startup_index']
+# How many appends the log remembers; older versions fall back to a full reload
+LOG_ENTRIES = 100
+
+# Latest loaded FundingData per column projection, the starting point for the next append
+_latest = {}
+
+
+def append_log_path(path):
+    return f"{os.path.splitext(path)[0]}.appends.json"
+
+
+def read_append_log(path):
+    try:
+        with open(append_log_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def write_append_log(path, entries):
+    tmp_path = f"{append_log_path(path)}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(entries[-LOG_ENTRIES:], f, indent=1)
+    os.replace(tmp_path, append_log_path(path))
+
+
+def append_to_dataset(rows, path=None):
+    # Append cleaned rows to the stored dataset and record which version they turned into which
+    path = path or resolve_data_path()
+    before_version = data_version(path)
+    before_rows = dataset_rows(path)
+
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Parquet cannot grow in place: copy the existing row groups, then add one for the delta
+        schema = arrow_schema()
+        tmp_path = f"{path}.tmp"
+        parquet = pq.ParquetFile(path)
+        with pq.ParquetWriter(tmp_path, schema, use_dictionary=True) as writer:
+            for i in range(parquet.num_row_groups):
+                writer.write_table(parquet.read_row_group(i).cast(schema))
+            delta = add_date_parts(rows.copy(), rows['date'])
+            writer.write_table(pa.Table.from_pandas(delta, schema=schema, preserve_index=False))
+        os.replace(tmp_path, path)
+    else:
+        rows.assign(date=rows['date'].dt.strftime('%Y-%m-%d')).to_csv(path, mode='a', header=False, index=False)
+
+    entries = read_append_log(path)
+    entries.append({
+        'from_version': before_version,
+        'to_version': data_version(path),
+        'from_rows': before_rows,
+        'to_rows': before_rows + len(rows),
+    })
+    write_append_log(path, entries)
+
+
+def dataset_rows(path):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) - 1
+
+
+def appended_since(path, version):
+    # Row offset the dataset had at version, if it has only been appended to since then
+    entries = {entry['from_version']: entry for entry in read_append_log(path)}
+    current = data_version(path)
+    start = None
+    while version != current:
+        entry = entries.get(version)
+        if entry is None:
+            return None
+        start = entry['from_rows'] if start is None else start
+        version = entry['to_version']
+    return start
+
+
+def current_version():
+    # Version the next refresh_funding_data will serve: the published shared store when
+    # workers map one, the dataset file otherwise
+    root = shared_store_root()
+    return store_version(root) if root else data_version()
+
+
+def refresh_funding_data(columns=None):
+    # Current FundingData for columns: mapped from the shared store when one is configured;
+    # otherwise merged from the previous version when the dataset has only been appended to,
+    # loaded from scratch when not
+    root = shared_store_root()
+    if root:
+        previous = _latest.get(columns)
+        if previous is None or previous.version != store_version(root):
+            _latest[columns] = map_funding_data(root, columns)
+        return _latest[columns]
+
+    path = resolve_data_path()
+    version = data_version(path)
+    previous = _latest.get(columns)
+    if previous is not None and previous.version == version:
+        return previous
+
+    data = None
+    start = appended_since(path, previous.version) if previous is not None else None
+    if start is not None and start == previous.source_rows:
+        delta = read_dataset(path, columns, start=start)
+        # Back-dated rows would break the date order windows rely on
+        if previous.in_date_order(delta):
+            data = previous.append(delta, version)
+    if data is None:
+        data = load_funding_data(path, columns)
+    _latest[columns] = data
+    return data
+
+
+def verify_incremental(data):
+    # Rebuild every index that data carries from its frame and list where the merged copy differs
+    full = FundingData(data.df, data.version, data.columns)
+    mismatches = []
+
+    def check(name, ok):
+        if not ok:
+            mismatches.append(name)
+
+    if data.built('investor_index'):
+        merged, rebuilt = data.investor_index, full.investor_index
+        check('investor_index', merged.keys() == rebuilt.keys()
+              and all(np.array_equal(merged[k], rebuilt[k]) for k in rebuilt))
+    if data.built('investor_vocabulary'):
+        merged, rebuilt = data.investor_vocabulary, full.investor_vocabulary
+        check('investor_vocabulary', list(merged.index) == list(rebuilt.index)
+              and np.array_equal(merged.to_numpy(), rebuilt.to_numpy()))
+    if data.built('overall_cube'):
+        merged, rebuilt = data.overall_cube, full.overall_cube
+        check('overall_cube.totals', (merged.total, merged.deals, merged.amount_min, merged.startup_count)
+              == (rebuilt.total, rebuilt.deals, rebuilt.amount_min, rebuilt.startup_count))
+        for measure in ('amount', 'startup'):
+            check(f'overall_cube.monthly.{measure}',
+                  np.array_equal(merged.monthly(measure).to_numpy(), rebuilt.monthly(measure).to_numpy()))
+        check('overall_cube.yearly', merged.yearly().equals(rebuilt.yearly()))
+        check('overall_cube.top_startups', np.array_equal(merged.top_startups().to_numpy(),
+                                                          rebuilt.top_startups().to_numpy()))
+    if data.built('sketch_cube'):
+        merged, rebuilt = data.sketch_cube, full.sketch_cube
+        # Merges are exact for sketches: registers and buckets must match a rebuild
+        for name in ('startup_registers', 'amount_buckets', 'investor_registers'):
+            a, b = getattr(merged, name), getattr(rebuilt, name)
+            if a is None or b is None:
+                check(f'sketch_cube.{name}', a is None and b is None)
+                continue
+            # Compare as text: categorical keys sort by their codes, and the merged and rebuilt
+            # tables order their categories differently
+            keys = list(b.columns[:-1])
+            check(f'sketch_cube.{name}', a.astype(str).sort_values(keys, ignore_index=True)
+                  .equals(b.astype(str).sort_values(keys, ignore_index=True)))
+    if data.built('bitmap_index'):
+        merged, rebuilt = data.bitmap_index.bitmaps, full.bitmap_index.bitmaps
+        for facet in rebuilt:
+            check(f'bitmap_index.{facet}', merged.get(facet, {}).keys() == rebuilt[facet].keys()
+                  and all(np.array_equal(merged[facet][value].positions(), bitmap.positions())
+                          for value, bitmap in rebuilt[facet].items()))
+    if data.built('startup_index'):
+        merged, rebuilt = data.startup_index, full.startup_index
+        check('startup_index.order', np.array_equal(merged.order, rebuilt.order)
+              and np.array_equal(merged.offsets, rebuilt.offsets)
+              and list(merged.names) == list(rebuilt.names))
+        for vertical in rebuilt.vertical_totals:
+            a, b = merged.industry_stats(vertical), rebuilt.industry_stats(vertical)
+            if not (np.array_equal(merged.vertical_totals[vertical], rebuilt.vertical_totals[vertical])
+                    and all(np.isclose(a[k], b[k]) for k in b)):
+                mismatches.append(f'startup_index.vertical[{vertical}]')
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append new funding rounds without a full recompute.')
+    parser.add_argument('source', help='CSV of new rounds (raw feed or cleaned schema)')
+    parser.add_argument('--verify', action='store_true', help='check the merged indexes against a full rebuild')
+    args = parser.parse_args(argv)
+
+    path = resolve_data_path()
+    previous = load_funding_data(path)
+    for name in MERGEABLE:
+        getattr(previous, name)
+
+    rows, rejected = clean_chunk(pd.read_csv(args.source, dtype=str, encoding='utf-8-sig', keep_default_na=False))
+    append_to_dataset(rows, path)
+
+    start = time.perf_counter()
+    delta = read_dataset(path, start=previous.source_rows)
+    if not previous.in_date_order(delta):
+        print("New rows predate the dataset's latest round; they are picked up by a full reload instead",
+              file=sys.stderr)
+        return
+    data = previous.append(delta, data_version(path))
+    for name in MERGEABLE:
+        getattr(data, name)
+    elapsed = time.perf_counter() - start
+    print(f"Appended {len(rows):,} rows ({rejected:,} rejected) to {len(previous.df):,}; "
+          f"indexes merged in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+    if args.verify:
+        start = time.perf_counter()
+        mismatches = verify_incremental(data)
+        print(f"Full rebuild took {(time.perf_counter() - start) * 1000:.1f} ms; "
+              f"{'consistent' if not mismatches else 'MISMATCH: ' + ', '.join(mismatches)}", file=sys.stderr)
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
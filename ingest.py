@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from dataset import DATA_PATH, COLUMNS, add_date_parts, arrow_schema
+from entities import write_entities
+from schema import validate_rows
+
+RAW_PATH = 'startup_funding.csv'
+
+# Raw headers, lower-cased with whitespace collapsed, mapped onto the cleaned schema
+HEADER_ALIASES = {
+    'date dd/mm/yyyy': 'date',
+    'date': 'date',
+    'startup name': 'startup',
+    'industry vertical': 'vertical',
+    'subvertical': 'subvertical',
+    'city location': 'city',
+    'investors name': 'investors',
+    'investmentntype': 'round',
+    'investment type': 'round',
+    'amount in usd': 'amount',
+    # Already-cleaned files can be re-ingested, e.g. to convert them to Parquet
+    **{column: column for column in COLUMNS},
+}
+
+# Placeholders the feed uses for empty fields
+MISSING_TEXT = ['', 'nan', 'n/a', 'none', 'null']
+# Amounts that mean "not disclosed" are stored as 0, like the rest of the cleaned data
+UNDISCLOSED_AMOUNTS = ['undisclosed', 'unknown']
+
+
+def normalize_header(name):
+    key = ' '.join(str(name).replace('﻿', '').lower().split())
+    return HEADER_ALIASES.get(key)
+
+
+def clean_text(series):
+    # The feed carries escaped bytes as literal text ("\\xc2\\xa0", "\\n")
+    text = (series.str.replace(r'\\+x[0-9a-fA-F]{2}', ' ', regex=True)
+                  .str.replace(r'\\+n', ' ', regex=True)
+                  .str.replace(r'\s+', ' ', regex=True)
+                  .str.strip())
+    return text.mask(text.str.lower().isin(MISSING_TEXT))
+
+
+def parse_amount(series):
+    # Indian digit grouping ("20,00,00,000") and stray markers ("14,342,000+")
+    text = clean_text(series).str.replace(r'[,+\s]', '', regex=True)
+    amount = pd.to_numeric(text, errors='coerce')
+    undisclosed = text.isna() | text.str.lower().isin(UNDISCLOSED_AMOUNTS)
+    return amount.mask(undisclosed, 0.0)
+
+
+def parse_date(series):
+    # dd/mm/yyyy, tolerating typos such as "12/05.2015" and "22/01//2015"
+    text = clean_text(series)
+    date = pd.to_datetime(text.str.replace(r'[./]+', '/', regex=True), format='%d/%m/%Y', errors='coerce')
+    # ISO dates as found in the cleaned dataset
+    return date.fillna(pd.to_datetime(text, format='%Y-%m-%d', errors='coerce'))
+
+
+def clean_chunk(chunk):
+    chunk = chunk.rename(columns=normalize_header)
+    chunk = chunk.loc[:, chunk.columns.notna()]
+    chunk = chunk.reindex(columns=COLUMNS)
+
+    out = pd.DataFrame(index=chunk.index)
+    out['date'] = parse_date(chunk['date'])
+    for column in ['startup', 'vertical', 'subvertical', 'city', 'investors', 'round']:
+        out[column] = clean_text(chunk[column].astype('string'))
+    out['amount'] = parse_amount(chunk['amount'].astype('string'))
+
+    # Rows breaking the schema (missing fields, unparseable or out-of-range values) are dropped
+    valid, _ = validate_rows(out)
+    return out[valid], int((~valid).sum())
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.header = True
+
+    def write(self, chunk):
+        chunk = chunk.assign(date=chunk['date'].dt.strftime('%Y-%m-%d'))
+        chunk.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    # Typed columnar output: datetime64 date, int16/int8 year/month, one row group per chunk
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = arrow_schema()
+        self.writer = pq.ParquetWriter(path, self.schema, use_dictionary=True)
+
+    def write(self, chunk):
+        chunk = add_date_parts(chunk.copy(), chunk['date'])
+        table = self.pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def ingest(source, dest, chunksize=100_000):
+    # Stream the raw feed chunk by chunk so memory stays bounded by chunksize
+    start = time.perf_counter()
+    rows_in = rows_out = rejected = 0
+    tmp_path = f"{dest}.tmp"
+
+    try:
+        reader = pd.read_csv(source, chunksize=chunksize, dtype=str, encoding='utf-8-sig',
+                             keep_default_na=False)
+        sink = ParquetSink(tmp_path) if dest.endswith('.parquet') else CsvSink(tmp_path)
+        try:
+            for chunk in reader:
+                cleaned, dropped = clean_chunk(chunk)
+                sink.write(cleaned)
+                rows_in += len(chunk)
+                rows_out += len(cleaned)
+                rejected += dropped
+        finally:
+            sink.close()
+        # Readers never see a half-written dataset
+        os.replace(tmp_path, dest)
+    finally:
+        # A failed run leaves the previous output untouched and no temp file behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    elapsed = time.perf_counter() - start
+    # Spelling variants that are certainly one name (same key, or a typo) are resolved on
+    # every load from the mapping written here; close pairs wait on the review list
+    mapping, review = write_entities(dest)
+    return {
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rejected': rejected,
+        'seconds': elapsed,
+        'rows_per_sec': rows_in / elapsed if elapsed > 0 else float('inf'),
+        'merged_names': len(mapping),
+        'review_pairs': len(review),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Clean the raw startup funding feed.')
+    parser.add_argument('source', nargs='?', default=RAW_PATH, help='raw funding CSV')
+    # No default: the cleaned dataset in the repository is only overwritten on purpose
+    parser.add_argument('-o', '--output', required=True,
+                        help=f'cleaned dataset to write (.csv, or .parquet for the typed columnar format), '
+                             f'e.g. {DATA_PATH}')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='rows held in memory at once')
+    args = parser.parse_args(argv)
+
+    stats = ingest(args.source, args.output, args.chunksize)
+    print(f"Ingested {stats['rows_in']:,} rows -> {stats['rows_out']:,} kept, "
+          f"{stats['rejected']:,} rejected in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec); {stats['merged_names']:,} names mapped to a canonical "
+          f"spelling, {stats['review_pairs']:,} similar pairs listed for review", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
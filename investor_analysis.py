@@ -1,11 +1,62 @@
-import streamlit as st
+from dataclasses import dataclass
+
+import pandas as pd
 import matplotlib.pyplot as plt
+from chart_cache import render_chart
+from co_investment import MAX_HOPS
+from headless import st
+from investor_index import investor_rows
+from memo import memoize
+from profiling import traced
+from search_index import TOP_K
+from timeseries import GRANULARITIES, downsample, resample
 
-def load_investor_details(df, investor):
-    st.title(f"Details for Investor: {investor}")
-    
-    # Load the recent 5 investments of the investor
-    last5_df = df[df['investors'].str.contains(investor, na=False)].head()[['date','startup','vertical','city','investors','round','amount']]
+
+@dataclass(frozen=True)
+class InvestorAnalysis:
+    investor: str
+    recent: pd.DataFrame
+    biggest: pd.Series
+    by_vertical: pd.Series
+    by_round: pd.Series
+    by_city: pd.Series
+    by_year: pd.Series
+    co_investors: pd.Series
+    cluster_size: int
+
+
+@traced(rows=lambda result, data, investor: len(data.investor_index.get(investor, ())))
+@memoize()
+def compute_investor_details(data, investor):
+    # Slice the investor's deals once from the prebuilt index
+    investor_df = investor_rows(data.df, data.investor_index, investor)
+    return InvestorAnalysis(
+        investor=investor,
+        # The recent 5 investments of the investor, newest first (rows are in date order)
+        recent=investor_df.tail()[::-1][['date','startup','vertical','city','investors','round','amount']],
+        biggest=investor_df.groupby('startup', observed=True)['amount'].sum().sort_values(ascending=False).head(),
+        by_vertical=investor_df.groupby('vertical', observed=True)['amount'].sum(),
+        by_round=investor_df.groupby('round', observed=True)['amount'].sum(),
+        by_city=investor_df.groupby('city', observed=True)['amount'].sum(),
+        by_year=investor_df.groupby('year')['amount'].sum(),
+        co_investors=data.co_investment.co_investors(investor),
+        cluster_size=data.co_investment.cluster_size(investor),
+    )
+
+
+@traced(rows=lambda result, data, investor, granularity: len(data.investor_index.get(investor, ())))
+@memoize()
+def compute_investor_timeline(data, investor, granularity):
+    # The investor's funding per period, downsampled to a bounded number of points
+    investor_df = investor_rows(data.df, data.investor_index, investor)
+    return downsample(resample(investor_df, granularity, 'amount', 'sum'))
+
+
+@traced()
+def render_investor_details(data, result):
+    st.title(f"Details for Investor: {result.investor}")
+
+    last5_df = result.recent
     
     st.subheader("Most Recent Investments")
     if not last5_df.empty:
@@ -18,52 +69,98 @@ def load_investor_details(df, investor):
     
     with col1:
         # Biggest investment
-        big_series = df[df['investors'].str.contains(investor, na=False)].groupby('startup')['amount'].sum().sort_values(ascending=False).head()
+        big_series = result.biggest
 
         st.subheader("Biggest Investment")
         if not big_series.empty:
-            fig, ax = plt.subplots()
-            ax.bar(big_series.index, big_series.values)
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
+            def draw():
+                fig, ax = plt.subplots()
+                ax.bar(big_series.index, big_series.values)
+                plt.xticks(rotation=45)
+                return fig
+            st.image(render_chart('investor.biggest_bar', big_series, draw))
         else:
             st.write("No data found for this investor.")
     
     with col2:
-        vertical_series = df[df['investors'].str.contains(investor, na=False)].groupby('vertical')['amount'].sum()
+        vertical_series = result.by_vertical
 
         st.subheader('Sector Invested In')
-        if not vertical_series.empty:
-            fig, ax = plt.subplots()
-            ax.pie(vertical_series.values, labels=vertical_series.index, autopct='%1.1f%%')
-            st.pyplot(fig)
+        if vertical_series.sum() > 0:
+            def draw():
+                fig, ax = plt.subplots()
+                ax.pie(vertical_series.values, labels=vertical_series.index, autopct='%1.1f%%')
+                return fig
+            st.image(render_chart('investor.vertical_pie', vertical_series, draw))
 
     col1, col2 = st.columns(2)
 
     # Round-wise analysis
     with col1:
-        round_series = df[df['investors'].str.contains(investor, na=False)].groupby('round')['amount'].sum()
+        round_series = result.by_round
 
         st.subheader('Round-wise Analysis')
-        if not round_series.empty:
-            fig, ax = plt.subplots()
-            ax.pie(round_series.values, labels=round_series.index, autopct='%1.1f%%')
-            st.pyplot(fig)
+        if round_series.sum() > 0:
+            def draw():
+                fig, ax = plt.subplots()
+                ax.pie(round_series.values, labels=round_series.index, autopct='%1.1f%%')
+                return fig
+            st.image(render_chart('investor.round_pie', round_series, draw))
 
     with col2:
-        city_series = df[df['investors'].str.contains(investor, na=False)].groupby('city')['amount'].sum()
+        city_series = result.by_city
 
         st.subheader('City-wise Analysis')
-        if not city_series.empty:
-            fig, ax = plt.subplots()
-            ax.pie(city_series.values, labels=city_series.index, autopct='%1.1f%%')
-            st.pyplot(fig)
+        if city_series.sum() > 0:
+            def draw():
+                fig, ax = plt.subplots()
+                ax.pie(city_series.values, labels=city_series.index, autopct='%1.1f%%')
+                return fig
+            st.image(render_chart('investor.city_pie', city_series, draw))
     
-    # Year-wise analysis
-    year_series = df[df['investors'].str.contains(investor, na=False)].groupby('year')['amount'].sum()
-
-    st.subheader('Year-wise Analysis')
-    if not year_series.empty:
+    # Funding over time, yearly unless another granularity is picked
+    st.subheader('Funding Over Time')
+    granularity = st.selectbox('Granularity', list(GRANULARITIES), index=list(GRANULARITIES).index('Year'),
+                               key='investor_granularity')
+    time_series = compute_investor_timeline(data, result.investor, granularity)
+    if not time_series.empty:
         import plotly.graph_objects as go
-        fig2 = go.Figure(data=go.Scatter(x=year_series.index, y=year_series.values, mode='lines+markers'))
-        st.plotly_chart(fig2)
\ No newline at end of file
+        fig2 = go.Figure(data=go.Scatter(x=time_series.index, y=time_series.values, mode='lines+markers'))
+        st.plotly_chart(fig2)
+
+    # Co-investment network
+    co_investors = result.co_investors
+
+    st.subheader('Frequent Co-Investors')
+    if not co_investors.empty:
+        def draw():
+            fig, ax = plt.subplots()
+            ax.barh(co_investors.index[::-1], co_investors.values[::-1])
+            ax.set_xlabel('Shared deals')
+            return fig
+        st.image(render_chart('investor.co_investors_barh', co_investors, draw))
+        st.write(f"Part of a syndicate cluster of {result.cluster_size} investors linked by shared deals.")
+    else:
+        st.write("No co-investments found for this investor.")
+
+
+@traced()
+def render_syndicate_path(data, investor, max_hops=MAX_HOPS):
+    # Shortest chain of shared deals from this investor to another one
+    st.subheader('Syndicate Path')
+    query = st.text_input('Search investors to connect to', key='path_query', placeholder='Investor name')
+    options = [name for name in data.investor_search.find(query, TOP_K + 1) if name != investor][:TOP_K]
+    other = st.selectbox('Connect to investor', options, index=None, placeholder='Choose an investor')
+    if other is None:
+        return
+    path = data.co_investment.shortest_path(investor, other, max_hops)
+    if path is None:
+        st.write(f"No chain of up to {max_hops} co-investment links connects {investor} and {other}.")
+    else:
+        st.write(' → '.join(path))
+
+
+@traced('page investor')
+def load_investor_details(data, investor):
+    render_investor_details(data, compute_investor_details(data, investor))
+    render_syndicate_path(data, investor)
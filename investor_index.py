@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def split_investors(investors):
+    # One entry per (deal, investor) pair; the index holds the deal's row position
+    if isinstance(investors.dtype, pd.CategoricalDtype):
+        # String methods run over the categories, so a small slice must not carry all of them
+        investors = investors.cat.remove_unused_categories()
+    exploded = investors.reset_index(drop=True).str.split(',').explode().str.strip()
+    return exploded[exploded.notna() & (exploded != '')]
+
+
+def explode_investor_pairs(df, start=0):
+    # Deduplicated (row position, investor) pairs with investors as a sorted categorical;
+    # start is the position of df's first row in the full dataset
+    exploded = split_investors(df['investors'])
+    pairs = pd.DataFrame({'position': exploded.index.to_numpy(dtype=np.int64) + start,
+                          'investor': pd.Categorical(exploded.to_numpy())})
+    return pairs.drop_duplicates(ignore_index=True)
+
+
+def append_investor_pairs(pairs, delta_pairs):
+    categories = pairs['investor'].cat.categories.union(delta_pairs['investor'].cat.categories)
+    return pd.DataFrame({
+        'position': np.concatenate([pairs['position'].to_numpy(), delta_pairs['position'].to_numpy()]),
+        'investor': pd.Categorical(
+            np.concatenate([pairs['investor'].to_numpy(), delta_pairs['investor'].to_numpy()]),
+            categories=categories),
+    })
+
+
+def build_investor_vocabulary(pairs):
+    # Deal count per investor, most active first (ties broken alphabetically)
+    categories = pairs['investor'].cat.categories
+    counts = np.bincount(pairs['investor'].cat.codes, minlength=len(categories))
+    order = np.lexsort((np.arange(len(categories)), -counts))
+    index = pd.CategoricalIndex(categories[order], categories=categories, name='investor')
+    return pd.Series(counts[order], index=index, name='deals')
+
+
+def build_investor_index(pairs):
+    # Map every investor name to the sorted row positions of the deals it took part in
+    categories = pairs['investor'].cat.categories
+    codes = pairs['investor'].cat.codes.to_numpy()
+    # Stable sort keeps positions ascending inside every investor's block
+    order = np.argsort(codes, kind='stable')
+    positions = pairs['position'].to_numpy()[order]
+    counts = np.bincount(codes, minlength=len(categories))
+    blocks = np.split(positions, np.cumsum(counts)[:-1])
+    return dict(zip(categories, blocks))
+
+
+def investor_rows(df, investor_index, investor):
+    # Exact-name match: "Sequoia Capital" does not pick up "Sequoia Capital India"
+    return df.iloc[investor_index.get(investor, EMPTY_POSITIONS)]
+
+
+def merge_investor_index(investor_index, delta_pairs):
+    # Appended rows sit after every existing row, so each touched block just grows at its end
+    merged = dict(investor_index)
+    for investor, positions in build_investor_index(delta_pairs).items():
+        if len(positions):
+            merged[investor] = np.concatenate([investor_index.get(investor, EMPTY_POSITIONS), positions])
+    return merged
+
+
+def merge_investor_vocabulary(vocabulary, delta_pairs):
+    counts = pd.Series(vocabulary.to_numpy(), index=vocabulary.index.astype(str))
+    delta = build_investor_vocabulary(delta_pairs)
+    counts = counts.add(pd.Series(delta.to_numpy(), index=delta.index.astype(str)), fill_value=0).astype(np.int64)
+    # Same ordering as build_investor_vocabulary: most deals first, ties alphabetical
+    counts = counts.sort_index().sort_values(ascending=False, kind='stable')
+    index = pd.CategoricalIndex(counts.index, categories=counts.index.sort_values(), name='investor')
+    return pd.Series(counts.to_numpy(), index=index, name='deals')
@@ -0,0 +1,62 @@
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Per thread: the cache entries read or written while record_entries is active
+_recording = threading.local()
+
+
+@contextmanager
+def record_entries():
+    # Collects one probe per cache entry (memo result or chart) this thread reads or writes
+    # inside the block; calling a probe tells whether that entry is still cached
+    probes = []
+    _recording.probes = probes
+    try:
+        yield probes
+    finally:
+        _recording.probes = None
+
+
+def record_entry(probe):
+    probes = getattr(_recording, 'probes', None)
+    if probes is not None:
+        probes.append(probe)
+
+
+def memoize(maxsize=256):
+    # LRU memo for pure page computations. The first argument must be a FundingData; its
+    # key (data version + loaded columns) is part of the cache key, so a data refresh never
+    # serves stale results. Results are shared between callers and must not be mutated.
+    def decorator(fn):
+        cache = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(data, *args, **kwargs):
+            key = (data.key, args, tuple(sorted(kwargs.items())))
+            record_entry(functools.partial(cached, key))
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+            result = fn(data, *args, **kwargs)
+            with lock:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        def cached(key):
+            with lock:
+                return key in cache
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
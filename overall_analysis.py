@@ -1,78 +1,155 @@
+from dataclasses import dataclass
+
+import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
+from chart_cache import render_chart
+from memo import memoize
+from profiling import traced
+from sketches import HLL_ERROR
+from timeseries import GRANULARITIES, downsample, month_starts, resample
+
+# Granularities the month-grain sketches merge into; finer ones are always counted exactly
+SKETCH_GRANULARITIES = ['Month', 'Quarter', 'Year']
+
+
+@dataclass(frozen=True)
+class OverallAnalysis:
+    total: int
+    min_amount: int
+    average: int
+    top_startups: pd.Series
+    unique_startups: int
+    funding_by_year: pd.Series
+    approximate: bool = False  # distinct startup counts estimated from sketches
+
+
+@traced(rows=lambda result, data, *args, **kwargs: len(data.overall_cube.cells))
+@memoize()
+def compute_overall_analysis(data, approximate=False):
+    # Every number on this page is read from the precomputed OverallCube; in approximate
+    # mode the distinct startup counts come from the mergeable SketchCube instead
+    cube = data.overall_cube
+    unique_startups = data.sketch_cube.distinct_startups() if approximate else cube.startup_count
+    return OverallAnalysis(
+        total=round(cube.total),
+        min_amount=cube.amount_min,
+        average=round(cube.mean),
+        top_startups=cube.top_startups(),
+        unique_startups=unique_startups,
+        funding_by_year=cube.yearly(),
+        approximate=approximate,
+    )
+
+
+@traced(rows=lambda result, data, *args, **kwargs: len(data.df))
+@memoize()
+def compute_overall_timeline(data, measure, granularity, approximate=False):
+    # Total funding ('amount') or distinct startups funded ('startup') per period, resampled
+    # once per data version and downsampled to a bounded number of points. Months are read
+    # from the cube like the rest of the page; approximate startup counts are merged from
+    # the sketches at any granularity they support.
+    if approximate and measure == 'startup' and granularity in SKETCH_GRANULARITIES:
+        series = data.sketch_cube.period_startups(GRANULARITIES[granularity]).sort_index()
+    elif granularity == 'Month':
+        monthly = data.overall_cube.monthly(measure)
+        series = monthly.set_index(month_starts(monthly))[measure].sort_index()
+    else:
+        series = resample(data.df, granularity, measure, 'sum' if measure == 'amount' else 'nunique')
+    return downsample(series)
 
-def load_overall_analysis(df):
+
+@traced()
+def render_overall_analysis(data, result):
     st.title('Overall Analysis')
 
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         # Total funding amount
-        total = round(df['amount'].sum())
-        st.metric("Total", str(total), delta=str(round(total - df['amount'].min())))
+        total = result.total
+        st.metric("Total", str(total), delta=str(round(total - result.min_amount)))
 
     with col2:
         # Maximum amount infused in a startup
-        max_amount = df.groupby('startup')['amount'].max().sort_values(ascending=False).head()
+        max_amount = result.top_startups
         st.metric('Max', str(max_amount.max()), delta=str(round(max_amount.max() - max_amount.min())))
 
     with col3:
         # Average funding amount
-        avg_amount = round(df['amount'].mean())
-        st.metric("Average", str(avg_amount), delta=str(round(avg_amount - df['amount'].min())))
+        avg_amount = result.average
+        st.metric("Average", str(avg_amount), delta=str(round(avg_amount - result.min_amount)))
 
     with col4:
         # Total funded startups
-        total_startups = df['startup'].nunique()    
-        st.metric("Number of Unique Startups", total_startups)
+        total_startups = result.unique_startups
+        st.metric("Number of Unique Startups", f"≈{total_startups}" if result.approximate else total_startups)
+
+    if result.approximate:
+        st.caption(f"Startup counts are HyperLogLog estimates (standard error ±{HLL_ERROR:.1%}).")
     
-    # MoM analysis (visually appealing and compact)
-    st.subheader("Month on Month Analysis")
-    selected_option = st.selectbox('Select Type', ['Total', 'Count'])
+    # Funding over time at the chosen granularity (visually appealing and compact)
+    st.subheader("Funding Over Time")
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_option = st.selectbox('Select Type', ['Total', 'Count'])
+    with col2:
+        granularity = st.selectbox('Granularity', list(GRANULARITIES), index=list(GRANULARITIES).index('Month'))
 
     if selected_option == 'Total':
-        temp_df = df.groupby(['year', 'month'])['amount'].sum().reset_index()
-        y_column = 'amount'
+        measure = 'amount'
         y_label = 'Total Amount'
     else:
-        temp_df = df.groupby(['year', 'month'])['startup'].nunique().reset_index()
-        y_column = 'startup'
+        measure = 'startup'
         y_label = 'Number of Startups Funded'
+    series = compute_overall_timeline(data, measure, granularity, result.approximate)
+    if result.approximate and measure == 'startup' and granularity not in SKETCH_GRANULARITIES:
+        st.caption(f"{granularity} counts are exact: the sketches are kept per month.")
 
-    temp_df['x_axis'] = temp_df['year'].astype(str) + '-' + temp_df['month'].astype(str)
-    fig, ax = plt.subplots(figsize=(7, 3))  # Smaller figure size
+    def draw():
+        fig, ax = plt.subplots(figsize=(7, 3))  # Smaller figure size
 
-    ax.plot(temp_df['x_axis'], temp_df[y_column], marker='o', color='#1f77b4', linewidth=2)
-    ax.set_xticks(temp_df['x_axis'][::max(1, len(temp_df['x_axis']) // 10)])  # Fewer x-ticks for clarity
-    ax.set_xticklabels(temp_df['x_axis'][::max(1, len(temp_df['x_axis']) // 10)], rotation=45, ha='right', fontsize=8)
-    ax.set_ylabel(y_label, fontsize=10)
-    ax.set_xlabel('Month', fontsize=10)
-    ax.grid(True, linestyle='--', alpha=0.5)
-    ax.set_title('Month-on-Month Funding', fontsize=12)
-    fig.tight_layout()
-    st.pyplot(fig)
+        ax.plot(series.index, series.values, marker='o', markersize=4, color='#1f77b4', linewidth=2)
+        ax.tick_params(axis='x', labelrotation=45, labelsize=8)
+        ax.set_ylabel(y_label, fontsize=10)
+        ax.set_xlabel(granularity, fontsize=10)
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.set_title(f'Funding per {granularity.lower()}', fontsize=12)
+        fig.tight_layout()
+        return fig
+    # The labels are part of the key: two granularities can give the same series
+    st.image(render_chart('overall.mom_line', (series, y_label, granularity), draw))
 
     col1, col2 = st.columns(2)
     with col1:
         # Top 5 startups by funding amount (Horizontal Bar Chart)
         st.subheader("Top 5 Startups by Funding Amount")
         if not max_amount.empty:
-            fig, ax = plt.subplots()
-            ax.barh(max_amount.index[::-1], max_amount.values[::-1], color='skyblue')
-            ax.set_xlabel('Funding Amount')
-            ax.set_ylabel('Startup')
-            ax.set_title('Top 5 Funded Startups')
-            st.pyplot(fig)
+            def draw():
+                fig, ax = plt.subplots()
+                ax.barh(max_amount.index[::-1], max_amount.values[::-1], color='skyblue')
+                ax.set_xlabel('Funding Amount')
+                ax.set_ylabel('Startup')
+                ax.set_title('Top 5 Funded Startups')
+                return fig
+            st.image(render_chart('overall.top_startups_barh', max_amount, draw))
         else:
             st.write("No data found for this analysis.")
 
     with col2:
         # Funding amount by year (Line Chart)
-        funding_by_year = df.groupby('year')['amount'].sum()
+        funding_by_year = downsample(result.funding_by_year)
         st.subheader('Funding Amount by Year')
-        fig, ax = plt.subplots()
-        ax.plot(funding_by_year.index, funding_by_year.values, marker='o', color='orange', linewidth=2)
-        ax.set_xlabel('Year')
-        ax.set_ylabel('Total Funding')
-        ax.set_title('Yearly Funding Trend')
-        st.pyplot(fig)
+        def draw():
+            fig, ax = plt.subplots()
+            ax.plot(funding_by_year.index, funding_by_year.values, marker='o', color='orange', linewidth=2)
+            ax.set_xlabel('Year')
+            ax.set_ylabel('Total Funding')
+            ax.set_title('Yearly Funding Trend')
+            return fig
+        st.image(render_chart('overall.yearly_line', funding_by_year, draw))
+
+
+@traced('page overall')
+def load_overall_analysis(data, approximate=False):
+    render_overall_analysis(data, compute_overall_analysis(data, approximate))
@@ -0,0 +1,91 @@
+import pandas as pd
+
+# Finest grain kept by the cube; every overall metric is a roll-up over these cells
+CUBE_DIMENSIONS = ['year', 'month', 'vertical', 'city', 'round']
+
+
+def aggregate_cells(df):
+    grouped = df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)['amount']
+    # One row per cell: summed amount, number of rounds, smallest round
+    cells = grouped.agg(amount='sum', deals='size', amount_min='min').reset_index()
+
+    # Distinct (cell, startup) pairs with the startup's biggest round in that cell.
+    # Merging pairs over any slice gives exact distinct-startup counts and per-startup maxima.
+    startup_cells = (df.groupby(CUBE_DIMENSIONS + ['startup'], observed=True, dropna=False)['amount']
+                       .max().rename('amount_max').reset_index())
+    return cells, startup_cells
+
+
+class OverallCube:
+    # Funding aggregates materialised once per data version for the Overall Analysis page.
+    # Only the unfiltered figures are precomputed. A filtered roll-up scans the cells, and
+    # its distinct counts and maxima scan startup_cells, which has about one row per round,
+    # so filtered queries cost time proportional to the data. The app filters through
+    # FundingData.select instead, which builds a cube per selection.
+
+    def __init__(self, df=None, cells=None, startup_cells=None):
+        if df is not None:
+            cells, startup_cells = aggregate_cells(df)
+        self.cells = cells
+        self.startup_cells = startup_cells
+
+        # Unfiltered roll-ups served to the page as-is
+        # Plain Python numbers, so page arithmetic never overflows a compact amount dtype
+        self.total = self.cells['amount'].sum().item()
+        self.deals = self.cells['deals'].sum().item()
+        self.amount_min = self.cells['amount_min'].min().item() if len(self.cells) else 0
+        self.mean = self.total / self.deals if self.deals else 0
+        self._startup_max = self.startup_cells.groupby('startup', observed=True)['amount_max'].max()
+        self.startup_count = len(self._startup_max)
+        self._monthly = {
+            'amount': self._compute_monthly('amount', {}),
+            'startup': self._compute_monthly('startup', {}),
+        }
+        self._yearly = self.cells.groupby('year')['amount'].sum()
+
+    def merge(self, delta_df):
+        # New cube covering this one plus delta_df, combined cell by cell without the old rows
+        delta_cells, delta_startup_cells = aggregate_cells(delta_df)
+        cells = (pd.concat([self.cells, delta_cells], ignore_index=True)
+                   .groupby(CUBE_DIMENSIONS, observed=True, dropna=False)
+                   .agg(amount=('amount', 'sum'), deals=('deals', 'sum'), amount_min=('amount_min', 'min'))
+                   .reset_index())
+        startup_cells = (pd.concat([self.startup_cells, delta_startup_cells], ignore_index=True)
+                           .groupby(CUBE_DIMENSIONS + ['startup'], observed=True, dropna=False)['amount_max']
+                           .max().reset_index())
+        return OverallCube(cells=cells, startup_cells=startup_cells)
+
+    def _mask(self, table, filters):
+        # filters maps a dimension to the list of values to keep
+        mask = pd.Series(True, index=table.index)
+        for column, values in filters.items():
+            mask &= table[column].isin(values)
+        return table[mask]
+
+    def monthly(self, measure, filters=None):
+        # measure 'amount': total funding per month; 'startup': distinct startups funded per month
+        if not filters:
+            return self._monthly[measure]
+        return self._compute_monthly(measure, filters)
+
+    def _compute_monthly(self, measure, filters):
+        if measure == 'amount':
+            cells = self._mask(self.cells, filters)
+            return cells.groupby(['year', 'month'])['amount'].sum().reset_index()
+        pairs = self._mask(self.startup_cells, filters)
+        return (pairs.drop_duplicates(['year', 'month', 'startup'])
+                     .groupby(['year', 'month']).size().rename('startup').reset_index())
+
+    def yearly(self, filters=None):
+        if not filters:
+            return self._yearly
+        return self._mask(self.cells, filters).groupby('year')['amount'].sum()
+
+    def top_startups(self, n=5, filters=None):
+        # Startups ranked by their single biggest round
+        if not filters:
+            startup_max = self._startup_max
+        else:
+            pairs = self._mask(self.startup_cells, filters)
+            startup_max = pairs.groupby('startup', observed=True)['amount_max'].max()
+        return startup_max.sort_values(ascending=False).head(n)
@@ -0,0 +1,194 @@
+import functools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from headless import headless
+from investor_analysis import load_investor_details
+from investor_index import EMPTY_POSITIONS, split_investors
+from memo import record_entries
+from startup_analysis import load_startup_analysis
+
+# Background threads rendering likely next pages; 0 turns prefetching off
+PREFETCH_WORKERS = int(os.environ.get('PREFETCH_WORKERS', 2))
+# Entries on each side of the current one in the sidebar's list of matches
+NEIGHBOURS = 2
+# Startups sharing an investor, leaders of the same vertical, co-investors of an investor
+RELATED = 3
+# Finished prefetches remembered for the hit-rate count; the pages themselves live in the
+# page memos and the chart cache, which are bounded on their own, so a remembered page
+# only counts while every entry it filled is still cached
+PREFETCH_ENTRIES = 1024
+
+
+def nearest_first(names, position, count=NEIGHBOURS):
+    # Entries around position, next one first: the order people step through a list in
+    order = []
+    for step in range(1, count + 1):
+        order += [position + step, position - step]
+    return [names[i] for i in order if 0 <= i < len(names)]
+
+
+def startup_candidates(data, name, listed):
+    # Startups most likely viewed after this one: its neighbours among the listed search
+    # matches, then startups sharing an investor with it (most shared deals first), then
+    # its vertical's leaders
+    index = data.startup_index
+    if name not in index.codes:
+        return []
+    candidates = nearest_first(listed, listed.index(name)) if name in listed else []
+
+    rounds = index.rows(data.df, name)
+    if 'investors' in rounds:
+        investors = split_investors(rounds['investors']).unique()
+        positions = np.concatenate([EMPTY_POSITIONS] + [data.investor_index.get(investor, EMPTY_POSITIONS)
+                                                        for investor in investors])
+        shared = data.df['startup'].iloc[positions].value_counts()
+        shared = shared[shared > 0].drop(name, errors='ignore')
+        candidates += list(shared.index[:RELATED])
+
+    vertical = rounds['vertical'].iloc[0]
+    if pd.notna(vertical) and vertical in index.vertical_totals:
+        leaders = index.startup_totals.xs(vertical, level='vertical').sort_values(ascending=False)
+        candidates += [leader for leader in leaders.index[:RELATED + 1] if leader != name][:RELATED]
+    return list(dict.fromkeys(candidates))
+
+
+def investor_candidates(data, investor, listed):
+    # Neighbours among the listed search matches, then the closest co-investors
+    if investor not in data.investor_vocabulary.index:
+        return []
+    candidates = nearest_first(listed, listed.index(investor)) if investor in listed else []
+    candidates += list(data.co_investment.co_investors(investor).index[:RELATED])
+    return list(dict.fromkeys(candidate for candidate in candidates if candidate != investor))
+
+
+class Prefetcher:
+    # Renders the pages a session is likely to open next on a small thread pool, headless,
+    # so their results and charts are already cached when the session gets there. Each
+    # session has one batch at a time: navigating cancels whatever of it has not started.
+
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch') if workers else None
+        self._lock = threading.Lock()
+        # session -> {page key: future} of its current batch
+        self._batches = {}
+        # page key -> probes of the cache entries its prefetch filled, oldest first
+        self._done = OrderedDict()
+        self.scheduled = self.completed = self.cancelled = self.failed = 0
+        self.hits = self.waits = self.misses = 0
+
+    def _run(self, key, render):
+        with headless(), record_entries() as probes:
+            render()
+        with self._lock:
+            self.completed += 1
+            self._done[key] = probes
+            self._done.move_to_end(key)
+            while len(self._done) > PREFETCH_ENTRIES:
+                self._done.popitem(last=False)
+
+    def _cached(self, key):
+        # Called with the lock held: whether a prefetch rendered key and the memos and the
+        # chart cache still hold all of it; forgets the page once any of it was evicted
+        probes = self._done.get(key)
+        if probes is None:
+            return False
+        if all(probe() for probe in probes):
+            return True
+        del self._done[key]
+        return False
+
+    def _cancel(self, batch, keep=None):
+        # Called with the lock held; running prefetches finish (a page at most each)
+        for key, future in batch.items():
+            if key != keep and future.cancel():
+                self.cancelled += 1
+
+    def visit(self, session, key):
+        # The session is about to render key. Counts a hit when a prefetch already rendered
+        # it and it is still cached; waits for one still running rather than rendering the
+        # page twice; drops the rest of the session's batch, which the navigation made stale.
+        with self._lock:
+            batch = self._batches.pop(session, {})
+            self._cancel(batch, keep=key)
+            future = batch.get(key)
+            if self._cached(key):
+                self.hits += 1
+                return
+            # A finished prefetch that is not cached failed or has been evicted since
+            if future is None or future.done():
+                self.misses += 1
+                return
+            if not future.running() and future.cancel():
+                # Still queued: the session renders it itself right away
+                self.cancelled += 1
+                self.misses += 1
+                return
+            self.waits += 1
+        future.exception()
+
+    def cancel(self, session):
+        with self._lock:
+            self._cancel(self._batches.pop(session, {}))
+
+    def schedule(self, session, pages):
+        # pages maps page key -> render callable, most likely first; replaces the session's batch
+        if self.executor is None:
+            return
+        with self._lock:
+            previous = self._batches.pop(session, {})
+            batch = {}
+            for key, render in pages.items():
+                if self._cached(key):
+                    continue
+                # Keep a prefetch of the same page that is already queued or running
+                future = previous.pop(key, None)
+                if future is None or future.done():
+                    future = self.executor.submit(self._run, key, render)
+                    future.add_done_callback(self._record_failure)
+                    self.scheduled += 1
+                batch[key] = future
+            self._cancel(previous)
+            self._batches[session] = batch
+
+    def _record_failure(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            with self._lock:
+                self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            visits = self.hits + self.waits + self.misses
+            return {'visits': visits, 'hits': self.hits, 'waits': self.waits, 'misses': self.misses,
+                    'hit_rate': (self.hits + self.waits) / visits if visits else 0.0,
+                    'scheduled': self.scheduled, 'completed': self.completed,
+                    'cancelled': self.cancelled, 'failed': self.failed}
+
+
+def startup_page(data, name, section, approximate=False):
+    # Key of one rendering of a startup page: everything the page's output depends on
+    return ('startup', data.key, name, section, approximate)
+
+
+def startup_pages(data, name, listed, section, approximate=False):
+    # Renders of the startups likely opened after name, in the section being read
+    return {startup_page(data, candidate, section, approximate):
+            functools.partial(load_startup_analysis, data, candidate, sections=[section], approximate=approximate)
+            for candidate in startup_candidates(data, name, listed)}
+
+
+def investor_page(data, investor):
+    return ('investor', data.key, investor)
+
+
+def investor_pages(data, investor, listed):
+    return {investor_page(data, candidate): functools.partial(load_investor_details, data, candidate)
+            for candidate in investor_candidates(data, investor, listed)}
+
+
+prefetcher = Prefetcher()
@@ -0,0 +1,198 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Spans are only recorded on threads that called start_trace(); everywhere else span() and
+# @traced cost one thread-local lookup
+_local = threading.local()
+# Sessions currently tracing allocations; tracemalloc is process-wide and slows every thread,
+# so it only runs while at least one of them is active
+_memory_users = 0
+_memory_started = False
+_memory_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ('name', 'depth', 'start', 'end', 'rows', 'base_memory', 'peak_memory', 'details')
+
+    def __init__(self, name, depth, rows=None):
+        self.name = name
+        self.depth = depth
+        self.rows = rows
+        self.details = {}
+        self.start = self.end = 0
+        self.base_memory = self.peak_memory = 0
+
+    @property
+    def allocated(self):
+        # Peak traced memory above what was already allocated when the span began
+        return max(self.peak_memory - self.base_memory, 0)
+
+
+class Trace:
+    # Finished spans of one page render in start order, plus the stack of open ones
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.spans = []
+        self.stack = []
+        self.start = time.perf_counter_ns()
+
+
+class _NoSpan:
+    # Shared stand-in returned while tracing is off; whatever the block records is dropped
+    rows = None
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def details(self):
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class _SpanContext:
+    def __init__(self, trace, name, rows):
+        self.trace = trace
+        self.span = Span(name, len(trace.stack), rows)
+
+    def __enter__(self):
+        span, trace = self.span, self.trace
+        if trace.memory:
+            # The enclosing span keeps the peak reached so far before it is reset for this one
+            current, peak = tracemalloc.get_traced_memory()
+            if trace.stack:
+                trace.stack[-1].peak_memory = max(trace.stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+            span.base_memory = span.peak_memory = current
+        trace.stack.append(span)
+        trace.spans.append(span)
+        span.start = time.perf_counter_ns()
+        return span
+
+    def __exit__(self, *exc):
+        span, trace = self.span, self.trace
+        span.end = time.perf_counter_ns()
+        trace.stack.pop()
+        if trace.memory:
+            span.peak_memory = max(span.peak_memory, tracemalloc.get_traced_memory()[1])
+            if trace.stack:
+                trace.stack[-1].peak_memory = max(trace.stack[-1].peak_memory, span.peak_memory)
+        return False
+
+
+def span(name, rows=None):
+    # Time the block as a span of the current trace; yields the span so the block can set
+    # span.rows (rows touched) or add span.details once it knows them
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return NO_SPAN
+    return _SpanContext(trace, name, rows)
+
+
+def traced(name=None, rows=None):
+    # Decorator form of span(). rows, if given, is called as rows(result, *args, **kwargs)
+    # after the call to count the rows the computation touched.
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = getattr(_local, 'trace', None)
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _SpanContext(trace, label, None) as record:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    record.rows = rows(result, *args, **kwargs)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def start_trace(memory=True):
+    # Begin recording spans on this thread; memory=True also measures allocations per span
+    global _memory_users, _memory_started
+    if memory:
+        with _memory_lock:
+            if _memory_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _memory_started = True
+            _memory_users += 1
+    _local.trace = Trace(memory)
+    return _local.trace
+
+
+def finish_trace():
+    # Stop recording on this thread and return the finished trace (None if none was started)
+    global _memory_users, _memory_started
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is not None and trace.memory:
+        with _memory_lock:
+            _memory_users -= 1
+            # Leave tracemalloc alone if someone else (e.g. a profiler) had started it
+            if _memory_users == 0 and _memory_started:
+                tracemalloc.stop()
+                _memory_started = False
+    return trace
+
+
+def flame_table(trace):
+    # One row per span in call order, indented by depth, with its own (self) time apart
+    # from the time spent in nested spans
+    rows = []
+    total = sum(span.end - span.start for span in trace.spans if span.depth == 0) or 1
+    for i, span in enumerate(trace.spans):
+        children = 0
+        for child in trace.spans[i + 1:]:
+            if child.depth <= span.depth:
+                break
+            if child.depth == span.depth + 1:
+                children += child.end - child.start
+        rows.append({
+            'span': ' ' * span.depth + span.name,
+            'ms': (span.end - span.start) / 1e6,
+            'self ms': (span.end - span.start - children) / 1e6,
+            '%': 100 * (span.end - span.start) / total,
+            'rows': span.rows,
+            'KiB': span.allocated / 1024 if trace.memory else None,
+        })
+    return pd.DataFrame(rows, columns=['span', 'ms', 'self ms', '%', 'rows', 'KiB'])
+
+
+def chrome_trace(traces):
+    # Spans as Chrome trace-event JSON ("X" complete events), viewable in chrome://tracing
+    # or Perfetto. Each trace becomes its own track.
+    events = []
+    origin = min((trace.start for trace in traces), default=0)
+    for track, trace in enumerate(traces):
+        for span in trace.spans:
+            args = {'rows': span.rows, **span.details}
+            if trace.memory:
+                args['allocated_bytes'] = span.allocated
+            events.append({'name': span.name, 'ph': 'X', 'pid': os.getpid(), 'tid': track,
+                           'ts': (span.start - origin) / 1e3, 'dur': (span.end - span.start) / 1e3,
+                           'args': args})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(traces, path):
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(traces), f)
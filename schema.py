@@ -0,0 +1,207 @@
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Share of rows that may fail validation before the whole load is refused: beyond this
+# the feed itself is broken and dropping rows would only hide it
+MAX_REJECTED_SHARE = 0.05
+
+
+class SchemaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Column:
+    kind: str  # 'datetime', 'text', 'number' or 'integer'
+    nullable: bool = False
+    min: object = None
+    max: object = None
+    domain: tuple = None
+    pattern: str = None  # text must match it (case-insensitive) somewhere
+
+
+# A funding round names its kind ("Seed / Angel Funding", "Series B (Extension)", "Term Loan");
+# anything else (an amount, a city) is a value shifted into the wrong column
+ROUND_PATTERN = (r'\b(?:seed|angel|angle|series|private|equity|debt|loan|venture|corporate|bridge|mezzanine'
+                 r'|crowd|funding|round)')
+
+# Contract for the cleaned dataset, as written by ingest.py and derived at load time.
+# Verticals stay open: the feed labels them freely (hundreds of distinct values, new ones
+# every month), so a closed list would reject good rows rather than catch bad ones.
+SCHEMA = {
+    'date': Column('datetime', min=pd.Timestamp('1990-01-01'), max=pd.Timestamp('2100-01-01')),
+    'startup': Column('text'),
+    'vertical': Column('text'),
+    'subvertical': Column('text', nullable=True),
+    'city': Column('text'),
+    'investors': Column('text'),
+    'round': Column('text', pattern=ROUND_PATTERN),
+    'amount': Column('number', min=0, max=1e12),
+    'year': Column('integer', min=1990, max=2100),
+    'month': Column('integer', domain=tuple(range(1, 13))),
+}
+
+REPORT_COLUMNS = ['column', 'rule', 'rows', 'first_row']
+
+KIND_CHECKS = {
+    'datetime': pd.api.types.is_datetime64_any_dtype,
+    'text': lambda dtype: (isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(dtype)
+                           or pd.api.types.is_string_dtype(dtype)),
+    'number': lambda dtype: pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype),
+    'integer': lambda dtype: pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype),
+}
+
+
+def check_dtypes(df, schema=SCHEMA, required=None):
+    # Fail fast when a whole column breaks its contract (e.g. amount parsed as text because
+    # of one malformed value); row-level problems are left to validate_rows
+    problems = []
+    for column in required or []:
+        if column not in df:
+            problems.append(f"missing column '{column}'")
+    for column, spec in schema.items():
+        # An all-missing column (e.g. a short delta without subvertical) has no dtype to speak of
+        if column not in df or KIND_CHECKS[spec.kind](df[column].dtype) or df[column].isna().all():
+            continue
+        detail = ''
+        if spec.kind in ('number', 'integer'):
+            values = df[column]
+            bad = values[pd.to_numeric(values, errors='coerce').isna() & values.notna()]
+            detail = f"; e.g. {list(bad.unique()[:3])}"
+        problems.append(f"'{column}' should be {spec.kind}, found {df[column].dtype}{detail}")
+    if problems:
+        raise SchemaError('Dataset does not match its schema: ' + '; '.join(problems))
+
+
+def flags(comparison):
+    # Plain bool array from a comparison; nullable dtypes compare missing values to NA
+    return comparison.to_numpy(dtype=bool, na_value=False)
+
+
+def text_failures(series, nullable):
+    # Missing or blank text. Categoricals are checked on their dictionary, then mapped to
+    # rows through the codes, so the cost does not depend on string lengths.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        blank = np.asarray(series.cat.categories.astype(str).str.strip() == '')
+        # code -1 (missing) picks the trailing flag
+        return np.append(blank, not nullable)[series.cat.codes.to_numpy()]
+    missing = series.isna().to_numpy()
+    blank = flags(series == '')
+    return blank if nullable else missing | blank
+
+
+def pattern_failures(series, pattern):
+    # Non-blank text not matching pattern, checked once per distinct value
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, values = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, values = pd.factorize(series)
+    values = pd.Index(values).astype(str)
+    failed = np.asarray(~values.str.contains(pattern, case=False, regex=True) & (values.str.strip() != ''))
+    # code -1 (missing) is left to the missing-or-blank rule
+    return np.append(failed, False)[codes]
+
+
+def rule_failures(series, spec):
+    # (rule, boolean mask of failing rows) for one column
+    if spec.kind == 'text':
+        yield 'missing or blank', text_failures(series, spec.nullable)
+        if spec.pattern is not None:
+            yield 'outside domain', pattern_failures(series, spec.pattern)
+        return
+    missing = series.isna().to_numpy()
+    if not spec.nullable and missing.any():
+        yield 'missing', missing
+    if spec.kind == 'integer' and pd.api.types.is_float_dtype(series.dtype):
+        yield 'not a whole number', flags(series % 1 != 0) & ~missing
+    if spec.min is not None:
+        yield f'below {spec.min}', flags(series < spec.min)
+    if spec.max is not None:
+        yield f'above {spec.max}', flags(series > spec.max)
+    if spec.domain is not None:
+        yield 'outside domain', ~missing & ~flags(series.isin(spec.domain))
+
+
+def validate_rows(df, schema=SCHEMA, offset=0):
+    # Boolean mask of rows meeting every rule, plus a compact report: one line per failing
+    # (column, rule) with the count and the first failing row (offset is added to it)
+    valid = np.ones(len(df), dtype=bool)
+    report = []
+    for column, spec in schema.items():
+        if column not in df:
+            continue
+        for rule, failed in rule_failures(df[column], spec):
+            count = int(failed.sum())
+            if count:
+                valid &= ~failed
+                report.append({'column': column, 'rule': rule, 'rows': count,
+                               'first_row': int(np.argmax(failed)) + offset})
+    return valid, pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+def empty_report():
+    return pd.DataFrame(columns=REPORT_COLUMNS)
+
+
+def merge_reports(report, other):
+    if other.empty:
+        return report
+    if report.empty:
+        return other
+    return (pd.concat([report, other]).groupby(['column', 'rule'], as_index=False, sort=False)
+            .agg(rows=('rows', 'sum'), first_row=('first_row', 'min')))
+
+
+def validate_frame(df, schema=SCHEMA, required=None, offset=0, max_rejected=None):
+    # Rows of df that meet the schema, and the report on those that do not. A dtype that
+    # breaks the contract, or more than max_rejected bad rows (MAX_REJECTED_SHARE of df by
+    # default), raises SchemaError.
+    check_dtypes(df, schema, required)
+    valid, report = validate_rows(df, schema, offset)
+    rejected = len(df) - int(valid.sum())
+    if max_rejected is None:
+        max_rejected = MAX_REJECTED_SHARE * len(df)
+    if rejected > max_rejected:
+        raise SchemaError(f"{rejected:,} of {len(df):,} rows fail validation:\n{format_report(report)}")
+    if rejected:
+        df = df[valid].reset_index(drop=True)
+    return df, report
+
+
+def format_report(report):
+    if report.empty:
+        return 'all rows valid'
+    return '\n'.join(f"  {row.column}: {row.rule} ({row.rows:,} rows, first at row {row.first_row:,})"
+                     for row in report.itertuples())
+
+
+def main(argv=None):
+    from dataset import COLUMNS, read_dataset, resolve_data_path
+
+    parser = argparse.ArgumentParser(description='Validate the dataset against its schema.')
+    parser.add_argument('path', nargs='?', default=None, help='dataset to check (defaults to the app dataset)')
+    args = parser.parse_args(argv)
+
+    path = args.path or resolve_data_path()
+    start = time.perf_counter()
+    df = read_dataset(path)
+    read_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    valid, report = validate_rows(df)
+    check_dtypes(df, required=COLUMNS)
+    check_seconds = time.perf_counter() - start
+
+    print(format_report(report))
+    print(f"{len(df) - int(valid.sum()):,} of {len(df):,} rows rejected; validation took {check_seconds:.3f}s "
+          f"({check_seconds / read_seconds:.1%} of the {read_seconds:.2f}s read)", file=sys.stderr)
+    if not valid.all():
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
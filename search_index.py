@@ -0,0 +1,179 @@
+import argparse
+import sys
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+# Matches returned per search; only these ever reach the browser
+TOP_K = 10
+# Startups kept per vertical / subvertical for searches that match the category
+GROUP_MEMBERS = 20
+# Sorts after every other character, closing a prefix range
+LAST_CHARACTER = chr(0x10FFFF)
+
+
+def normalize(text):
+    # Case-insensitive, with runs of whitespace collapsed
+    return ' '.join(str(text).casefold().split())
+
+
+def trigram_codes(encoded, lengths):
+    # (code, name id) of every byte trigram of the concatenated UTF-8 names
+    ids = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.arange(len(encoded)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    first = np.flatnonzero(offsets + 2 < np.repeat(lengths, lengths))
+    codes = (encoded[first] << 16) | (encoded[first + 1] << 8) | encoded[first + 2]
+    return codes, ids[first]
+
+
+def query_codes(query):
+    encoded = np.frombuffer(query.encode(), dtype=np.uint8).astype(np.int64)
+    return np.unique((encoded[:-2] << 16) | (encoded[1:-1] << 8) | encoded[2:])
+
+
+class TrigramIndex:
+    # Names searchable by prefix (binary search over the sorted names) and by substring
+    # (intersection of the byte-trigram posting lists, then a check of the survivors).
+    # Matches are ranked exact, prefix, substring; then by weight, then alphabetically.
+
+    def __init__(self, names, weights=None):
+        self.names = np.asarray(names, dtype=object)
+        self.normalized = [normalize(name) for name in self.names]
+        self.weights = (np.zeros(len(self.names)) if weights is None
+                        else np.asarray(weights, dtype=np.float64))
+        self.order = np.array(sorted(range(len(self.normalized)), key=self.normalized.__getitem__), dtype=np.int64)
+        self.sorted_names = [self.normalized[i] for i in self.order]
+        self.rank = np.empty(len(self.order), dtype=np.int64)
+        self.rank[self.order] = np.arange(len(self.order))
+        # Heaviest names first: what an empty search shows
+        self.top = np.lexsort((self.rank, -self.weights))[:TOP_K]
+
+        encoded = [name.encode() for name in self.normalized]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+        codes, ids = trigram_codes(buffer, lengths)
+        # One sorted posting list of name ids per trigram, each name at most once
+        pairs = np.sort((codes << 32) | ids)
+        if len(pairs):
+            pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+        codes = pairs >> 32
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]])) if len(codes) else codes
+        self.trigrams = codes[starts]
+        self.offsets = np.append(starts, len(codes))
+        self.postings = (pairs & 0xFFFFFFFF).astype(np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _posting(self, code):
+        i = np.searchsorted(self.trigrams, code)
+        if i == len(self.trigrams) or self.trigrams[i] != code:
+            return self.postings[:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def _heaviest(self, ids, k):
+        # The k heaviest of ids, heaviest first (ties alphabetically)
+        if len(ids) > k:
+            # Names tied at the cut-off weight are picked alphabetically too, not arbitrarily
+            weights = self.weights[ids]
+            cutoff = -np.partition(-weights, k - 1)[k - 1]
+            heavier, tied = ids[weights > cutoff], ids[weights == cutoff]
+            needed = k - len(heavier)
+            if needed < len(tied):
+                tied = tied[np.argpartition(self.rank[tied], needed - 1)[:needed]]
+            ids = np.concatenate([heavier, tied])
+        return ids[np.lexsort((self.rank[ids], -self.weights[ids]))]
+
+    def _substring(self, query, k, skip):
+        # Names containing query (3+ bytes) that do not start with it
+        postings = sorted((self._posting(code) for code in query_codes(query)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            # The running set is the smaller side: binary-search it into the longer list
+            found = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            candidates = candidates[posting[found] == candidates]
+        matches = []
+        # Trigrams can match out of order, so check the heaviest candidates until k hold up
+        for batch in (k * 4, len(candidates)):
+            matches = [i for i in self._heaviest(candidates, batch).tolist()
+                       if i not in skip and query in self.normalized[i]][:k]
+            if len(matches) == k or batch >= len(candidates):
+                break
+        return matches
+
+    def search(self, query, k=TOP_K):
+        # Positions of the best k names for query
+        query = normalize(query)
+        if not query:
+            return self.top[:k].tolist()
+        lo = bisect_left(self.sorted_names, query)
+        hi = bisect_left(self.sorted_names, query + LAST_CHARACTER, lo)
+        prefixed = self._heaviest(self.order[lo:hi], k).tolist()
+        if lo < hi and self.sorted_names[lo] == query:
+            exact = int(self.order[lo])
+            prefixed = [exact] + [i for i in prefixed if i != exact][:k - 1]
+        if len(prefixed) < k and len(query.encode()) >= 3:
+            prefixed += self._substring(query, k - len(prefixed), set(self.order[lo:hi].tolist()))
+        return prefixed
+
+    def find(self, query, k=TOP_K):
+        return [self.names[i] for i in self.search(query, k)]
+
+
+class StartupSearch:
+    # Startups by name, then the leading startups of any vertical or subvertical the
+    # query matches. Every match carries the category it came through ('' for a name).
+
+    def __init__(self, df, startup_index):
+        self.startups = TrigramIndex(startup_index.names, np.diff(startup_index.offsets))
+        self.groups = {}
+        for column in ('vertical', 'subvertical'):
+            if column not in df:
+                continue
+            totals = (df.groupby([column, 'startup'], observed=True)['amount'].sum()
+                        .sort_values(ascending=False, kind='stable'))
+            members = {value: list(group.index.get_level_values('startup')[:GROUP_MEMBERS])
+                       for value, group in totals.groupby(level=column, observed=True)}
+            values = list(members)
+            rows = df[column].value_counts()
+            self.groups[column] = (TrigramIndex(values, rows.reindex(values).to_numpy()), members)
+
+    def search(self, query, k=TOP_K):
+        matches = {name: '' for name in self.startups.find(query, k)}
+        for column, (index, members) in self.groups.items():
+            for value in index.find(query, k):
+                for name in members[value]:
+                    matches.setdefault(name, f'{column}: {value}')
+        return list(matches.items())[:k]
+
+
+def main(argv=None):
+    from dataset import load_funding_data
+
+    parser = argparse.ArgumentParser(description='Build the name search indexes and time queries.')
+    parser.add_argument('queries', nargs='*', default=['a', 'se', 'tech', 'capital', 'ventures india'],
+                        help='queries to time')
+    parser.add_argument('--data', default=None, help='dataset to index (defaults to the app dataset)')
+    parser.add_argument('--repeat', type=int, default=1000, help='timed runs per query')
+    args = parser.parse_args(argv)
+
+    data = load_funding_data(args.data)
+    for name in ('startup_search', 'investor_search'):
+        start = time.perf_counter()
+        getattr(data, name)
+        print(f"Built {name} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    for query in args.queries:
+        for name, search in (('startups', data.startup_search.search), ('investors', data.investor_search.find)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                matches = search(query)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"{query!r:<18} {name:<10} {elapsed * 1e6:8.1f} µs  {[str(m) for m in matches[:3]]}")
+
+
+if __name__ == '__main__':
+    main()
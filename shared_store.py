@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset import FundingData, data_version, load_funding_data, resolve_data_path
+from schema import REPORT_COLUMNS
+
+# Set to a directory to have every worker map the dataset from there instead of loading it
+STORE_ENV = 'FUNDING_SHARED_STORE'
+# Name of the file holding the published version; replacing it is the atomic swap
+CURRENT = 'CURRENT'
+# Published versions kept on disk; older ones are removed (workers still mapping them keep
+# their pages, the files only disappear from the directory)
+KEEP_VERSIONS = 2
+
+
+def shared_store_root():
+    return os.environ.get(STORE_ENV) or None
+
+
+def store_version(root):
+    with open(os.path.join(root, CURRENT)) as f:
+        return f.read().strip()
+
+
+def string_buffers(values):
+    # Arrow large_string layout of a string column: validity bitmap, int64 offsets, UTF-8 bytes
+    import pyarrow as pa
+
+    array = pa.array(np.asarray(values, dtype=object), type=pa.large_string(), from_pandas=True)
+    validity, offsets, data = array.buffers()
+    buffers = {'offsets': np.frombuffer(offsets, dtype=np.int64)[:len(array) + 1],
+               'data': np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, np.uint8)}
+    if array.null_count:
+        buffers['valid'] = np.frombuffer(validity, dtype=np.uint8)
+    return buffers, array.null_count
+
+
+def load(path):
+    # Read-only view of the mapped file; a plain ndarray so pandas treats it like any other
+    return np.asarray(np.load(path, mmap_mode='r'))
+
+
+def map_strings(directory, name, length, null_count):
+    # Zero-copy string array over the mapped buffers
+    import pyarrow as pa
+
+    buffers = {}
+    for part in ('offsets', 'data', 'valid'):
+        path = os.path.join(directory, f'{name}.{part}.npy')
+        if os.path.exists(path):
+            buffers[part] = load(path)
+    array = pa.LargeStringArray.from_buffers(
+        length, pa.py_buffer(buffers['offsets']), pa.py_buffer(buffers['data']),
+        pa.py_buffer(buffers['valid']) if 'valid' in buffers else None, null_count)
+    return string_array(array)
+
+
+def string_array(array):
+    # pandas' Arrow-backed string dtype (NaN for missing, like the loaded frame) over array.
+    # pandas before 2.3 has no such variant, so it gets the plain Arrow dtype instead.
+    try:
+        dtype = pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        return pd.arrays.ArrowExtensionArray(array)
+    return pd.arrays.ArrowStringArray(array, dtype=dtype)
+
+
+def write_column(directory, name, series):
+    # One .npy per buffer; returns the manifest entry describing how to map the column back
+    def save(part, array):
+        np.save(os.path.join(directory, f'{name}.{part}.npy' if part else f'{name}.npy'), array)
+
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        save('codes', series.cat.codes.to_numpy())
+        buffers, null_count = string_buffers(dtype.categories)
+        for part, array in buffers.items():
+            save(f'categories.{part}', array)
+        return {'name': name, 'kind': 'category', 'categories': len(dtype.categories),
+                'categories_nulls': null_count}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(dtype):
+        # Nullable numbers (e.g. Int16 years): values and missing mask side by side
+        save('values', series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        save('mask', series.isna().to_numpy())
+        return {'name': name, 'kind': 'masked', 'dtype': str(dtype)}
+    if pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+        buffers, null_count = string_buffers(series)
+        for part, array in buffers.items():
+            save(part, array)
+        return {'name': name, 'kind': 'string', 'nulls': null_count}
+    save(None, series.to_numpy())
+    return {'name': name, 'kind': 'array'}
+
+
+def map_column(directory, entry, rows):
+    name = entry['name']
+    path = os.path.join(directory, name)
+    if entry['kind'] == 'category':
+        categories = pd.Index(map_strings(directory, f'{name}.categories', entry['categories'],
+                                          entry['categories_nulls']), copy=False)
+        codes = load(f'{path}.codes.npy')
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories)), copy=False)
+    if entry['kind'] == 'masked':
+        values = load(f'{path}.values.npy')
+        mask = load(f'{path}.mask.npy')
+        array_type = pd.api.types.pandas_dtype(entry['dtype']).construct_array_type()
+        return pd.Series(array_type(values, mask), copy=False)
+    if entry['kind'] == 'string':
+        return pd.Series(map_strings(directory, name, rows, entry['nulls']), copy=False)
+    return pd.Series(load(f'{path}.npy'), copy=False)
+
+
+def publish(root, path=None):
+    # Materialize the current dataset (validated and compacted) into root and swap it in.
+    # Workers pick the new version up on their next refresh; nothing is restarted.
+    path = path or resolve_data_path()
+    version = data_version(path)
+    os.makedirs(root, exist_ok=True)
+    directory = os.path.join(root, version)
+    if not os.path.exists(directory):
+        data = load_funding_data(path)
+        tmp_directory = f'{directory}.tmp'
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+        manifest = {
+            'version': version,
+            'rows': len(data.df),
+            'source_rows': data.source_rows,
+            'rejected': data.rejected.to_dict('records'),
+            'columns': [write_column(tmp_directory, name, data.df[name]) for name in data.df.columns],
+        }
+        with open(os.path.join(tmp_directory, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.rename(tmp_directory, directory)
+
+    tmp_current = os.path.join(root, f'{CURRENT}.tmp')
+    with open(tmp_current, 'w') as f:
+        f.write(version)
+    os.replace(tmp_current, os.path.join(root, CURRENT))
+    remove_old_versions(root, version)
+    return version
+
+
+def remove_old_versions(root, keep):
+    versions = sorted((entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.endswith('.tmp')),
+                      key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[KEEP_VERSIONS:]:
+        if entry.name != keep:
+            # Mapped files stay readable after unlinking on POSIX; elsewhere try again next time
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def map_funding_data(root, columns=None):
+    # FundingData over the published version, every column a read-only view of the mapped
+    # files: N workers share one copy of the data through the page cache
+    version = store_version(root)
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    # Same projection load_funding_data would produce: the requested columns, plus the
+    # undisclosed flag compact_frame derives from amount
+    wanted = [entry for entry in manifest['columns']
+              if columns is None or entry['name'] in columns
+              or (entry['name'] == 'undisclosed' and 'amount' in columns)]
+    df = pd.DataFrame({entry['name']: map_column(directory, entry, manifest['rows']) for entry in wanted},
+                      copy=False)
+    rejected = pd.DataFrame(manifest['rejected'], columns=REPORT_COLUMNS)
+    return FundingData(df, version, columns, rejected, manifest['source_rows'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publish the dataset as a memory-mapped store shared by workers.')
+    parser.add_argument('root', nargs='?', default=shared_store_root(),
+                        help=f'store directory (defaults to ${STORE_ENV})')
+    parser.add_argument('--data', default=None, help='dataset to publish (defaults to the app dataset)')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='keep running and republish whenever the dataset changes')
+    args = parser.parse_args(argv)
+    if not args.root:
+        parser.error(f'give a store directory or set {STORE_ENV}')
+
+    published = None
+    while True:
+        path = args.data or resolve_data_path()
+        if data_version(path) != published:
+            start = time.perf_counter()
+            published = publish(args.root, path)
+            print(f"Published {path} as {published} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        if args.watch is None:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from timeseries import month_starts
+
+# Grain of the sketches; any time window or filter over these is a merge of cells
+SKETCH_DIMENSIONS = ['year', 'month', 'vertical', 'city']
+
+# HyperLogLog: 2 ** HLL_PRECISION registers per merged sketch. Relative standard error of a
+# distinct count is 1.04 / sqrt(registers), about 1.6%; ~95% of estimates fall within 3.3%.
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_ERROR = 1.04 / np.sqrt(HLL_REGISTERS)
+HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+# Log-bucketed quantile sketch (DDSketch): every returned quantile is within
+# QUANTILE_ACCURACY of the true value, relative to it, whatever the window or filter
+QUANTILE_ACCURACY = 0.01
+GAMMA = (1 + QUANTILE_ACCURACY) / (1 - QUANTILE_ACCURACY)
+# Undisclosed (0) amounts get a bucket of their own and are returned exactly
+ZERO_BUCKET = np.iinfo(np.int16).min
+
+
+def hash_values(values):
+    # 64-bit hash per value; categoricals hash their dictionary once and map it through the codes
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        hashes = pd.util.hash_array(values.cat.categories.to_numpy(dtype=object))
+        return hashes[values.cat.codes.to_numpy()]
+    return pd.util.hash_array(values.to_numpy(dtype=object))
+
+
+def hll_registers(hashes):
+    # Register (top bits) and rank (1 + leading zeros of the remaining bits) of every hash
+    width = 64 - HLL_PRECISION
+    register = (hashes >> np.uint64(width)).astype(np.int16)
+    rest = hashes & np.uint64((1 << width) - 1)
+    # frexp gives the bit length exactly: rest < 2 ** 52 is exact in a float64
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    return register, (width - bit_length + 1).astype(np.int8)
+
+
+def hll_count(registers, by=None):
+    # Distinct-count estimate from (by..., register, rank) rows. Rows may repeat a register
+    # (one per cell); merging sketches is taking the largest rank per register.
+    keys = list(by or []) + ['register']
+    ranks = registers.groupby(keys, observed=True)['rank'].max()
+    inverse = np.exp2(-ranks.astype(np.float64))
+    if by:
+        grouped = inverse.groupby(level=list(by), observed=True)
+        harmonic, filled = grouped.sum(), grouped.size()
+    else:
+        harmonic, filled = inverse.sum(), len(inverse)
+    # Empty registers contribute 2 ** 0 each
+    empty = HLL_REGISTERS - filled
+    raw = HLL_ALPHA * HLL_REGISTERS ** 2 / (harmonic + empty)
+    # Small cardinalities: linear counting over the empty registers is far more accurate
+    with np.errstate(divide='ignore'):
+        linear = HLL_REGISTERS * np.log(HLL_REGISTERS / np.maximum(empty, 1))
+    estimate = np.where((raw <= 2.5 * HLL_REGISTERS) & (empty > 0), linear, raw)
+    if by:
+        return pd.Series(np.round(estimate).astype(np.int64), index=harmonic.index)
+    return int(round(float(estimate)))
+
+
+def quantile_buckets(amounts):
+    # Bucket k holds amounts in (GAMMA ** (k - 1), GAMMA ** k]
+    values = np.asarray(amounts, dtype=np.float64)
+    buckets = np.full(len(values), ZERO_BUCKET, dtype=np.int16)
+    positive = values > 0
+    buckets[positive] = np.ceil(np.log(values[positive]) / np.log(GAMMA))
+    return buckets
+
+
+def bucket_values(buckets):
+    # Representative of each bucket: within QUANTILE_ACCURACY of anything in it
+    values = 2 * GAMMA ** buckets.astype(np.float64) / (GAMMA + 1)
+    return np.where(buckets == ZERO_BUCKET, 0.0, values)
+
+
+def sketch_quantile(buckets, q):
+    # q-quantile of (bucket, count) rows, interpolated between neighbouring ranks like np.quantile
+    counts = buckets.groupby('bucket')['count'].sum()
+    if counts.empty:
+        return np.nan
+    cumulative = np.cumsum(counts.to_numpy())
+    rank = q * (cumulative[-1] - 1)
+    values = bucket_values(counts.index.to_numpy())
+    low, high = np.searchsorted(cumulative, [np.floor(rank), np.ceil(rank)], side='right')
+    return values[low] + (values[high] - values[low]) * (rank - np.floor(rank))
+
+
+def sketch_cells(df, pairs=None, start=0):
+    # Per-cell sketch tables for df. pairs holds (row position, investor) with positions
+    # counted from start, as explode_investor_pairs(df, start) returns them.
+    cells = df[SKETCH_DIMENSIONS]
+    startups = df['startup'].notna().to_numpy()
+    register, rank = hll_registers(hash_values(df['startup'][startups]))
+    startup_registers = (cells[startups].assign(register=register, rank=rank)
+                         .groupby(SKETCH_DIMENSIONS + ['register'], observed=True, dropna=False)['rank']
+                         .max().reset_index())
+
+    amounts = df['amount'].notna().to_numpy()
+    amount_buckets = (cells[amounts].assign(bucket=quantile_buckets(df['amount'][amounts]))
+                      .groupby(SKETCH_DIMENSIONS + ['bucket'], observed=True, dropna=False)
+                      .size().rename('count').reset_index())
+
+    investor_registers = None
+    if pairs is not None:
+        register, rank = hll_registers(hash_values(pairs['investor']))
+        investor_registers = (cells.iloc[pairs['position'].to_numpy() - start].reset_index(drop=True)
+                              .assign(register=register, rank=rank)
+                              .groupby(SKETCH_DIMENSIONS + ['register'], observed=True, dropna=False)['rank']
+                              .max().reset_index())
+    return startup_registers, amount_buckets, investor_registers
+
+
+class SketchCube:
+    # Mergeable per-cell sketches over (year, month, vertical, city): HyperLogLog registers
+    # for distinct startups and investors, log buckets for amount quantiles. Answers any
+    # filter combination by merging the matching cells, with the error bounds above.
+
+    def __init__(self, df=None, pairs=None, tables=None):
+        if df is not None:
+            tables = sketch_cells(df, pairs)
+        self.startup_registers, self.amount_buckets, self.investor_registers = tables
+
+    def merge(self, delta_df, delta_pairs=None, start=0):
+        # New cube covering this one plus delta_df; HLL registers take the max, buckets add up
+        delta = sketch_cells(delta_df, delta_pairs, start)
+        keys = SKETCH_DIMENSIONS + ['register']
+        startup_registers = (pd.concat([self.startup_registers, delta[0]], ignore_index=True)
+                             .groupby(keys, observed=True, dropna=False)['rank'].max().reset_index())
+        amount_buckets = (pd.concat([self.amount_buckets, delta[1]], ignore_index=True)
+                          .groupby(SKETCH_DIMENSIONS + ['bucket'], observed=True, dropna=False)['count']
+                          .sum().reset_index())
+        investor_registers = None
+        if self.investor_registers is not None and delta[2] is not None:
+            investor_registers = (pd.concat([self.investor_registers, delta[2]], ignore_index=True)
+                                  .groupby(keys, observed=True, dropna=False)['rank'].max().reset_index())
+        return SketchCube(tables=(startup_registers, amount_buckets, investor_registers))
+
+    def _mask(self, table, filters):
+        # filters maps a dimension to the list of values to keep, as in OverallCube
+        if not filters:
+            return table
+        mask = pd.Series(True, index=table.index)
+        for column, values in filters.items():
+            mask &= table[column].isin(values)
+        return table[mask]
+
+    def distinct_startups(self, filters=None):
+        return hll_count(self._mask(self.startup_registers, filters))
+
+    def distinct_investors(self, filters=None):
+        if self.investor_registers is None:
+            raise ValueError('investor sketches need the investors column')
+        return hll_count(self._mask(self.investor_registers, filters))
+
+    def period_startups(self, freq, filters=None):
+        # Estimated distinct startups funded per month ('M'), quarter ('Q') or year ('Y'),
+        # indexed by the period's first day: month cells merge into any coarser period
+        registers = self._mask(self.startup_registers, filters)
+        periods = month_starts(registers).dt.to_period(freq).dt.start_time
+        return hll_count(registers.assign(period=periods), by=['period']).rename('startup')
+
+    def amount_quantile(self, q, filters=None):
+        return sketch_quantile(self._mask(self.amount_buckets, filters), q)
+
+
+def main(argv=None):
+    from dataset import load_funding_data
+
+    parser = argparse.ArgumentParser(description='Compare sketch estimates with exact aggregates.')
+    parser.add_argument('path', nargs='?', default=None, help='dataset to check (defaults to the app dataset)')
+    args = parser.parse_args(argv)
+
+    data = load_funding_data(args.path)
+    df = data.df
+    start = time.perf_counter()
+    cube = data.sketch_cube
+    print(f"Built sketches in {time.perf_counter() - start:.2f}s: {len(cube.startup_registers):,} startup "
+          f"registers, {len(cube.amount_buckets):,} amount buckets", file=sys.stderr)
+
+    checks = [('distinct startups', df['startup'].nunique(), cube.distinct_startups(), HLL_ERROR)]
+    if cube.investor_registers is not None:
+        checks.append(('distinct investors', data.investor_pairs['investor'].nunique(),
+                       cube.distinct_investors(), HLL_ERROR))
+    for q in (0.25, 0.5, 0.9, 0.99):
+        checks.append((f'amount p{q * 100:g}', np.quantile(df['amount'], q), cube.amount_quantile(q),
+                       QUANTILE_ACCURACY))
+    for name, exact, estimate, bound in checks:
+        error = abs(estimate - exact) / exact if exact else 0.0
+        print(f"{name:<20} exact {exact:>16,.0f}  approx {estimate:>16,.0f}  error {error:6.2%} "
+              f"(bound {bound:.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,162 @@
-import streamlit as st
+import html
+from dataclasses import dataclass
+
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
+from chart_cache import render_chart
+from headless import st
+from investor_index import split_investors
+from memo import memoize
+from profiling import span, traced
+from sketches import QUANTILE_ACCURACY
+
+# Rounds per page in the timeline and details tables
+ROUNDS_PER_PAGE = 25
 
 # Set the color palette
 plt.style.use('default')
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
 
-def load_startup_analysis(df, startup_name):
+@dataclass(frozen=True)
+class StartupAnalysis:
+    rounds: pd.DataFrame  # earliest first, with a running cumulative_funding column
+    total_funding: float
+    total_rounds: int
+    highest_round: float
+    sectors: int
+    avg_funding: float
+    first_funding: int
+    last_funding: int
+    industry: str
+    headquarters: str
+    latest_round: str
+    growth_rate: float
+    total_investors: int
+
+
+@dataclass(frozen=True)
+class FundingGrowth:
+    round_funding: pd.Series
+
+
+@dataclass(frozen=True)
+class InvestorNetwork:
+    investor_counts: pd.Series
+    related_investors: pd.Series  # strongest co-investors of this startup's backers elsewhere
+
+
+@dataclass(frozen=True)
+class IndustryComparison:
+    industry_stats: dict
+    industry_percentile: float
+    funding_timeline: pd.Series
+    round_funding: pd.Series
+    approximate: bool = False  # industry median estimated from sketches
+
+
+def rounds_touched(result, data, startup_name, *args, **kwargs):
+    # The startup's rounds: the rows every computation on this page reads
+    code = data.startup_index.codes.get(startup_name)
+    return 0 if code is None else int(data.startup_index.offsets[code + 1] - data.startup_index.offsets[code])
+
+
+@traced(rows=rounds_touched)
+@memoize()
+def compute_startup_analysis(data, startup_name):
+    # The top of the page: metrics and profile. Each section below is computed on its own,
+    # only when it is shown.
+    startup_df = data.startup_index.rows(data.df, startup_name)
+    if startup_df.empty:
+        return None
+
+    rounds = startup_df.sort_values('date', kind='stable')
+    rounds = rounds.assign(cumulative_funding=rounds['amount'].cumsum())
+    highest_round = rounds['amount'].max()
+    first_amount = rounds['amount'].iloc[0]
+
+    return StartupAnalysis(
+        rounds=rounds,
+        total_funding=rounds['amount'].sum(),
+        total_rounds=len(rounds),
+        highest_round=highest_round,
+        sectors=rounds['vertical'].nunique(),
+        avg_funding=rounds['amount'].mean(),
+        first_funding=rounds['year'].min(),
+        last_funding=rounds['year'].max(),
+        industry=rounds['vertical'].iloc[0],
+        headquarters=rounds['city'].iloc[0],
+        latest_round=rounds['round'].iloc[-1],
+        # No growth can be measured from an undisclosed (0) first round
+        growth_rate=((highest_round - first_amount) / first_amount * 100) if len(rounds) > 1 and first_amount > 0 else 0,
+        total_investors=len(split_investors(rounds['investors'])),
+    )
+
+
+def round_funding(rounds):
+    return rounds.groupby('round', observed=True)['amount'].sum().sort_values(ascending=True)
+
+
+@traced(rows=rounds_touched)
+@memoize()
+def compute_funding_growth(data, startup_name):
+    result = compute_startup_analysis(data, startup_name)
+    return FundingGrowth(round_funding=round_funding(result.rounds))
+
+
+@traced(rows=rounds_touched)
+@memoize()
+def compute_investor_network(data, startup_name):
+    investors = split_investors(compute_startup_analysis(data, startup_name).rounds['investors'])
+    return InvestorNetwork(
+        investor_counts=investors.value_counts().head(10),
+        related_investors=data.co_investment.related_investors(investors.unique()),
+    )
+
+
+@traced(rows=rounds_touched)
+@memoize()
+def compute_industry_comparison(data, startup_name, approximate=False):
+    result = compute_startup_analysis(data, startup_name)
+    industry_stats = data.startup_index.industry_stats(result.industry)
+    if approximate:
+        # Merged from the vertical's cells instead of its full sorted amounts
+        industry_stats = {**industry_stats,
+                          'median_funding': data.sketch_cube.amount_quantile(0.5, {'vertical': [result.industry]})}
+    return IndustryComparison(
+        industry_stats=industry_stats,
+        industry_percentile=data.startup_index.industry_percentile(result.industry, result.total_funding),
+        funding_timeline=result.rounds.groupby('year')['amount'].sum(),
+        round_funding=round_funding(result.rounds),
+        approximate=approximate,
+    )
+
+
+def rounds_table(rounds, columns):
+    # Display copy of the rounds: one formatted column at a time, no per-row Python loop
+    table = rounds[columns].reset_index(drop=True)
+    table['date'] = table['date'].dt.strftime('%Y-%m-%d')
+    for column in ('amount', 'cumulative_funding'):
+        if column in table:
+            table[column] = '$' + table[column].map('{:,.0f}'.format)
+    table.index += 1
+    return table
+
+
+def render_rounds_table(table, key, page_size):
+    # Long histories are shown a page at a time; page_size=None shows every round
+    if page_size is None or len(table) <= page_size:
+        st.dataframe(table, use_container_width=True)
+        return
+    pages = (len(table) + page_size - 1) // page_size
+    page = st.number_input(f'Page (1-{pages})', min_value=1, max_value=pages, value=1, key=key)
+    start = (page - 1) * page_size
+    st.dataframe(table.iloc[start:start + page_size], use_container_width=True)
+    st.caption(f"Rounds {start + 1}-{min(start + page_size, len(table))} of {len(table)}")
+
+
+@traced()
+def render_startup_analysis(startup_name, result):
     # Custom CSS for better styling
     st.markdown("""
     <style>
@@ -38,19 +187,16 @@ def load_startup_analysis(df, startup_name):
     </style>
     """, unsafe_allow_html=True)
     
-    # Title with emoji and styling
+    # Title with emoji and styling; names from the feed are escaped wherever they go into HTML
     st.markdown(f"""
     <div style="text-align: center; padding: 1rem; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); 
                 border-radius: 15px; margin-bottom: 2rem;">
-        <h1 style="color: white; margin: 0;">🚀 {startup_name}</h1>
+        <h1 style="color: white; margin: 0;">🚀 {html.escape(startup_name)}</h1>
         <p style="color: #f8f9fa; margin: 0.5rem 0 0 0;">Comprehensive Startup Analysis</p>
     </div>
     """, unsafe_allow_html=True)
     
-    # Filter data for selected startup
-    startup_df = df[df['startup'] == startup_name]
-    
-    if startup_df.empty:
+    if result is None:
         st.error("❌ No data found for this startup.")
         return
     
@@ -60,34 +206,34 @@ def load_startup_analysis(df, startup_name):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_funding = startup_df['amount'].sum()
+        total_funding = result.total_funding
         st.metric("💰 Total Funding", f"${total_funding:,.0f}", delta=f"{total_funding/1000000:.1f}M")
     
     with col2:
-        total_rounds = startup_df.shape[0]
+        total_rounds = result.total_rounds
         st.metric("🔄 Total Rounds", total_rounds, delta=f"{total_rounds} rounds")
     
     with col3:
-        latest_valuation = startup_df['amount'].max()
+        latest_valuation = result.highest_round
         st.metric("📈 Highest Round", f"${latest_valuation:,.0f}", delta=f"{latest_valuation/1000000:.1f}M")
     
     with col4:
-        sectors = startup_df['vertical'].unique()
-        st.metric("🏢 Sectors", len(sectors), delta=f"{len(sectors)} vertical(s)")
+        sectors = result.sectors
+        st.metric("🏢 Sectors", sectors, delta=f"{sectors} vertical(s)")
 
     # Additional metrics row
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_funding = startup_df['amount'].mean()
+        avg_funding = result.avg_funding
         st.metric("📊 Avg Round Size", f"${avg_funding:,.0f}", delta=f"{avg_funding/1000000:.1f}M avg")
     
     with col2:
-        first_funding = startup_df['year'].min()
+        first_funding = result.first_funding
         st.metric("🎯 First Funding", int(first_funding), delta=f"Year {int(first_funding)}")
     
     with col3:
-        last_funding = startup_df['year'].max()
+        last_funding = result.last_funding
         st.metric("🕐 Last Funding", int(last_funding), delta=f"Year {int(last_funding)}")
     
     with col4:
@@ -103,15 +249,15 @@ def load_startup_analysis(df, startup_name):
         st.markdown(f"""
         <div class="profile-card">
             <h4>📋 Basic Information</h4>
-            <p><strong>🏭 Industry:</strong> <span style="color:#274670;">{startup_df['vertical'].iloc[0]}</span></p>
-            <p><strong>🏙️ Headquarters:</strong> <span style="color:#274670;">{startup_df['city'].iloc[0]}</span></p>
-            <p><strong>🎯 Latest Round:</strong> <span style="color:#274670;">{startup_df.sort_values('date').iloc[-1]['round']}</span></p>
+            <p><strong>🏭 Industry:</strong> <span style="color:#274670;">{html.escape(str(result.industry))}</span></p>
+            <p><strong>🏙️ Headquarters:</strong> <span style="color:#274670;">{html.escape(str(result.headquarters))}</span></p>
+            <p><strong>🎯 Latest Round:</strong> <span style="color:#274670;">{html.escape(str(result.latest_round))}</span></p>
         </div>
         """, unsafe_allow_html=True)
     
     with profile_col2:
-        growth_rate = ((latest_valuation - startup_df['amount'].iloc[0]) / startup_df['amount'].iloc[0] * 100) if len(startup_df) > 1 else 0
-        total_investors = len([inv.strip() for investors_str in startup_df['investors'].dropna() for inv in str(investors_str).split(',')])
+        growth_rate = result.growth_rate
+        total_investors = result.total_investors
         
         st.markdown(f"""
         <div class="profile-card">
@@ -122,53 +268,56 @@ def load_startup_analysis(df, startup_name):
         </div>
         """, unsafe_allow_html=True)
 
+
+def render_funding_growth(result, growth):
     # Enhanced Funding Growth Analysis
     st.markdown('<div class="section-header">📈 Funding Growth Analysis</div>', unsafe_allow_html=True)
     col1, col2 = st.columns(2)
     
     with col1:
-        startup_df_sorted = startup_df.sort_values('date')
-        startup_df_sorted['cumulative_funding'] = startup_df_sorted['amount'].cumsum()
+        startup_df_sorted = result.rounds
         
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.plot(startup_df_sorted['year'], startup_df_sorted['cumulative_funding'], 
-                marker='o', linewidth=3, markersize=10, color=colors[0])
-        ax.fill_between(startup_df_sorted['year'], startup_df_sorted['cumulative_funding'], 
-                       alpha=0.3, color=colors[0])
-        ax.set_title("💰 Cumulative Funding Over Time", fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel("Year", fontsize=12)
-        ax.set_ylabel("Cumulative Funding ($)", fontsize=12)
-        ax.grid(True, alpha=0.3, linestyle='--')
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig)
+        def draw():
+            fig, ax = plt.subplots(figsize=(10, 5))
+            ax.plot(startup_df_sorted['year'], startup_df_sorted['cumulative_funding'], 
+                    marker='o', linewidth=3, markersize=10, color=colors[0])
+            ax.fill_between(startup_df_sorted['year'], startup_df_sorted['cumulative_funding'], 
+                           alpha=0.3, color=colors[0])
+            ax.set_title("💰 Cumulative Funding Over Time", fontsize=14, fontweight='bold', pad=20)
+            ax.set_xlabel("Year", fontsize=12)
+            ax.set_ylabel("Cumulative Funding ($)", fontsize=12)
+            ax.grid(True, alpha=0.3, linestyle='--')
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            plt.tight_layout()
+            return fig
+        st.image(render_chart('startup.cumulative_line', startup_df_sorted[['year', 'cumulative_funding']], draw))
     
     with col2:
-        fig, ax = plt.subplots(figsize=(10, 5))
-        round_funding = startup_df.groupby('round')['amount'].sum().sort_values(ascending=True)
-        bars = ax.barh(round_funding.index, round_funding.values, color=colors[:len(round_funding)])
-        ax.set_title("🎯 Funding by Round Type", fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel("Funding Amount ($)", fontsize=12)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
+        round_funding = growth.round_funding
+        def draw():
+            fig, ax = plt.subplots(figsize=(10, 5))
+            bars = ax.barh(round_funding.index, round_funding.values, color=colors[:len(round_funding)])
+            ax.set_title("🎯 Funding by Round Type", fontsize=14, fontweight='bold', pad=20)
+            ax.set_xlabel("Funding Amount ($)", fontsize=12)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
         
-        # Add value labels on bars
-        for bar in bars:
-            width = bar.get_width()
-            ax.text(width, bar.get_y() + bar.get_height()/2, 
-                   f'${width:,.0f}', ha='left', va='center', fontweight='bold')
-        plt.tight_layout()
-        st.pyplot(fig)
+            # Add value labels on bars
+            for bar in bars:
+                width = bar.get_width()
+                ax.text(width, bar.get_y() + bar.get_height()/2, 
+                       f'${width:,.0f}', ha='left', va='center', fontweight='bold')
+            plt.tight_layout()
+            return fig
+        st.image(render_chart('startup.round_barh', round_funding, draw))
 
+
+def render_investor_network(network):
     # Enhanced Investor Network Analysis
     st.markdown('<div class="section-header">🤝 Investor Network</div>', unsafe_allow_html=True)
     
-    all_investors = []
-    for investors_str in startup_df['investors'].dropna():
-        all_investors.extend([inv.strip() for inv in str(investors_str).split(',')])
-    
-    investor_counts = pd.Series(all_investors).value_counts().head(10)
+    investor_counts = network.investor_counts
     
     col1, col2 = st.columns(2)
     
@@ -178,104 +327,145 @@ def load_startup_analysis(df, startup_name):
             st.markdown(f"""
             <div style="background: linear-gradient(90deg, {colors[i % len(colors)]}20, {colors[i % len(colors)]}10); 
                         padding: 0.5rem; border-radius: 8px; margin: 0.2rem 0; border-left: 4px solid {colors[i % len(colors)]};">
-                <strong>{investor}</strong>: {count} round(s)
+                <strong>{html.escape(str(investor))}</strong>: {count} round(s)
             </div>
             """, unsafe_allow_html=True)
     
     with col2:
         if len(investor_counts) > 0:
-            fig, ax = plt.subplots(figsize=(10, 5))
-            wedges, texts, autotexts = ax.pie(investor_counts.values, labels=investor_counts.index, 
-                                            autopct='%1.1f%%', colors=colors[:len(investor_counts)])
-            ax.set_title("📊 Investor Distribution", fontsize=14, fontweight='bold', pad=20)
+            def draw():
+                fig, ax = plt.subplots(figsize=(10, 5))
+                wedges, texts, autotexts = ax.pie(investor_counts.values, labels=investor_counts.index, 
+                                                autopct='%1.1f%%', colors=colors[:len(investor_counts)])
+                ax.set_title("📊 Investor Distribution", fontsize=14, fontweight='bold', pad=20)
             
-            # Enhance text styling
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-            plt.tight_layout()
-            st.pyplot(fig)
+                # Enhance text styling
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                plt.tight_layout()
+                return fig
+            st.image(render_chart('startup.investor_pie', investor_counts, draw))
+
+    related_investors = network.related_investors
+    if len(related_investors) > 0:
+        st.markdown("#### 🔗 Frequent Co-Investors of These Backers")
+        st.dataframe(related_investors.rename_axis('investor').reset_index(), hide_index=True,
+                     use_container_width=True)
 
-    # Enhanced Timeline Analysis
+
+def render_funding_timeline(startup_name, result, page_size):
     st.markdown('<div class="section-header">📅 Funding Timeline</div>', unsafe_allow_html=True)
-    timeline_df = startup_df.sort_values('date')[['date', 'round', 'amount', 'investors']]
-    timeline_df['amount_formatted'] = timeline_df['amount'].apply(lambda x: f"${x:,.0f}")
-    
-    for index, row in timeline_df.iterrows():
-        with st.expander(f"🗓️ {row['date']} - {row['round']} Round - {row['amount_formatted']}", expanded=False):
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(f"**💰 Amount:** {row['amount_formatted']}")
-                st.markdown(f"**🔄 Round:** {row['round']}")
-            with col2:
-                st.markdown(f"**🤝 Investors:** {row['investors']}")
+    render_rounds_table(rounds_table(result.rounds, ['date', 'round', 'amount', 'investors']),
+                        f'timeline_page_{startup_name}', page_size)
 
+
+def render_industry_comparison(result, comparison):
     # Enhanced Industry Comparison
     st.markdown('<div class="section-header">🏭 Industry Comparison</div>', unsafe_allow_html=True)
     
-    industry_data = df[df['vertical'] == startup_df['vertical'].iloc[0]]
-    industry_stats = {
-        'avg_funding': industry_data['amount'].mean(),
-        'median_funding': industry_data['amount'].median(),
-        'total_startups': industry_data['startup'].nunique()
-    }
+    industry_stats = comparison.industry_stats
+    total_funding = result.total_funding
     
     col1, col2, col3 = st.columns(3)
     
+    # An industry whose amounts are mostly undisclosed has a median (or average) of 0, which
+    # no ratio can be taken against
     with col1:
-        startup_vs_avg = (total_funding / industry_stats['avg_funding'] - 1) * 100
-        delta_color = "normal" if startup_vs_avg > 0 else "inverse"
-        st.metric("📊 vs Industry Avg", f"{startup_vs_avg:+.1f}%", 
-                 delta=f"{'Above' if startup_vs_avg > 0 else 'Below'} average")
+        if industry_stats['avg_funding'] > 0:
+            startup_vs_avg = (total_funding / industry_stats['avg_funding'] - 1) * 100
+            st.metric("📊 vs Industry Avg", f"{startup_vs_avg:+.1f}%", 
+                     delta=f"{'Above' if startup_vs_avg > 0 else 'Below'} average")
+        else:
+            st.metric("📊 vs Industry Avg", "n/a", delta="Amounts undisclosed", delta_color="off")
     
     with col2:
-        startup_vs_median = (total_funding / industry_stats['median_funding'] - 1) * 100
-        st.metric("📈 vs Industry Median", f"{startup_vs_median:+.1f}%",
-                 delta=f"{'Above' if startup_vs_median > 0 else 'Below'} median")
+        if industry_stats['median_funding'] > 0:
+            startup_vs_median = (total_funding / industry_stats['median_funding'] - 1) * 100
+            st.metric("📈 vs Industry Median", f"{startup_vs_median:+.1f}%",
+                     delta=f"{'Above' if startup_vs_median > 0 else 'Below'} median")
+        else:
+            st.metric("📈 vs Industry Median", "n/a", delta="Amounts undisclosed", delta_color="off")
     
     with col3:
-        industry_funding_totals = industry_data.groupby('startup')['amount'].sum()
-        percentile = (industry_funding_totals < total_funding).mean() * 100
+        percentile = comparison.industry_percentile
         st.metric("🏆 Industry Percentile", f"{percentile:.0f}th",
                  delta=f"Top {100-percentile:.0f}%")
 
+    if comparison.approximate:
+        st.caption(f"Industry median is a sketch estimate (within ±{QUANTILE_ACCURACY:.0%}).")
+
     # Enhanced charts for remaining sections
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### 📊 Yearly Funding Trend")
-        funding_timeline = startup_df.groupby('year')['amount'].sum()
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(funding_timeline.index, funding_timeline.values, marker='o', 
-               linewidth=3, markersize=8, color=colors[1])
-        ax.fill_between(funding_timeline.index, funding_timeline.values, alpha=0.3, color=colors[1])
-        ax.set_xlabel('Year', fontsize=12)
-        ax.set_ylabel('Funding Amount ($)', fontsize=12)
-        ax.grid(True, alpha=0.3)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        plt.tight_layout()
-        st.pyplot(fig)
+        funding_timeline = comparison.funding_timeline
+        def draw():
+            fig, ax = plt.subplots(figsize=(8, 4))
+            ax.plot(funding_timeline.index, funding_timeline.values, marker='o', 
+                   linewidth=3, markersize=8, color=colors[1])
+            ax.fill_between(funding_timeline.index, funding_timeline.values, alpha=0.3, color=colors[1])
+            ax.set_xlabel('Year', fontsize=12)
+            ax.set_ylabel('Funding Amount ($)', fontsize=12)
+            ax.grid(True, alpha=0.3)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            plt.tight_layout()
+            return fig
+        st.image(render_chart('startup.yearly_line', funding_timeline, draw))
     
     with col2:
         st.markdown("#### 🔄 Round Distribution")
-        round_funding = startup_df.groupby('round')['amount'].sum()
-        fig, ax = plt.subplots(figsize=(8, 4))
-        wedges, texts, autotexts = ax.pie(round_funding.values, labels=round_funding.index, 
-                                        autopct='%1.1f%%', colors=colors[:len(round_funding)])
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-        plt.tight_layout()
-        st.pyplot(fig)
-
-    # Enhanced data table
+        round_funding = comparison.round_funding.sort_index()
+        # Undisclosed amounts only: there is nothing to split into a pie
+        if round_funding.sum() > 0:
+            def draw():
+                fig, ax = plt.subplots(figsize=(8, 4))
+                wedges, texts, autotexts = ax.pie(round_funding.values, labels=round_funding.index, 
+                                                autopct='%1.1f%%', colors=colors[:len(round_funding)])
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                plt.tight_layout()
+                return fig
+            st.image(render_chart('startup.round_pie', round_funding, draw))
+        else:
+            st.write("Round amounts are undisclosed.")
+
+
+def render_investment_details(startup_name, result, page_size):
     st.markdown('<div class="section-header">📋 Investment Details</div>', unsafe_allow_html=True)
-    display_df = startup_df[['date', 'round', 'amount', 'investors']].copy()
-    display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:,.0f}")
-    st.dataframe(display_df, use_container_width=True)
+    columns = ['date', 'round', 'amount', 'cumulative_funding', 'investors', 'vertical', 'city']
+    render_rounds_table(rounds_table(result.rounds, columns), f'details_page_{startup_name}', page_size)
 
-    # Success message
-    st.success("✅ Analysis complete! All metrics and visualizations have been generated successfully.")
 
-    
\ No newline at end of file
+# Sections below the metrics and profile, in page order. Each computes its own data.
+SECTIONS = {
+    'Funding Growth': lambda data, name, result, page_size, approximate:
+        render_funding_growth(result, compute_funding_growth(data, name)),
+    'Investor Network': lambda data, name, result, page_size, approximate:
+        render_investor_network(compute_investor_network(data, name)),
+    'Funding Timeline': lambda data, name, result, page_size, approximate:
+        render_funding_timeline(name, result, page_size),
+    'Industry Comparison': lambda data, name, result, page_size, approximate:
+        render_industry_comparison(result, compute_industry_comparison(data, name, approximate)),
+    'Investment Details': lambda data, name, result, page_size, approximate:
+        render_investment_details(name, result, page_size),
+}
+
+
+@traced('page startup')
+def load_startup_analysis(data, startup_name, sections=None, page_size=ROUNDS_PER_PAGE, approximate=False):
+    # The metrics and profile are always drawn; of the sections below only the one picked
+    # is computed and drawn, unless sections names them explicitly (e.g. a static export).
+    # approximate answers the industry aggregates from sketches instead of exact scans.
+    result = compute_startup_analysis(data, startup_name)
+    render_startup_analysis(startup_name, result)
+    if result is None:
+        return
+    if sections is None:
+        sections = [st.radio('Section', list(SECTIONS), horizontal=True, key='startup_section')]
+    for section in sections:
+        with span(f'section {section}'):
+            SECTIONS[section](data, startup_name, result, page_size, approximate)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+def remove_sorted(values, removed):
+    # Drop one occurrence of every value in removed from the sorted array values
+    if len(removed) == 0:
+        return values
+    removed = np.sort(removed)
+    # Equal values removed more than once map to consecutive slots
+    repeat = np.arange(len(removed)) - np.searchsorted(removed, removed, side='left')
+    return np.delete(values, np.searchsorted(values, removed, side='left') + repeat)
+
+
+def insert_sorted(values, added):
+    added = np.sort(added)
+    return np.insert(values, np.searchsorted(values, added), added)
+
+
+class StartupIndex:
+    # Startup -> contiguous block of row positions (ordered by date), plus per-vertical
+    # benchmarks for the Industry Comparison section, built once per data version
+
+    def __init__(self, df=None):
+        if df is None:
+            return
+        startup = df['startup']
+        if isinstance(startup.dtype, pd.CategoricalDtype):
+            # factorize sorts categoricals by dictionary order, which Parquet leaves unsorted
+            startup = startup.cat.set_categories(startup.cat.categories.sort_values())
+        codes, names = pd.factorize(startup, sort=True)
+        # Sort once by (startup, date); rows without a startup name fall out of the index
+        order = np.lexsort((df['date'].to_numpy(), codes))
+        self.order = order[codes[order] >= 0]
+        counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.names = np.asarray(names, dtype=object)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+
+        # Industry benchmarks over rounds (avg/median) and over per-startup totals (percentile).
+        # Kept as sorted arrays and running sums so appended rounds can be merged in.
+        rounds = df.dropna(subset=['amount']).groupby('vertical', observed=True)['amount']
+        self.vertical_sums = rounds.agg(['sum', 'count'])
+        self.vertical_amounts = {vertical: np.sort(group.to_numpy()) for vertical, group in rounds}
+        self.startup_totals = df.groupby(['vertical', 'startup'], observed=True)['amount'].sum()
+        self.vertical_totals = {vertical: np.sort(group.to_numpy())
+                                for vertical, group in self.startup_totals.groupby(level='vertical', observed=True)}
+
+    def rows(self, df, startup):
+        # The startup's rounds, earliest first, without scanning the frame
+        code = self.codes.get(startup)
+        if code is None:
+            return df.iloc[:0]
+        return df.iloc[self.order[self.offsets[code]:self.offsets[code + 1]]]
+
+    def industry_stats(self, vertical):
+        amounts = self.vertical_amounts[vertical]
+        total, count = self.vertical_sums.loc[vertical]
+        return {
+            'avg_funding': total / count,
+            'median_funding': np.median(amounts),
+            'total_startups': len(self.vertical_totals[vertical]),
+        }
+
+    def industry_percentile(self, vertical, total_funding):
+        # Share of startups in the vertical with strictly less total funding
+        totals = self.vertical_totals[vertical]
+        return np.searchsorted(totals, total_funding, side='left') / len(totals) * 100
+
+    def append(self, df, start):
+        # New index over df, where rows from position start onwards were just appended.
+        # Only the startups and verticals touched by the new rows are re-sorted.
+        delta = df.iloc[start:]
+        index = StartupIndex()
+        dates = df['date'].to_numpy()
+
+        # Brand-new startups slot into the sorted name list
+        delta_startups = delta['startup'].dropna()
+        fresh = np.array(sorted(set(delta_startups.unique()) - self.codes.keys()), dtype=object)
+        insert_at = np.searchsorted(self.names, fresh)
+        index.names = np.insert(self.names, insert_at, fresh)
+        index.codes = self.codes if len(fresh) == 0 else {name: code for code, name in enumerate(index.names)}
+
+        # Rebuild order from untouched spans of the old order plus re-sorted changed blocks
+        new_positions = pd.Series(np.arange(start, len(df))[delta['startup'].notna().to_numpy()],
+                                  index=delta_startups.to_numpy())
+        pieces, cursor = [], 0
+        for name in sorted(new_positions.index.unique()):
+            old_code = self.codes.get(name)
+            if old_code is None:
+                block_start = block_end = self.offsets[np.searchsorted(self.names, name)]
+            else:
+                block_start, block_end = self.offsets[old_code], self.offsets[old_code + 1]
+            block = np.concatenate([self.order[block_start:block_end], np.atleast_1d(new_positions[name])])
+            pieces += [self.order[cursor:block_start], block[np.argsort(dates[block], kind='stable')]]
+            cursor = block_end
+        pieces.append(self.order[cursor:])
+        index.order = np.concatenate(pieces)
+
+        counts = np.insert(np.diff(self.offsets), insert_at, 0)
+        counts += np.bincount(delta_startups.map(index.codes).to_numpy(dtype=np.int64), minlength=len(index.names))
+        index.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # Merge the vertical benchmarks: running sums, sorted round amounts, sorted startup totals
+        delta_rounds = delta.dropna(subset=['amount']).groupby('vertical', observed=True)['amount']
+        index.vertical_sums = self.vertical_sums.add(delta_rounds.agg(['sum', 'count']), fill_value=0)
+        index.vertical_amounts = dict(self.vertical_amounts)
+        for vertical, group in delta_rounds:
+            index.vertical_amounts[vertical] = insert_sorted(
+                self.vertical_amounts.get(vertical, np.empty(0)), group.to_numpy())
+
+        delta_totals = delta.groupby(['vertical', 'startup'], observed=True)['amount'].sum()
+        index.startup_totals = self.startup_totals.add(delta_totals, fill_value=0)
+        old_totals = self.startup_totals.reindex(delta_totals.index)
+        new_totals = index.startup_totals.loc[delta_totals.index]
+        index.vertical_totals = dict(self.vertical_totals)
+        for vertical in delta_totals.index.unique(level='vertical'):
+            before = old_totals.xs(vertical, level='vertical').dropna().to_numpy()
+            after = new_totals.xs(vertical, level='vertical').to_numpy()
+            totals = self.vertical_totals.get(vertical, np.empty(0))
+            index.vertical_totals[vertical] = insert_sorted(remove_sorted(totals, before), after)
+        return index
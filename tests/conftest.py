@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATASET = os.path.join(ROOT, 'stratup_cleaned.csv')
+
+
+@pytest.fixture(scope='session')
+def funding_data():
+    # The committed dataset, loaded once and shared: tests must not mutate it
+    from dataset import load_funding_data
+
+    return load_funding_data(DATASET)
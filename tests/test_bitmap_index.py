@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap_index import CHUNK_ROWS, BitmapIndex, is_bitset
+from investor_index import explode_investor_pairs
+
+# More than two chunks, so selections cross chunk boundaries
+ROWS = 2 * CHUNK_ROWS + 12_345
+
+
+@pytest.fixture(scope='module')
+def frame():
+    # Few common verticals (bitset containers), many rare cities (array containers)
+    rng = np.random.default_rng(7)
+    verticals = rng.choice(['Consumer', 'Fintech', 'Edtech', 'Health'], size=ROWS, p=[0.5, 0.3, 0.15, 0.05])
+    cities = rng.choice([f'City {i}' for i in range(400)], size=ROWS)
+    rounds = rng.choice(['Seed', 'Series A', 'Series B', None], size=ROWS, p=[0.4, 0.3, 0.2, 0.1])
+    investors = np.array([f'Fund {i}' for i in range(300)])
+    lists = [', '.join(pair) for pair in investors[rng.integers(0, len(investors), size=(ROWS, 2))]]
+    return pd.DataFrame({'vertical': pd.Categorical(verticals), 'city': pd.Categorical(cities),
+                         'round': pd.Categorical(rounds), 'investors': lists})
+
+
+@pytest.fixture(scope='module')
+def pairs(frame):
+    return explode_investor_pairs(frame)
+
+
+def scan(df, pairs, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for facet, values in filters.items():
+        if facet == 'investor':
+            rows = np.zeros(len(df), dtype=bool)
+            rows[pairs['position'][pairs['investor'].isin(values)].to_numpy()] = True
+            mask &= rows
+        else:
+            mask &= df[facet].isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+
+QUERIES = [
+    {'vertical': ['Consumer']},
+    {'vertical': ['Consumer', 'Fintech'], 'round': ['Seed']},
+    {'city': ['City 3']},
+    {'city': ['City 3', 'City 200', 'City 399'], 'vertical': ['Health']},
+    {'vertical': ['Edtech'], 'city': [f'City {i}' for i in range(0, 400, 7)], 'round': ['Series A', 'Series B']},
+    {'investor': ['Fund 12']},
+    {'investor': ['Fund 12', 'Fund 250'], 'vertical': ['Fintech'], 'city': ['City 5', 'City 6']},
+    {'vertical': ['Nowhere']},
+    {'vertical': ['Consumer'], 'city': []},
+]
+
+
+@pytest.mark.parametrize('filters', QUERIES)
+def test_select_matches_isin_scan(frame, pairs, filters):
+    index = BitmapIndex(frame, pairs)
+    expected = scan(frame, pairs, {facet: values for facet, values in filters.items() if values})
+    assert np.array_equal(index.select(filters), expected)
+
+
+def test_index_uses_both_container_kinds(frame, pairs):
+    index = BitmapIndex(frame, pairs)
+    containers = [container for values in index.bitmaps.values() for bitmap in values.values()
+                  for container in bitmap.containers.values()]
+    assert any(is_bitset(c) for c in containers) and not all(is_bitset(c) for c in containers)
+    assert index.select({}) is None
+    with pytest.raises(ValueError):
+        index.select({'subvertical': ['x']})
+
+
+def test_merge_matches_rebuild(frame, pairs):
+    # Split inside a chunk, so the merge has to union partially filled containers
+    split = CHUNK_ROWS + 1000
+    head, tail = frame.iloc[:split], frame.iloc[split:].reset_index(drop=True)
+    merged = BitmapIndex(head, explode_investor_pairs(head)).merge(tail, explode_investor_pairs(tail, split), split)
+    rebuilt = BitmapIndex(frame, pairs)
+    for filters in QUERIES:
+        assert np.array_equal(merged.select(filters), rebuilt.select(filters))
+    assert merged.values('vertical') == rebuilt.values('vertical')
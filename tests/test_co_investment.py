@@ -0,0 +1,83 @@
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from co_investment import CoInvestmentGraph
+from investor_index import explode_investor_pairs
+
+
+def random_deals(seed, deals=300, investors=200):
+    # Sparse enough that distances vary and some investors are unreachable
+    rng = np.random.default_rng(seed)
+    names = [f'Investor {i:03d}' for i in range(investors)]
+    sizes = rng.choice([1, 2, 2, 3], size=deals)
+    return pd.DataFrame({'investors': [', '.join(rng.choice(names, size=size, replace=False)) for size in sizes]})
+
+
+def adjacency(df):
+    graph = {}
+    for investors in df['investors']:
+        names = {name.strip() for name in investors.split(',')}
+        for name in names:
+            graph.setdefault(name, set())
+        for a, b in combinations(names, 2):
+            graph[a].add(b)
+            graph[b].add(a)
+    return graph
+
+
+def bfs_distance(graph, source, target):
+    seen = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        if node == target:
+            return seen[node]
+        for neighbour in graph[node]:
+            if neighbour not in seen:
+                seen[neighbour] = seen[node] + 1
+                queue.append(neighbour)
+    return None
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_shortest_path_matches_bfs(seed):
+    df = random_deals(seed)
+    graph = CoInvestmentGraph(explode_investor_pairs(df))
+    plain = adjacency(df)
+    names = sorted(plain)
+    rng = np.random.default_rng(seed)
+    for source, target in rng.choice(names, size=(200, 2)):
+        distance = bfs_distance(plain, source, target)
+        path = graph.shortest_path(source, target)
+        if distance is None or distance > 6:
+            assert path is None
+            continue
+        assert path is not None and len(path) == distance + 1
+        assert path[0] == source and path[-1] == target
+        assert all(b in plain[a] for a, b in zip(path, path[1:]))
+
+
+def test_shortest_path_respects_max_hops():
+    chain = [f'Fund {chr(ord("A") + i)}' for i in range(10)]
+    graph = CoInvestmentGraph(explode_investor_pairs(
+        pd.DataFrame({'investors': [f'{a}, {b}' for a, b in zip(chain, chain[1:])]})))
+    assert graph.shortest_path(chain[0], chain[-1]) is None
+    assert graph.shortest_path(chain[0], chain[-1], max_hops=9) == chain
+    assert graph.shortest_path(chain[3], chain[3]) == [chain[3]]
+    assert graph.shortest_path(chain[0], 'Nobody') is None
+
+
+def test_co_investors_count_shared_deals():
+    df = random_deals(3)
+    graph = CoInvestmentGraph(explode_investor_pairs(df))
+    plain = adjacency(df)
+    deal_sets = [{name.strip() for name in investors.split(',')} for investors in df['investors']]
+    for investor in sorted(plain)[:50]:
+        shared = graph.co_investors(investor, n=None)
+        assert set(shared.index) == plain[investor]
+        for other, count in shared.items():
+            assert count == sum(investor in deal and other in deal for deal in deal_sets)
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from entities import (apply_entities, display_name, entities_path, is_typo, load_entities, normalize_name,
+                      resolve_names, write_entities)
+
+
+def resolve(counts):
+    names, review = resolve_names(pd.Series(counts))
+    return dict(zip(names['name'], names['canonical'])), review
+
+
+@pytest.mark.parametrize('a, b', [
+    ('IvyCamp Ventures', 'IvyCap Ventures'),
+    ('Uniqorn Ventures', 'Unicorn Ventures'),
+    ('DG Ventures', 'IDG Ventures'),
+    ('Sequoia Capital', 'Sequoia Capital India'),
+    ('Ola', 'Olx'),
+    ('Blume Fund 1', 'Blume Fund 11'),
+    ('Kae Capital', 'Kaa Capital'),
+])
+def test_near_duplicates_stay_separate(a, b):
+    canonical, _ = resolve({a: 5, b: 3})
+    assert canonical[a] == a
+    assert canonical[b] == b
+
+
+@pytest.mark.parametrize('typo, spelling', [
+    ('Accel Patrners', 'Accel Partners'),
+    ('Kalari Capital', 'Kalaari Capital'),
+    ('Nexxus Venture Partners', 'Nexus Venture Partners'),
+])
+def test_typos_merge_into_the_common_spelling(typo, spelling):
+    canonical, _ = resolve({spelling: 10, typo: 1})
+    assert canonical[typo] == spelling
+    assert canonical[spelling] == spelling
+
+
+def test_formatting_variants_merge():
+    canonical, _ = resolve({'Ola Cabs': 4, 'Olacabs': 2, 'OLA CABS Pvt. Ltd.': 1,
+                            "Byju\\\\xe2\\\\x80\\\\x99s": 1, 'Byju’s': 3})
+    assert set(canonical.values()) == {'Ola Cabs', 'Byju’s'}
+
+
+def test_close_pairs_are_listed_for_review():
+    _, review = resolve({'IvyCamp Ventures': 5, 'IvyCap Ventures': 3, 'Accel Partners': 2})
+    listed = {frozenset(pair) for pair in zip(review['name'], review['candidate'])}
+    assert frozenset(['IvyCamp Ventures', 'IvyCap Ventures']) in listed
+
+
+def test_is_typo():
+    assert is_typo('partners', 'patrners')
+    assert is_typo('kalaari', 'kalari')
+    assert not is_typo('ivycamp', 'ivycap')
+    assert not is_typo('uniqorn', 'unicorn')
+    assert not is_typo('olx', 'xlo')
+
+
+def test_names_normalize():
+    assert normalize_name('The Ola Cabs Pvt. Ltd') == normalize_name('olacabs')
+    assert display_name("  'Zomato'  ") == 'Zomato'
+
+
+def test_apply_entities_rewrites_startups_and_investor_lists():
+    df = pd.DataFrame({'startup': pd.Categorical(['Olacabs', 'Ola Cabs', 'Swiggy']),
+                       'investors': ['Accel Patrners, Tiger Global', 'Tiger Global', None]})
+    resolved = apply_entities(df, {'startup': {'Olacabs': 'Ola Cabs'},
+                                   'investor': {'Accel Patrners': 'Accel Partners'}})
+    assert list(resolved['startup']) == ['Ola Cabs', 'Ola Cabs', 'Swiggy']
+    assert list(resolved['startup'].cat.categories) == ['Ola Cabs', 'Swiggy']
+    assert resolved['investors'].iloc[0] == 'Accel Partners, Tiger Global'
+    assert resolved['investors'].iloc[1] == 'Tiger Global'
+
+
+def test_write_entities_keeps_reviewed_merges(tmp_path):
+    path = str(tmp_path / 'funding.csv')
+    pd.DataFrame({'date': ['2020-01-01'] * 4,
+                  'startup': ['Olacabs', 'Ola Cabs', 'Ola Cabs', 'Flipkart.com'],
+                  'investors': ['Accel Patrners', 'Accel Partners', 'Accel Partners', 'Tiger Global']},
+                 ).to_csv(path, index=False)
+    mapping, _ = write_entities(path)
+    assert set(zip(mapping['name'], mapping['canonical'])) == {('Olacabs', 'Ola Cabs'),
+                                                               ('Accel Patrners', 'Accel Partners')}
+    # A pair someone confirmed from the review list survives the next rebuild
+    with open(entities_path(path), 'a') as f:
+        f.write('startup,Flipkart.com,Flipkart,\n')
+    write_entities(path)
+    assert load_entities(path)['startup'] == {'Olacabs': 'Ola Cabs', 'Flipkart.com': 'Flipkart'}
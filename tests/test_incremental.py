@@ -0,0 +1,92 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATASET
+from dataset import COLUMNS, data_version, load_funding_data, read_dataset
+from incremental import MERGEABLE, append_to_dataset, appended_since, verify_incremental
+from ingest import ingest
+
+
+@pytest.fixture(params=['csv', 'parquet'])
+def dataset_path(request, tmp_path):
+    # A private copy of the dataset in either storage format
+    path = tmp_path / 'stratup_cleaned.csv'
+    shutil.copy(DATASET, path)
+    if request.param == 'parquet':
+        ingest(str(path), str(tmp_path / 'stratup_cleaned.parquet'))
+        path = tmp_path / 'stratup_cleaned.parquet'
+    return str(path)
+
+
+def new_rounds(df, date='2031-01-15', rows=40):
+    # Cleaned rows dated after the dataset, mixing known and unseen names and values
+    delta = df[COLUMNS].tail(rows).reset_index(drop=True)
+    delta = delta.astype({c: object for c in COLUMNS if isinstance(delta[c].dtype, pd.CategoricalDtype)})
+    delta['date'] = pd.Timestamp(date)
+    delta.loc[::2, 'startup'] = [f'Newco {i}' for i in range(len(delta[::2]))]
+    delta.loc[::3, 'city'] = 'Zedtown'
+    delta.loc[::4, 'investors'] = 'Fresh Ventures, Sequoia Capital'
+    delta['amount'] = delta['amount'].astype(np.float64)
+    return delta
+
+
+def loaded(path):
+    data = load_funding_data(path)
+    for name in MERGEABLE:
+        getattr(data, name)
+    return data
+
+
+def comparable(df):
+    # Categorical dictionaries legitimately differ between a merge and a rebuild
+    return df.apply(lambda s: s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s)
+
+
+def test_append_matches_full_rebuild(dataset_path):
+    previous = loaded(dataset_path)
+    delta_rows = new_rounds(previous.df)
+    append_to_dataset(delta_rows, dataset_path)
+    assert appended_since(dataset_path, previous.version) == previous.source_rows
+
+    delta = read_dataset(dataset_path, start=previous.source_rows)
+    assert len(delta) == len(delta_rows)
+    data = previous.append(delta, data_version(dataset_path))
+    for name in MERGEABLE:
+        assert data.built(name)
+    assert verify_incremental(data) == []
+
+    rebuilt = loaded(dataset_path)
+    assert data.version == rebuilt.version
+    pd.testing.assert_frame_equal(comparable(data.df), comparable(rebuilt.df), check_dtype=False)
+    assert data.overall_cube.total == rebuilt.overall_cube.total
+    assert data.overall_cube.startup_count == rebuilt.overall_cube.startup_count
+    assert data.investor_index.keys() == rebuilt.investor_index.keys()
+    assert all(np.array_equal(data.investor_index[k], rebuilt.investor_index[k]) for k in rebuilt.investor_index)
+    assert data.sketch_cube.distinct_startups() == rebuilt.sketch_cube.distinct_startups()
+    assert data.sketch_cube.distinct_investors() == rebuilt.sketch_cube.distinct_investors()
+    assert list(data.investor_vocabulary.index) == list(rebuilt.investor_vocabulary.index)
+    filters = {'city': ['Zedtown', 'Bangalore']}
+    assert np.array_equal(data.bitmap_index.select(filters), rebuilt.bitmap_index.select(filters))
+
+
+def test_repeated_appends_chain(dataset_path):
+    previous = loaded(dataset_path)
+    data = previous
+    for date in ('2031-01-15', '2031-02-01'):
+        append_to_dataset(new_rounds(previous.df, date, rows=10), dataset_path)
+        data = data.append(read_dataset(dataset_path, start=data.source_rows), data_version(dataset_path))
+    # Both log entries chain from the first version to the current one
+    assert appended_since(dataset_path, previous.version) == previous.source_rows
+    assert len(data.df) == len(previous.df) + 20
+    assert verify_incremental(data) == []
+
+
+def test_backdated_rows_are_refused(dataset_path):
+    previous = loaded(dataset_path)
+    delta = new_rounds(previous.df, date='2000-01-01', rows=5)
+    assert not previous.in_date_order(delta)
+    with pytest.raises(ValueError):
+        previous.append(delta, 'later')
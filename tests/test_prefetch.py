@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from memo import memoize
+from prefetch import Prefetcher
+
+
+@memoize(maxsize=2)
+def compute_page(data, name):
+    return name.upper()
+
+
+DATA = SimpleNamespace(key=('v1', None))
+
+
+def prefetched(prefetcher, session, names):
+    prefetcher.schedule(session, {name: (lambda name=name: compute_page(DATA, name)) for name in names})
+    # Wait for the batch to finish
+    for future in prefetcher._batches[session].values():
+        future.result()
+
+
+def test_hit_only_while_the_page_is_cached():
+    compute_page.cache_clear()
+    prefetcher = Prefetcher(workers=1)
+    prefetched(prefetcher, 's', ['a'])
+    prefetcher.visit('s', 'a')
+    assert prefetcher.stats()['hits'] == 1
+
+    prefetched(prefetcher, 's', ['b'])
+    # Two other pages push 'b' out of the memo before the session gets there
+    compute_page(DATA, 'c')
+    compute_page(DATA, 'd')
+    prefetcher.visit('s', 'b')
+    stats = prefetcher.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_evicted_pages_are_prefetched_again():
+    compute_page.cache_clear()
+    prefetcher = Prefetcher(workers=1)
+    prefetched(prefetcher, 's', ['a'])
+    prefetched(prefetcher, 's', ['a'])
+    assert prefetcher.stats()['scheduled'] == 1
+
+    compute_page.cache_clear()
+    prefetched(prefetcher, 's', ['a'])
+    assert prefetcher.stats()['scheduled'] == 2
+    prefetcher.visit('s', 'a')
+    assert prefetcher.stats()['hits'] == 1
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from search_index import TOP_K, TrigramIndex, normalize
+
+
+@pytest.fixture(scope='module')
+def names():
+    # Short names over a small alphabet, so queries match many names both ways
+    rng = np.random.default_rng(11)
+    alphabet = list('abcé ') + ['A', 'B']
+    generated = {''.join(rng.choice(alphabet, size=rng.integers(2, 9))) for _ in range(3000)}
+    unique = {}
+    for name in sorted(generated) + ['Café Coffee Day', 'Zürich Capital', 'Sequoia Capital', 'Sequoia Capital India']:
+        if normalize(name):
+            unique.setdefault(normalize(name), name)
+    return list(unique.values())
+
+
+@pytest.fixture(scope='module')
+def weights(names):
+    # Few distinct weights, so ties fall back to alphabetical order
+    return np.random.default_rng(12).integers(0, 5, size=len(names))
+
+
+def expected(names, weights, query, k=TOP_K):
+    query = normalize(query)
+    normalized = [normalize(name) for name in names]
+    rank = {i: r for r, i in enumerate(sorted(range(len(names)), key=normalized.__getitem__))}
+    best = lambda ids: sorted(ids, key=lambda i: (-weights[i], rank[i]))
+    if not query:
+        return best(range(len(names)))[:k]
+    prefixed = best(i for i, name in enumerate(normalized) if name.startswith(query))[:k]
+    exact = [i for i, name in enumerate(normalized) if name == query]
+    if exact:
+        prefixed = exact + [i for i in prefixed if i != exact[0]][:k - 1]
+    if len(prefixed) < k and len(query.encode()) >= 3:
+        inside = best(i for i, name in enumerate(normalized) if query in name and not name.startswith(query))
+        prefixed += inside[:k - len(prefixed)]
+    return prefixed
+
+
+QUERIES = ['', 'a', 'ab', 'abc', 'ba c', 'B', '  A  b ', 'cab', 'éa', 'aé', 'acab', 'ccc', 'capital',
+           'sequoia capital', 'SEQUOIA', 'zür', 'ffee', 'xyz', 'é']
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_matches_brute_force(names, weights, query):
+    index = TrigramIndex(names, weights)
+    assert index.search(query) == expected(names, weights, query)
+    assert index.search(query, k=3) == expected(names, weights, query, k=3)
+
+
+def test_exact_match_comes_first(names, weights):
+    index = TrigramIndex(names, weights)
+    assert index.find('Sequoia Capital')[:2] == ['Sequoia Capital', 'Sequoia Capital India']
+    assert index.find('sequoia   capital india') == ['Sequoia Capital India']
+
+
+def test_substring_finds_names_by_inner_words(names, weights):
+    index = TrigramIndex(names, weights)
+    found = index.find('capital')
+    assert {'Zürich Capital', 'Sequoia Capital', 'Sequoia Capital India'} <= set(found)
+    # Two-character queries only match prefixes
+    assert all(normalize(name).startswith('ca') for name in index.find('ca', k=len(names)))
+
+
+def test_startup_search_tags_category_matches(funding_data):
+    search = funding_data.startup_search
+    vertical = funding_data.df['vertical'].value_counts().index[0]
+    matches = search.search(vertical)
+    assert matches
+    for name, via in matches:
+        assert name in funding_data.startup_index.codes
+        assert via == '' or normalize(vertical) in normalize(via)
+    assert any(via == f'vertical: {vertical}' for _, via in matches)
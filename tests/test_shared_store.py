@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from conftest import DATASET
+from shared_store import map_funding_data, publish, store_version
+
+
+def test_mapped_store_matches_loaded_data(tmp_path, funding_data):
+    version = publish(str(tmp_path), DATASET)
+    assert store_version(str(tmp_path)) == version
+    mapped = map_funding_data(str(tmp_path))
+    assert len(mapped.df) == len(funding_data.df)
+    # Missing values may come back as NaN or as <NA>, depending on the pandas release
+    comparable = lambda series: series.astype(object).where(series.notna(), None)
+    for column in funding_data.df.columns:
+        pd.testing.assert_series_equal(comparable(mapped.df[column]), comparable(funding_data.df[column]))
+    assert mapped.investor_index.keys() == funding_data.investor_index.keys()
+    assert all(np.array_equal(mapped.investor_index[k], v) for k, v in funding_data.investor_index.items())
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+# Periods a time-series chart can be drawn at, as pandas period frequencies
+GRANULARITIES = {'Day': 'D', 'Week': 'W', 'Month': 'M', 'Quarter': 'Q', 'Year': 'Y'}
+# Most points any time-series chart is drawn with; longer series are downsampled
+MAX_POINTS = 300
+
+
+def resample(df, granularity, column, aggregation):
+    # column aggregated per period of df's dates, indexed by the period's first day
+    periods = df['date'].dt.to_period(GRANULARITIES[granularity]).dt.start_time.rename('period')
+    return df.groupby(periods)[column].agg(aggregation)
+
+
+def month_starts(frame):
+    # First day of every (year, month) row, as the cubes and sketches key their months
+    return pd.to_datetime(frame[['year', 'month']].assign(day=1), errors='coerce').rename('period')
+
+
+def lttb(x, y, points):
+    # Largest-Triangle-Three-Buckets: positions of the points that keep the series' shape.
+    # First and last are kept; every bucket in between keeps the point forming the largest
+    # triangle with the previous kept point and the average of the next bucket.
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    edges = (np.arange(points - 1) * (n - 2) / (points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        following = slice(end, edges[bucket + 2] if bucket + 2 < len(edges) else n)
+        next_x, next_y = x[following].mean(), y[following].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(series, points=MAX_POINTS):
+    # At most points of series (indexed by dates or numbers), chosen by LTTB
+    if len(series) <= points:
+        return series
+    index = series.index
+    x = (index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()).astype(np.float64)
+    return series.iloc[lttb(x, series.to_numpy(dtype=np.float64), points)]